@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Throughput benchmark for the native exporters.
+
+This compares the time it takes to write a set of guitar parts to file with
+the native SVG and DXF writers, and through matplotlib.
+"""
+
+import io
+import time
+
+from metalute.blueprint import blueprint
+from metalute.body import MusicManAxis
+from metalute.dxf import write_dxf
+from metalute.geometry import Point
+from metalute.head import MusicMan
+from metalute.matplotlib_ import plt
+from metalute.pickup import SingleCoilRouting, HumbuckerRouting
+from metalute.svg import write_svg
+
+
+def _parts():
+    """Return a dictionary with the parts of a guitar.
+    """
+    return {'BODY': MusicManAxis(), 'HEAD': MusicMan(), 'NECK_PICKUP': SingleCoilRouting(),
+            'BRIDGE_PICKUP': HumbuckerRouting()}
+
+
+def _matplotlib(parts):
+    """Draw the parts with matplotlib and save the figure to SVG.
+    """
+    blueprint('Benchmark', 'A1')
+    for name, part in parts.items():
+        if name == 'HEAD':
+            part.draw_top(Point(0., 0.))
+        else:
+            part.draw(Point(0., 0.))
+    plt.savefig(io.StringIO(), format='svg')
+    plt.close('all')
+
+
+def run(num_passes: int = 10):
+    """Run the benchmark.
+    """
+    parts = _parts()
+    writers = {
+        'svg': lambda: write_svg(io.StringIO(), *parts.values()),
+        'dxf': lambda: write_dxf(io.StringIO(), parts),
+        'matplotlib': lambda: _matplotlib(parts)
+    }
+    for name, writer in writers.items():
+        # Mind the first pass fills all the geometry caches.
+        writer()
+        start = time.perf_counter()
+        for _ in range(num_passes):
+            writer()
+        dt = (time.perf_counter() - start) / num_passes
+        print(f'{name:>12}: {1000. * dt:8.2f} ms per export')
+
+
+
+if __name__ == '__main__':
+    run()
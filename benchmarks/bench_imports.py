@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Cold-start benchmark for the computation-only modules.
+
+Each module is imported in a brand new interpreter, and we measure the time
+it takes, along with the heavy dependencies (matplotlib, pandas) that end up
+being imported along the way. Mind none of them should, as they are all
+loaded lazily when they are actually needed.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+from metalute import BASE_FOLDER
+
+
+MODULES = ('metalute.fret', 'metalute.pitch', 'metalute.gauge', 'metalute.geometry')
+HEAVY_MODULES = ('matplotlib', 'pandas')
+
+_SCRIPT = """
+import sys
+import time
+start = time.perf_counter()
+import {}
+elapsed = time.perf_counter() - start
+print(elapsed, *[name for name in {} if name in sys.modules])
+"""
+
+
+def cold_start(module_name: str):
+    """Import a module in a new interpreter and return the elapsed time (in s)
+    along with the list of heavy modules imported.
+    """
+    script = _SCRIPT.format(module_name, HEAVY_MODULES)
+    env = dict(os.environ, PYTHONPATH=BASE_FOLDER)
+    output = subprocess.run([sys.executable, '-c', script], env=env, check=True,
+                            capture_output=True, text=True).stdout.split()
+    return float(output[0]), output[1:]
+
+
+def run(num_passes: int = 5, budget: float = 0.5):
+    """Run the benchmark, and return the number of modules exceeding the
+    budget (in s) or importing any of the heavy modules.
+    """
+    num_failures = 0
+    for module_name in MODULES:
+        results = [cold_start(module_name) for _ in range(num_passes)]
+        elapsed = statistics.median(result[0] for result in results)
+        heavy = results[0][1]
+        failed = elapsed > budget or len(heavy) > 0
+        num_failures += failed
+        status = 'FAIL' if failed else 'ok'
+        print(f'{module_name:>20}: {1000. * elapsed:8.2f} ms {status} {" ".join(heavy)}')
+    return num_failures
+
+
+
+if __name__ == '__main__':
+    sys.exit(run())
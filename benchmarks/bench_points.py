@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Memory and throughput benchmark for the Point classes.
+
+This compares the slotted, immutable Point objects in the geometry and
+geometry2 modules with a plain class mimicking the old layout (i.e., with a
+__dict__ and no caching of the quantized coordinates), for designs creating
+10^5--10^6 points.
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+
+from metalute import geometry, geometry2
+
+
+class LegacyPoint:
+
+    """Reference implementation with the same layout as the original Point
+    class in the geometry module.
+    """
+
+    def __init__(self, x: float = 0., y: float = 0., name: str = None):
+        """Constructor.
+        """
+        self.x = x
+        self.y = y
+        self.name = name
+
+    @staticmethod
+    def _round(val, digits=3):
+        """Same as the original implementation.
+        """
+        return round(10**digits * val)
+
+    def __eq__(self, other):
+        """Operator overload.
+        """
+        return self._round(self.x) == self._round(other.x) and\
+               self._round(self.y) == self._round(other.y)
+
+    def __hash__(self):
+        """Operator overload.
+        """
+        return hash((self._round(self.x), self._round(self.y)))
+
+
+
+def _create(point_class, x, y):
+    """Create a list of points and return it, along with the memory allocated.
+    """
+    tracemalloc.start()
+    points = [point_class(_x, _y) for _x, _y in zip(x, y)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return points, size
+
+
+def _dedup_time(points, num_passes: int = 3):
+    """Measure the time it takes to deduplicate a list of points a few times
+    (which is what happens when many paths share their end points).
+    """
+    start = time.perf_counter()
+    for _ in range(num_passes):
+        unique = set(points)
+    return time.perf_counter() - start, len(unique)
+
+
+def run(num_points: int):
+    """Run the benchmark for a given number of points.
+    """
+    # Mind we generate each point twice, to make deduplication non-trivial.
+    rng = np.random.default_rng(1)
+    x = rng.uniform(-500., 500., num_points // 2).round(2)
+    y = rng.uniform(-500., 500., num_points // 2).round(2)
+    x = np.concatenate((x, x)).tolist()
+    y = np.concatenate((y, y)).tolist()
+    print(f'Benchmarking {num_points} points...')
+    for point_class in (LegacyPoint, geometry.Point, geometry2.Point):
+        points, size = _create(point_class, x, y)
+        dt, num_unique = _dedup_time(points)
+        name = f'{point_class.__module__}.{point_class.__name__}'
+        print(f'{name:>25}: {size / num_points:6.1f} bytes/point, '
+              f'dedup {1.e9 * dt / num_points:6.1f} ns/point ({num_unique} unique)')
+
+
+
+if __name__ == '__main__':
+    for num_points in (100000, 1000000):
+        run(num_points)
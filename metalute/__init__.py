@@ -35,6 +35,8 @@ def _join(*args) -> str:
     return os.path.join(BASE_FOLDER, *args)
 
 
+__version__ = '0.0.0'
+
 GITHUB_URL = 'https://github.com/lucabaldini/metalute'
 ROOT_FOLDER = _join('metalute')
 TEST_FOLDER = _join('tests')
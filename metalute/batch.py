@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Batch rendering of blueprints and templates.
+
+This module renders many blueprints in parallel, in a pool of worker
+processes. Each rendering job is described by a RenderJob object, pointing to
+a factory for the object to be drawn (in the form of an import string, e.g.,
+'metalute.routing:HumbuckerRoutingTemplate', so that jobs can be pickled and
+written in configuration files), along with the paper size and the path to the
+output file. Each worker uses the headless Agg backend and draws each job on a
+standalone figure (i.e., without going through pyplot), failures are isolated
+(i.e., a failing job is reported and does not affect the others), and the
+progress is reported as the jobs complete. Optionally, the rendered files are
+stored in (and, for repeated jobs, fetched from) a render cache, see the cache
+module.
+
+The module can also be run from the command line, e.g.
+
+>>> python -m metalute.batch --output-folder templates
+
+renders the entire catalog of templates in the given folder (using the
+default render cache, unless --no-cache is passed).
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace, asdict
+import importlib
+import json
+import multiprocessing
+import os
+import time
+import traceback
+
+from metalute.cache import RenderCache, DEFAULT_CACHE_FOLDER, cache_metadata
+
+
+
+@dataclass(frozen=True)
+class RenderJob:
+
+    """Description of a single rendering job.
+
+    Parameters
+    ----------
+    factory : str
+        The import string ('module:name') for the callable creating the object
+        to be drawn.
+
+    size : str
+        The paper size, as passed to blueprint().
+
+    output : str
+        The path to the output file (with the format inferred from the
+        extension).
+
+    orientation : str
+        The paper orientation.
+
+    title : str, optional
+        The title of the blueprint (by default, the name of the output file).
+
+    author : str, optional
+        The author of the blueprint.
+
+    params : dict
+        The keyword arguments passed to the factory.
+
+    method : str
+        The name of the method drawing the object.
+
+    offset : 2-element tuple
+        The offset passed to the draw method.
+
+    draw_kwargs : dict
+        Additional keyword arguments passed to the draw method.
+    """
+
+    factory : str
+    size : str
+    output : str
+    orientation : str = 'Landscape'
+    title : str = None
+    author : str = None
+    params : dict = field(default_factory=dict)
+    method : str = 'draw'
+    offset : tuple = (0., 0.)
+    draw_kwargs : dict = field(default_factory=dict)
+
+
+
+@dataclass
+class RenderResult:
+
+    """Small container class for the outcome of a rendering job.
+    """
+
+    job : RenderJob
+    elapsed : float
+    error : str = None
+    cached : bool = False
+
+    @property
+    def success(self) -> bool:
+        """Return True if the job completed successfully.
+        """
+        return self.error is None
+
+
+
+CATALOG = [
+    RenderJob('metalute.routing:SingleCoilRoutingTemplate', 'A4', 'single_coil_routing_template.pdf',
+              'Portrait', 'Single-coil Routing Template', 'Luca Baldini'),
+    RenderJob('metalute.routing:HumbuckerRoutingTemplate', 'A4', 'humbucker_routing_template.pdf',
+              'Portrait', 'Humbucker Routing Template', 'Luca Baldini',
+              draw_kwargs=dict(drilling_holes=True)),
+    RenderJob('metalute.routing:NeckPocketRoutingTemplate', 'A3', 'neck_pocket_routing_template.pdf',
+              'Landscape', 'Neck Pocket Routing Template', 'Luca Baldini'),
+    RenderJob('metalute.jig:JigsawJig', 'A1', 'jigsaw_jig.pdf', title='Jigsaw jig'),
+    RenderJob('metalute.jig:Workbench', 'A0', 'workbench.pdf', title='Workbench'),
+    RenderJob('metalute.head:MusicMan', 'A4', 'music_man_head.pdf', title='Music Man Axis head',
+              method='draw_top', offset=(-60., 0.)),
+    RenderJob('metalute.body:MusicManAxis', 'A1', 'music_man_axis.pdf', title='Music Man Axis',
+              offset=(-200., -50.))
+]
+
+
+def resolve_factory(factory: str):
+    """Resolve an import string in the form 'module:name'.
+    """
+    module_name, name = factory.split(':')
+    return getattr(importlib.import_module(module_name), name)
+
+
+def _init_worker():
+    """Initialize a worker process with the headless Agg backend.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def job_metadata(job: RenderJob, factory, date: str = None) -> dict:
+    """Return the cache metadata for a job, given the factory of the object
+    being drawn and the date printed in the title box.
+    """
+    title = job.title or os.path.splitext(os.path.basename(job.output))[0]
+    params = dict(params=job.params, method=job.method, offset=job.offset,
+                  draw_kwargs=job.draw_kwargs)
+    paper = dict(size=job.size, orientation=job.orientation, title=title, author=job.author,
+                 date=date)
+    return cache_metadata(factory, params, paper, os.path.splitext(job.output)[1])
+
+
+def render(job: RenderJob, cache: RenderCache = None) -> bool:
+    """Render a single job, and return True if the output was fetched from the
+    cache (or False if it was actually rendered).
+
+    Mind this is executed in the worker processes, and each job is drawn on a
+    brand new standalone figure, in its own rendering context, so that no
+    global state is shared between jobs.
+
+    If a cache is passed, the output file is copied from the cache, if
+    available, and stored in the cache after the rendering otherwise. In this
+    case the date in the title box only carries the day (and is part of the
+    cache key), so that a cached file never shows a stale date.
+    """
+    # Mind these imports are deferred, as the backend is set in the worker.
+    from metalute.blueprint import blueprint
+    from metalute.geometry import Point
+    folder = os.path.dirname(job.output)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    factory = resolve_factory(job.factory)
+    date = None
+    if cache is not None:
+        date = time.strftime('%a %b %d %Y')
+        metadata = job_metadata(job, factory, date)
+        if cache.fetch(metadata, job.output):
+            return True
+    title = job.title or os.path.splitext(os.path.basename(job.output))[0]
+    obj = factory(**job.params)
+    with blueprint(title, job.size, job.author, orientation=job.orientation,
+                   pyplot=False, date=date) as context:
+        getattr(obj, job.method)(Point(*job.offset), **job.draw_kwargs)
+        context.savefig(job.output)
+    if cache is not None:
+        cache.put(metadata, job.output)
+    return False
+
+
+def _run_job(job: RenderJob, cache: RenderCache = None):
+    """Run a single job, catching all the exceptions, and return a
+    RenderResult object.
+    """
+    start = time.perf_counter()
+    try:
+        cached = render(job, cache)
+    except Exception:
+        return RenderResult(job, time.perf_counter() - start, traceback.format_exc())
+    return RenderResult(job, time.perf_counter() - start, cached=cached)
+
+
+def print_progress(result: RenderResult, num_done: int, num_jobs: int):
+    """Default progress report.
+    """
+    status = ('CACHED' if result.cached else 'OK') if result.success else 'FAILED'
+    print(f'[{num_done}/{num_jobs}] {status:6} {result.job.output} ({result.elapsed:.2f} s)')
+    if not result.success:
+        print(result.error)
+
+
+def run_batch(jobs, max_workers: int = None, progress=print_progress, cache: RenderCache = None):
+    """Render a sequence of jobs in a pool of worker processes, and return the
+    list of RenderResult objects (in the same order as the jobs).
+
+    Parameters
+    ----------
+    jobs : sequence of RenderJob objects
+        The jobs to be rendered.
+
+    max_workers : int, optional
+        The number of worker processes (by default, the number of cores).
+        With a single worker the jobs are rendered in the current process.
+
+    progress : callable, optional
+        A function called with the result, the number of jobs completed so far
+        and the total number of jobs, each time a job completes.
+
+    cache : RenderCache object, optional
+        The render cache (if None, all the jobs are rendered from scratch).
+    """
+    jobs = list(jobs)
+    results = [None] * len(jobs)
+    if max_workers == 1:
+        for i, job in enumerate(jobs):
+            results[i] = _run_job(job, cache)
+            if progress is not None:
+                progress(results[i], i + 1, len(jobs))
+        return results
+    # Mind we spawn fresh interpreters, so that the workers do not inherit any
+    # of the pyplot state of the parent process.
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers, context, _init_worker) as executor:
+        futures = {executor.submit(_run_job, job, cache): i for i, job in enumerate(jobs)}
+        for num_done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception:
+                # This happens if the worker process dies.
+                results[i] = RenderResult(jobs[i], 0., traceback.format_exc())
+            if progress is not None:
+                progress(results[i], num_done, len(jobs))
+    return results
+
+
+def _fix_offset(item: dict):
+    """Convert the offset (that JSON reads as a list) into a tuple.
+    """
+    if 'offset' in item:
+        item['offset'] = tuple(item['offset'])
+    return item
+
+
+def load_jobs(file_path: str):
+    """Load a list of jobs from a JSON file, containing a list of dictionaries
+    with the RenderJob fields.
+    """
+    with open(file_path) as input_file:
+        return [RenderJob(**_fix_offset(item)) for item in json.load(input_file)]
+
+
+def dump_jobs(jobs, file_path: str):
+    """Write a list of jobs to a JSON file.
+    """
+    with open(file_path, 'w') as output_file:
+        json.dump([asdict(job) for job in jobs], output_file, indent=4)
+
+
+def main(args=None):
+    """Command-line interface.
+    """
+    parser = argparse.ArgumentParser(description='Render blueprints in parallel.')
+    parser.add_argument('--jobs', help='path to a JSON file with the jobs (default: the catalog)')
+    parser.add_argument('--output-folder', default='.', help='the output folder')
+    parser.add_argument('--workers', type=int, default=None, help='the number of worker processes')
+    parser.add_argument('--select', default=None, help='only render the outputs matching a string')
+    parser.add_argument('--cache-folder', default=DEFAULT_CACHE_FOLDER, help='the render cache folder')
+    parser.add_argument('--no-cache', action='store_true', help='do not use the render cache')
+    args = parser.parse_args(args)
+    jobs = CATALOG if args.jobs is None else load_jobs(args.jobs)
+    if args.select is not None:
+        jobs = [job for job in jobs if args.select in job.output]
+    jobs = [replace(job, output=os.path.join(args.output_folder, job.output)) for job in jobs]
+    start = time.perf_counter()
+    cache = None if args.no_cache else RenderCache(args.cache_folder)
+    results = run_batch(jobs, args.workers, cache=cache)
+    num_failed = len([result for result in results if not result.success])
+    print(f'{len(results) - num_failed} job(s) succeeded, {num_failed} failed in '
+          f'{time.perf_counter() - start:.2f} s.')
+    return int(num_failed > 0)
+
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
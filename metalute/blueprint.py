@@ -18,13 +18,21 @@
 """Blueprint.
 """
 
+from functools import lru_cache
 import time
 from string import ascii_uppercase
 
 import numpy as np
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.font_manager import font_scalings
 from matplotlib.offsetbox import TextArea, VPacker, AnchoredOffsetbox
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D
 
-from metalute.matplotlib_ import plt, setup_page, mm_to_points
+from metalute.matplotlib_ import matplotlib, plt, setup_page, mm_to_points, points_to_mm,\
+    RenderContext, current_context
+from metalute.units import mm_to_inches
 
 
 PAPER_SIZE_DICT = {'A0': (841., 1189.),
@@ -48,16 +56,19 @@ class MultiTextBox(AnchoredOffsetbox):
     """
     """
 
-    def __init__(self, fields):
+    def __init__(self, fields, context=None):
         """
         """
+        context = context or current_context()
+        size = context.font_size()
         lines = []
         for key, value in fields.items():
-            lines.append(TextArea(key.upper(), textprops={'color': 'lightgray'}))
-            lines.append(TextArea('    {}                       '.format(value)))
+            lines.append(TextArea(key.upper(), textprops={'color': 'lightgray', 'size': size}))
+            lines.append(TextArea('    {}                       '.format(value),
+                                  textprops={'size': size}))
         pack = VPacker(children=lines, pad=0., sep=2.)
-        super().__init__(4, child=pack, borderpad=0.)
-        plt.gca().add_artist(self)
+        super().__init__(4, child=pack, borderpad=0., prop={'size': size})
+        context.axes.add_artist(self)
 
 
 
@@ -66,92 +77,282 @@ class BlueprintBox(MultiTextBox):
     """
     """
 
-    def __init__(self, title, author):
+    def __init__(self, title, author, context=None, date: str = None):
         """
         """
-        fields = dict(title=title, author=author, date=time.asctime())
-        super().__init__(fields)
+        fields = dict(title=title, author=author, date=date or time.asctime())
+        super().__init__(fields, context)
 
 
 
-def hruler(y, xmin, xmax, step=10., line_width=0.15):
+@lru_cache(maxsize=1024)
+def _glyphs(text: str, size: float):
+    """Return the (cached) outline of a piece of text at a given size (in data
+    coordinates, i.e., mm), shifted so that the lower-left corner of its extent
+    is at the origin, along with the width and the height of the extent.
     """
+    path = TextPath((0., 0.), text, size=size)
+    (x0, y0), (x1, y1) = path.get_extents().get_points()
+    return Path(path.vertices - (x0, y0), path.codes, readonly=True), x1 - x0, y1 - y0
+
+
+def _text_path(x: float, y: float, text: str, size: float, ha: str = 'center',
+               va: str = 'center', rotation: float = 0.):
+    """Return the outline of a piece of text as a matplotlib path, in data
+    coordinates, with the same alignment options as plt.text().
+
+    Mind the alignment is calculated on the extent of the outline (rather than
+    on the font metrics), which is accurate enough for the labels of the
+    rulers and of the reference grid.
     """
-    fmt = dict(lw=mm_to_points(line_width))
-    plt.hlines(y, xmin, xmax, **fmt)
-    x = np.arange(xmin, xmax + 0.5 * step, step)
-    plt.vlines(x, y, y - 2., **fmt)
-    fmt = dict(size='small', ha='center', va='top')
-    for _x in x:
-        text = '{:.0f}'.format(_x)
-        if text == '0':
-            text += ' mm'
-        plt.text(_x, y - 3., text, **fmt)
+    path, width, height = _glyphs(text, size)
+    dx = {'left': 0., 'center': -0.5 * width, 'right': -width}[ha]
+    dy = {'bottom': 0., 'center': -0.5 * height, 'top': -height}[va]
+    transform = Affine2D().translate(dx, dy).rotate_deg(rotation).translate(x, y)
+    return transform.transform_path(path)
+
 
+def _label_size(scaling: str = 'small') -> float:
+    """Return the size (in mm) of the text in the current rendering context, for
+    a given font scaling.
+    """
+    return points_to_mm(current_context().font_size(scaling))
 
 
-def vruler(x, ymin, ymax, step=10., line_width=0.15):
+def _ruler_label(value: float) -> str:
+    """Return the label for a ruler tick.
     """
+    text = '{:.0f}'.format(value)
+    if text == '0':
+        text += ' mm'
+    return text
+
+
+def hruler_geometry(y: float, xmin: float, xmax: float, step: float = 10.,
+                    text_size: float = None):
+    """Return the geometry of a horizontal ruler, i.e., the list of segments
+    and the list of the outlines of the labels.
     """
-    fmt = dict(lw=mm_to_points(line_width))
-    plt.vlines(x, ymin, ymax, **fmt)
-    y = np.arange(ymin, ymax + 0.5 * step, step)
-    plt.hlines(y, x, x + 2., **fmt)
-    fmt = dict(size='small', ha='left', va='center')
-    for _y in y:
-        text = '{:.0f}'.format(_y)
-        if text == '0':
-            text += ' mm'
-        plt.text(x + 3, _y, text, **fmt)
+    text_size = text_size or _label_size()
+    segments = [((xmin, y), (xmax, y))]
+    labels = []
+    for x in np.arange(xmin, xmax + 0.5 * step, step):
+        segments.append(((x, y), (x, y - 2.)))
+        labels.append(_text_path(x, y - 3., _ruler_label(x), text_size, va='top'))
+    return segments, labels
 
 
-def blueprint(name: str, size: str, author=None, orientation: str = 'Landscape',
-              dpi: float = 100., text_size: float = 3., line_width: float = 0.25,
-              margin: float = 0.05, pitch: float = 50., tick_size: float = 7.5):
-    """Create a custom figure for techical drawings.
+def vruler_geometry(x: float, ymin: float, ymax: float, step: float = 10.,
+                    text_size: float = None):
+    """Return the geometry of a vertical ruler, i.e., the list of segments
+    and the list of the outlines of the labels.
+    """
+    text_size = text_size or _label_size()
+    segments = [((x, ymin), (x, ymax))]
+    labels = []
+    for y in np.arange(ymin, ymax + 0.5 * step, step):
+        segments.append(((x, y), (x + 2., y)))
+        labels.append(_text_path(x + 3., y, _ruler_label(y), text_size, ha='left'))
+    return segments, labels
+
+
+def stamp(segments, linewidths, labels, ax=None):
+    """Add a set of segments and of text outlines to the axes, as a single
+    LineCollection and a single PathCollection.
+    """
+    ax = ax or current_context().axes
+    lines = LineCollection(segments, linewidths=linewidths, colors='black', clip_on=False)
+    ax.add_collection(lines, autolim=False)
+    text = PathCollection(labels, facecolors='black', edgecolors='none', clip_on=False)
+    ax.add_collection(text, autolim=False)
+    return lines, text
+
+
+def hruler(y, xmin, xmax, step=10., line_width=0.15):
+    """Draw a horizontal ruler.
+
+    The line, the ticks and the labels are drawn as two batched artists.
+    """
+    segments, labels = hruler_geometry(y, xmin, xmax, step)
+    return stamp(segments, mm_to_points(line_width), labels)
+
+
+def vruler(x, ymin, ymax, step=10., line_width=0.15):
+    """Draw a vertical ruler.
+
+    The line, the ticks and the labels are drawn as two batched artists.
+    """
+    segments, labels = vruler_geometry(x, ymin, ymax, step)
+    return stamp(segments, mm_to_points(line_width), labels)
+
+
+
+def paper_dimensions(size: str, orientation: str = 'Landscape'):
+    """Return the (width, height) of a given paper size in a given orientation.
     """
     assert orientation in PAPER_ORIENTATIONS
     width, height = PAPER_SIZE_DICT[size]
     if orientation == 'Landscape':
         width, height = height, width
-    # Setup the page.
-    width, height, dpi = setup_page((width, height), dpi, text_size, line_width)
-    # Create an empty figure.
-    plt.figure(name)
-    # Setup the axes.
-    plt.gca().set_aspect('equal')
+    return width, height
+
+
+
+def drawing_area(width: float, height: float, margin: float = 0.05):
+    """Return the half-width and the half-height of the drawing area (i.e.,
+    the axes, centered at the origin) for a page of given dimensions.
+
+    This is the very same calculation that blueprint() does to setup the axes.
+    """
     hmargin = margin
     vmargin = hmargin * width / height
-    plt.subplots_adjust(left=hmargin, right=1. - hmargin, top=1. - vmargin, bottom=vmargin)
-    plt.xticks([])
-    plt.yticks([])
-    w = 0.5 * width * (1. - 2. * hmargin)
-    h = 0.5 * height * (1. - 2. * vmargin)
-    plt.gca().axis([-w, w, -h, h])
-    # Add the reference grid on the borders.
+    return 0.5 * width * (1. - 2. * hmargin), 0.5 * height * (1. - 2. * vmargin)
+
+
+
+def fit_paper(*objects, margin: float = 0.05, padding: float = 15., orientation: str = None,
+              sizes=None):
+    """Return the smallest paper size (and the corresponding orientation and
+    drawing offset) fitting a set of objects.
+
+    All the objects must implement a bbox() method returning the bounding box
+    (xmin, ymin, xmax, ymax) in the coordinates used for drawing, and plain
+    4-element tuples are accepted as well. The drawing area is calculated as
+    in blueprint(), and a padding (in mm) is reserved on all sides, in order to
+    make room for the rulers and the title box.
+
+    Paper sizes are tried in order of increasing area, and the landscape
+    orientation is preferred when both would fit. The offset is returned as an
+    (x, y) tuple, and centers the union of the bounding boxes on the page.
+
+    Parameters
+    ----------
+    objects : objects with a bbox() method or bounding boxes
+        The objects to be drawn.
+
+    margin : float
+        The relative page margin, as passed to blueprint().
+
+    padding : float
+        The additional padding (in mm) on each side of the drawing area.
+
+    orientation : str, optional
+        If not None, only this orientation is considered.
+
+    sizes : iterable of str, optional
+        If not None, only these paper sizes are considered.
+    """
+    bboxes = [obj if isinstance(obj, tuple) else obj.bbox() for obj in objects]
+    xmin, ymin, xmax, ymax = zip(*bboxes)
+    xmin, ymin, xmax, ymax = min(xmin), min(ymin), max(xmax), max(ymax)
+    offset = (-0.5 * (xmin + xmax), -0.5 * (ymin + ymax))
+    if sizes is None:
+        sizes = PAPER_SIZE_DICT.keys()
+    sizes = sorted(sizes, key=lambda size: np.prod(PAPER_SIZE_DICT[size]))
+    orientations = PAPER_ORIENTATIONS[::-1] if orientation is None else [orientation]
+    for size in sizes:
+        for _orientation in orientations:
+            w, h = drawing_area(*paper_dimensions(size, _orientation), margin)
+            if xmax - xmin <= 2. * (w - padding) and ymax - ymin <= 2. * (h - padding):
+                return size, _orientation, offset
+    raise RuntimeError('No paper size fitting the bounding box ({}, {}, {}, {}).'.format(
+        xmin, ymin, xmax, ymax))
+
+
+@lru_cache(maxsize=32)
+def blueprint_frame(width: float, height: float, margin: float = 0.05, pitch: float = 50.,
+                    tick_size: float = 7.5, text_size: float = 3., line_width: float = 0.25,
+                    ruler_line_width: float = 0.15, ruler_step: float = 10.):
+    """Return the (cached) geometry of the frame of a blueprint, i.e., the
+    reference grid on the borders with its letters and numbers and the two
+    reference rulers, for a page of given dimensions.
+
+    The frame is returned as an (N, 2, 2) array of segments, along with the
+    corresponding line widths (in points), and a tuple with the outlines of all
+    the labels (in data coordinates, i.e., mm), so that it can be stamped onto
+    a new figure with just two artists (see stamp()), and without any text
+    layout at rendering time. Mind the labels are outlines, rather than actual
+    text.
+    """
+    segments = []
+    labels = []
+    w, h = drawing_area(width, height, margin)
+    # The reference grid on the borders.
     nx = int(width / pitch + 0.5)
     ny = int(height / pitch + 0.5)
     x = np.linspace(-w, w, nx + 1)
     y = np.linspace(-h, h, ny + 1)
-    plt.hlines(y, -w, -w - tick_size, clip_on=False)
-    plt.hlines(y, w, w + tick_size, clip_on=False)
-    plt.vlines(x, -h, -h - tick_size, clip_on=False)
-    plt.vlines(x, h, h + tick_size, clip_on=False)
-    # Add the letters and numbers to the reference grid.
+    for _y in y:
+        segments += [((-w, _y), (-w - tick_size, _y)), ((w, _y), (w + tick_size, _y))]
+    for _x in x:
+        segments += [((_x, -h), (_x, -h - tick_size)), ((_x, h), (_x, h + tick_size))]
+    # The letters and numbers of the reference grid.
     dx = w / nx
     dy = h / ny
-    fmt = dict(size='large', ha='center', va='center')
+    size = text_size * font_scalings['large']
     for i, _x in enumerate(np.flip((x + dx)[:-1])):
-        plt.text(_x, -h - tick_size, '{}'.format(i + 1), **fmt)
-        plt.text(_x, h + tick_size, '{}'.format(i + 1), rotation=90., **fmt)
+        labels.append(_text_path(_x, -h - tick_size, '{}'.format(i + 1), size))
+        labels.append(_text_path(_x, h + tick_size, '{}'.format(i + 1), size, rotation=90.))
     for i, _y in enumerate((y + dy)[:-1]):
-        plt.text(-w - tick_size, _y, '{}'.format(ascii_uppercase[i]), **fmt)
-        plt.text(w + tick_size, _y, '{}'.format(ascii_uppercase[i]), rotation=90., **fmt)
-    # Add the reference rulers.
+        labels.append(_text_path(-w - tick_size, _y, ascii_uppercase[i], size))
+        labels.append(_text_path(w + tick_size, _y, ascii_uppercase[i], size, rotation=90.))
+    widths = [mm_to_points(line_width)] * len(segments)
+    # The reference rulers.
     delta = 5.
     span = 0.75
+    size = text_size * font_scalings['small']
     l = 10 * int((span * w) / 10.)
-    hruler(h - delta, -l, l)
+    ruler_segments, ruler_labels = hruler_geometry(h - delta, -l, l, ruler_step, size)
+    segments += ruler_segments
+    labels += ruler_labels
     l = 10 * int((span * h) / 10.)
-    vruler(-w + delta, -l, l)
-    box = BlueprintBox(name, author)
+    ruler_segments, ruler_labels = vruler_geometry(-w + delta, -l, l, ruler_step, size)
+    segments += ruler_segments
+    labels += ruler_labels
+    widths += [mm_to_points(ruler_line_width)] * (len(segments) - len(widths))
+    segments = np.array(segments, dtype=float)
+    segments.flags.writeable = False
+    return segments, tuple(widths), tuple(labels)
+
+
+def blueprint(name: str, size: str, author=None, orientation: str = 'Landscape',
+              dpi: float = 100., text_size: float = 3., line_width: float = 0.25,
+              margin: float = 0.05, pitch: float = 50., tick_size: float = 7.5,
+              pyplot: bool = True, date: str = None):
+    """Create a custom figure for techical drawings, and return the
+    corresponding rendering context.
+
+    The date printed in the title box defaults to the current time.
+
+    By default the figure is created through pyplot (and becomes the current
+    pyplot figure), and the page style is set in the global matplotlib
+    configuration, so that plain pyplot calls keep working as expected. If
+    pyplot is False, a standalone figure is created without touching any global
+    state, and the page style is only carried by the rendering context, that
+    should be made current (e.g., in a with statement) for the draw methods to
+    target it. This allows to render different blueprints concurrently.
+    """
+    width, height = paper_dimensions(size, orientation)
+    if pyplot:
+        # Setup the page and create an empty figure.
+        setup_page((width, height), dpi, text_size, line_width)
+        figure = plt.figure(name)
+    else:
+        figsize = (mm_to_inches(width), mm_to_inches(height))
+        figure = matplotlib.figure.Figure(figsize=figsize, dpi=dpi)
+    context = RenderContext(figure, figure.gca(), text_size, line_width)
+    # Setup the axes.
+    ax = context.axes
+    ax.set_aspect('equal')
+    hmargin = margin
+    vmargin = hmargin * width / height
+    figure.subplots_adjust(left=hmargin, right=1. - hmargin, top=1. - vmargin, bottom=vmargin)
+    ax.set_xticks([])
+    ax.set_yticks([])
+    w, h = drawing_area(width, height, margin)
+    ax.axis([-w, w, -h, h])
+    # Add the reference grid on the borders and the reference rulers, that are
+    # cached and stamped onto the figure as a couple of artists.
+    stamp(*blueprint_frame(width, height, margin, pitch, tick_size, text_size, line_width), ax)
+    BlueprintBox(name, author, context, date)
+    return context
@@ -20,7 +20,7 @@
 
 import numpy as np
 
-from metalute.geometry import Line, SpiralArc, ParametricPolyPathBase
+from metalute.geometry import Line, SpiralArc, SpiralRadius, ParametricPolyPathBase
 
 
 class MusicManAxis(ParametricPolyPathBase):
@@ -29,9 +29,12 @@ class MusicManAxis(ParametricPolyPathBase):
 
     Warning
     -------
-    The last circle arc is not exactly right, in that the first and last
-    point do not connect. In principle the last two parameters should be
-    computable by imposing that the path closes correctly.
+    With the default parameters the last circle arc is not exactly right, in
+    that the first and last point do not connect. The last two parameters can
+    be computed by imposing that the path closes correctly, i.e.,
+
+    >>> body = MusicManAxis()
+    >>> body.solve_closure('r13', 'span13')
     """
 
     DEFAULT_PAR_DICT =  {'d1': 240.00,
@@ -78,7 +81,7 @@ class MusicManAxis(ParametricPolyPathBase):
         """
         c = self.anchor.hmove(self.d1)
         params = self.m1, self.q1, self.scale1, self.gamma1
-        radius = lambda phi: MusicManAxis.big_radius(phi, *params)
+        radius = SpiralRadius(MusicManAxis.big_radius, params)
         arc1 = SpiralArc(c, radius, self.start_phi1, self.span1)
         line1 = arc1.connecting_line(self.d2)
         arc3 = line1.connecting_circular_arc(self.r3, self.span3)
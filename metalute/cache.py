@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Content-addressed, on-disk cache for the rendered blueprints.
+
+Each rendered file is stored under a key that is the SHA-256 digest of
+everything that goes into the drawing, i.e., the fully qualified name of the
+class of the object being drawn, the parameters passed to it, the paper
+settings, the output format and the package version. Mind we also include a
+digest of all the package sources in the key, so that the cache is implicitly
+invalidated whenever any code changes, even without a version bump.
+
+Mind the date printed in the title box of the blueprints is not frozen, but is
+included in the key with the resolution of a day (see the batch module), i.e.,
+cached files are reused within the same day, and rendered again afterwards.
+
+Along with each file we store a small JSON sidecar with the metadata (in
+plain text) used to build the key, so that the entries can be listed and
+selectively invalidated. The cache is bounded in size, and the least recently
+used entries are evicted first (the modification time of the files is bumped
+at each hit, for this purpose).
+
+The cache can be managed from the command line, e.g.
+
+>>> python -m metalute.cache list
+>>> python -m metalute.cache invalidate HumbuckerRoutingTemplate
+
+lists all the entries, and removes all the entries for a given class.
+"""
+
+import argparse
+import functools
+import glob
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from metalute import __version__, ROOT_FOLDER
+
+
+DEFAULT_CACHE_FOLDER = os.environ.get('METALUTE_CACHE_FOLDER',
+                                      os.path.join(os.path.expanduser('~'), '.cache', 'metalute'))
+DEFAULT_CACHE_MAX_SIZE = 256 * 1024**2
+
+
+@functools.lru_cache()
+def source_digest() -> str:
+    """Return the (cached) SHA-256 digest of all the Python sources of the
+    package.
+    """
+    digest = hashlib.sha256()
+    for file_path in sorted(glob.glob(os.path.join(ROOT_FOLDER, '*.py'))):
+        digest.update(os.path.basename(file_path).encode())
+        with open(file_path, 'rb') as input_file:
+            digest.update(input_file.read())
+    return digest.hexdigest()
+
+
+def qualified_name(factory) -> str:
+    """Return the fully qualified name of a factory, i.e., of a class or of a
+    generic callable.
+
+    Classes and functions are identified by their own module and qualified
+    name, and partial objects by the name of the underlying callable, along
+    with the bound arguments. Anything else falls back to its repr().
+    """
+    if isinstance(factory, functools.partial):
+        return f'{qualified_name(factory.func)}(*{factory.args!r}, **{factory.keywords!r})'
+    try:
+        return f'{factory.__module__}.{factory.__qualname__}'
+    except AttributeError:
+        return repr(factory)
+
+
+def cache_metadata(design, params: dict = None, paper: dict = None, fmt: str = 'pdf') -> dict:
+    """Return the dictionary of metadata identifying a rendered file.
+
+    Parameters
+    ----------
+    design : callable
+        The factory (e.g., the class) of the object being drawn.
+
+    params : dict, optional
+        The parameters of the object (and of the draw method, if any). Mind
+        they must be serializable in JSON, and anything that is not is
+        represented by its repr().
+
+    paper : dict, optional
+        The paper settings (e.g., size and orientation).
+
+    fmt : str
+        The output format (i.e., the file extension).
+    """
+    return dict(design=qualified_name(design), params=params or {}, paper=paper or {},
+                format=fmt.lstrip('.').lower(), version=__version__, source=source_digest())
+
+
+def cache_key(metadata: dict) -> str:
+    """Return the cache key (i.e., the hex SHA-256 digest of the canonical JSON
+    representation) for a dictionary of metadata.
+    """
+    text = json.dumps(metadata, sort_keys=True, default=repr)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+
+class RenderCache:
+
+    """On-disk, size-bounded LRU cache of rendered files.
+
+    Mind the cache only stores plain files in a single folder, and all the
+    operations are safe with respect to several processes sharing the same
+    folder (e.g., the workers of a batch), in the sense that each file is
+    written atomically and entries disappearing under our feet (e.g., evicted
+    by another process) are simply treated as misses.
+
+    Parameters
+    ----------
+    folder : str, optional
+        The path to the cache folder (created if needed).
+
+    max_size : int, optional
+        The maximum size of the cache (in bytes).
+    """
+
+    METADATA_EXT = '.json'
+
+    def __init__(self, folder: str = None, max_size: int = DEFAULT_CACHE_MAX_SIZE):
+        """Constructor.
+        """
+        self.folder = folder or DEFAULT_CACHE_FOLDER
+        self.max_size = max_size
+        os.makedirs(self.folder, exist_ok=True)
+
+    def file_path(self, key: str, fmt: str) -> str:
+        """Return the path to the cached file for a given key and format.
+        """
+        return os.path.join(self.folder, f'{key}.{fmt}')
+
+    def _metadata_path(self, key: str) -> str:
+        """Return the path to the metadata sidecar for a given key.
+        """
+        return os.path.join(self.folder, f'{key}{self.METADATA_EXT}')
+
+    def get(self, metadata: dict):
+        """Return the path to the cached file for a given set of metadata, or
+        None if the file is not in the cache.
+        """
+        file_path = self.file_path(cache_key(metadata), metadata['format'])
+        try:
+            # Mind this marks the entry as the most recently used.
+            os.utime(file_path)
+        except FileNotFoundError:
+            return None
+        return file_path
+
+    def fetch(self, metadata: dict, output_file_path: str) -> bool:
+        """Copy the cached file for a given set of metadata to a given path,
+        and return True in case of hit, or False in case of miss.
+        """
+        file_path = self.get(metadata)
+        if file_path is None:
+            return False
+        try:
+            shutil.copyfile(file_path, output_file_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _write(self, file_path: str, data: bytes):
+        """Write some data to a file atomically.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, prefix='.tmp')
+        with os.fdopen(fd, 'wb') as output_file:
+            output_file.write(data)
+        os.replace(tmp_path, file_path)
+
+    def put(self, metadata: dict, file_path: str) -> str:
+        """Store a copy of a given file in the cache, and return the path to
+        the cached file.
+        """
+        key = cache_key(metadata)
+        cached_file_path = self.file_path(key, metadata['format'])
+        with open(file_path, 'rb') as input_file:
+            self._write(cached_file_path, input_file.read())
+        self._write(self._metadata_path(key), json.dumps(metadata, default=repr).encode())
+        self.evict()
+        return cached_file_path
+
+    def entries(self):
+        """Return a list of (key, metadata, file path, size, last access time)
+        tuples for all the entries in the cache, sorted from the least to the
+        most recently used.
+        """
+        entries = []
+        for metadata_path in glob.glob(os.path.join(self.folder, f'*{self.METADATA_EXT}')):
+            key = os.path.basename(metadata_path)[:-len(self.METADATA_EXT)]
+            try:
+                with open(metadata_path) as input_file:
+                    metadata = json.load(input_file)
+                file_path = self.file_path(key, metadata['format'])
+                stat = os.stat(file_path)
+            except (FileNotFoundError, ValueError):
+                continue
+            entries.append((key, metadata, file_path, stat.st_size, stat.st_mtime))
+        entries.sort(key=lambda entry: entry[4])
+        return entries
+
+    def size(self) -> int:
+        """Return the total size (in bytes) of the cached files.
+        """
+        return sum(entry[3] for entry in self.entries())
+
+    def _remove(self, key: str, fmt: str):
+        """Remove a single entry.
+        """
+        for file_path in (self.file_path(key, fmt), self._metadata_path(key)):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+
+    def evict(self, max_size: int = None):
+        """Evict the least recently used entries until the size of the cache
+        is within a given limit (by default, the maximum size of the cache),
+        and return the number of entries evicted.
+        """
+        if max_size is None:
+            max_size = self.max_size
+        entries = self.entries()
+        size = sum(entry[3] for entry in entries)
+        num_evicted = 0
+        for key, metadata, _, file_size, _ in entries:
+            if size <= max_size:
+                break
+            self._remove(key, metadata['format'])
+            size -= file_size
+            num_evicted += 1
+        return num_evicted
+
+    def invalidate(self, pattern: str = None):
+        """Remove all the entries whose key starts with a given string, or whose
+        class name contains it (all the entries if the pattern is None), and
+        return the number of entries removed.
+        """
+        num_removed = 0
+        for key, metadata, _, _, _ in self.entries():
+            if pattern is None or key.startswith(pattern) or pattern in metadata['design']:
+                self._remove(key, metadata['format'])
+                num_removed += 1
+        return num_removed
+
+
+
+def main(args=None):
+    """Command-line interface.
+    """
+    parser = argparse.ArgumentParser(description='Manage the render cache.')
+    parser.add_argument('command', choices=('list', 'invalidate', 'evict'),
+                        help='list, invalidate or evict the cache entries')
+    parser.add_argument('pattern', nargs='?', default=None,
+                        help='only invalidate the entries matching a key prefix or class name')
+    parser.add_argument('--folder', default=DEFAULT_CACHE_FOLDER, help='the cache folder')
+    parser.add_argument('--max-size', type=float, default=DEFAULT_CACHE_MAX_SIZE / 1024**2,
+                        help='the maximum size of the cache in MB (for evict)')
+    args = parser.parse_args(args)
+    cache = RenderCache(args.folder, int(args.max_size * 1024**2))
+    if args.command == 'list':
+        entries = cache.entries()
+        for key, metadata, _, size, mtime in entries:
+            paper = ' '.join(str(value) for value in metadata['paper'].values())
+            print(f'{key[:12]} {metadata["design"]} {metadata["format"]} {paper} '
+                  f'({size / 1024:.1f} kB, {time.ctime(mtime)})')
+        print(f'{len(entries)} entries, {sum(entry[3] for entry in entries) / 1024**2:.2f} MB '
+              f'in {cache.folder}')
+    elif args.command == 'invalidate':
+        print(f'{cache.invalidate(args.pattern)} entries invalidated.')
+    elif args.command == 'evict':
+        print(f'{cache.evict()} entries evicted.')
+    return 0
+
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
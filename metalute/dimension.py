@@ -19,7 +19,8 @@
 """
 
 from metalute.geometry import Point, Line, CircularArc
-from metalute.matplotlib_ import plt
+from metalute.matplotlib_ import current_context
+from metalute.transform import as_transform
 
 
 class Arrow(Line):
@@ -43,8 +44,9 @@ class Arrow(Line):
 def dim(p1, p2, offset, padding: float = 2., distance: float = 15., margin: float = 5.):
     """
     """
-    p1 += offset
-    p2 += offset
+    offset = as_transform(offset)
+    p1 = Point(*offset.apply_point(p1))
+    p2 = Point(*offset.apply_point(p2))
     fmt = dict(offset=Point(0., 0.), color='lightgray')
     # Basic setup.
     line = Line(p1, p2)
@@ -66,7 +68,7 @@ def dim(p1, p2, offset, padding: float = 2., distance: float = 15., margin: floa
     elif rot > 90:
         rot -= 180
     print(rot)
-    plt.text(*m.xy(), text, rotation=rot, ha='center', va='center')
+    current_context().text(*m.xy(), text, rotation=rot, ha='center', va='center')
     _d = 1.2 * len(text)
     Arrow(m.move(_d, phi - 90.), _p1).draw(**fmt)
     Arrow(m.move(_d, phi + 90.), _p2).draw(**fmt)
@@ -80,7 +82,7 @@ def vdim(p1, p2, offset, padding: float = 2., distance: float = 15., margin: flo
     _p1 = Point(xmax, p1.y)
     _p2 = Point(xmax, p2.y)
     if p1.x > p2.x:
-        Line(p2, _p2).draw(offset + Point(padding, 0.), **fmt)
+        Line(p2, _p2).draw(as_transform(offset).translate(padding, 0.), **fmt)
     else:
-        Line(p1, _p1).draw(offset + Point(padding, 0.), **fmt)
+        Line(p1, _p1).draw(as_transform(offset).translate(padding, 0.), **fmt)
     dim(_p1, _p2, offset, padding, distance, margin)
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Native DXF writer.
+
+This module writes geometrical objects to DXF files in the (old, but
+ubiquitous) R12 format, that virtually any CAD/CAM program can import. Each of
+the elementary drawing primitives an object is made of is mapped onto a single
+native entity, i.e., straight segments are written as LINE entities, circular
+arcs as ARC entities and full circles as CIRCLE entities, so that the exact
+geometry is preserved. Only the paths that cannot be represented in terms of
+lines and circular arcs (e.g., spirals) are tessellated, and written as
+POLYLINE entities.
+
+Layers are declared upfront in the header of the file, and the entities are
+then streamed to the underlying file handle one object at a time. All the
+coordinates are in mm.
+"""
+
+import contextlib
+
+import numpy as np
+
+from metalute.primitives import LinePrimitive, ArcPrimitive, CirclePrimitive, PolylinePrimitive
+from metalute.spatial import connectivity
+from metalute.transform import as_transform
+
+
+DEFAULT_DXF_TOLERANCE = 0.01
+
+# The color of all the layers, in the AutoCAD Color Index (7 is black/white).
+DEFAULT_LAYER_COLOR = 7
+
+
+def _group(code: int, value) -> str:
+    """Return a DXF group, i.e., a group code and the corresponding value on
+    two separate lines.
+    """
+    if isinstance(value, float):
+        value = '{:.6f}'.format(value)
+    return '{:d}\n{}\n'.format(code, value)
+
+
+def _point(x: float, y: float, code: int = 10) -> str:
+    """Return the groups for a point on the xy plane.
+    """
+    return _group(code, float(x)) + _group(code + 10, float(y)) + _group(code + 20, 0.)
+
+
+def _section(name: str) -> str:
+    """Return the opening groups for a given section.
+    """
+    return _group(0, 'SECTION') + _group(2, name)
+
+
+def _linetype_table() -> str:
+    """Return the LTYPE table, defining the CONTINUOUS linetype referenced by
+    all the layers.
+    """
+    return _group(0, 'TABLE') + _group(2, 'LTYPE') + _group(70, 1) +\
+        _group(0, 'LTYPE') + _group(2, 'CONTINUOUS') + _group(70, 0) +\
+        _group(3, 'Solid line') + _group(72, 65) + _group(73, 0) + _group(40, 0.) +\
+        _group(0, 'ENDTAB')
+
+
+def _layer_table(layers) -> str:
+    """Return the LAYER table for a sequence of layer names.
+    """
+    text = _group(0, 'TABLE') + _group(2, 'LAYER') + _group(70, len(layers))
+    for name in layers:
+        text += _group(0, 'LAYER') + _group(2, name) + _group(70, 0) +\
+            _group(62, DEFAULT_LAYER_COLOR) + _group(6, 'CONTINUOUS')
+    return text + _group(0, 'ENDTAB')
+
+
+def _polyline_entities(vertices, layer: str) -> str:
+    """Return the POLYLINE entities for a set of vertices, with rows of NaNs
+    separating disconnected pieces.
+    """
+    text = ''
+    pieces = [[]]
+    for x, y in vertices:
+        if x != x or y != y:
+            pieces.append([])
+        else:
+            pieces[-1].append((x, y))
+    for piece in pieces:
+        if len(piece) < 2:
+            continue
+        text += _group(0, 'POLYLINE') + _group(8, layer) + _group(66, 1) +\
+            _point(0., 0.) + _group(70, 0)
+        for x, y in piece:
+            text += _group(0, 'VERTEX') + _group(8, layer) + _point(x, y)
+        text += _group(0, 'SEQEND') + _group(8, layer)
+    return text
+
+
+def entities(primitives, layer: str = '0') -> str:
+    """Convert a sequence of drawing primitives into the corresponding DXF
+    entities on a given layer.
+
+    Mind that DXF arcs always run counterclockwise, i.e., arcs with a negative
+    span are written from the end point to the start point, and arcs spanning
+    a full turn are written as circles.
+
+    The end points of all the lines and poly-lines are snapped onto the welded
+    end points of the primitives (see metalute.spatial.connectivity()), so
+    that the entities joining each other share the very same coordinates, and
+    the CAD software joins them consistently with our own gap checks.
+    """
+    primitives = list(primitives)
+    points, edges, _ = connectivity(primitives)
+    edges = iter(edges)
+    text = ''
+    for primitive in primitives:
+        if not isinstance(primitive, CirclePrimitive):
+            start, end = (points[i] for i in next(edges))
+        if isinstance(primitive, LinePrimitive):
+            text += _group(0, 'LINE') + _group(8, layer) +\
+                _point(*start) + _point(*end, code=11)
+        elif isinstance(primitive, ArcPrimitive) and abs(primitive.span) < 360.:
+            phi1, phi2 = sorted((primitive.start_phi, primitive.end_phi))
+            text += _group(0, 'ARC') + _group(8, layer) + _point(*primitive.center) +\
+                _group(40, float(primitive.radius)) + _group(50, float(phi1 % 360.)) +\
+                _group(51, float(phi2 % 360.))
+        elif isinstance(primitive, (CirclePrimitive, ArcPrimitive)):
+            text += _group(0, 'CIRCLE') + _group(8, layer) + _point(*primitive.center) +\
+                _group(40, float(primitive.radius))
+        elif isinstance(primitive, PolylinePrimitive):
+            vertices = np.array(primitive.vertices, dtype=float)
+            vertices[0], vertices[-1] = start, end
+            text += _polyline_entities(vertices, layer)
+        else:
+            raise RuntimeError('Unknown primitive {}'.format(primitive))
+    return text
+
+
+
+class DxfWriter:
+
+    """Streaming DXF writer.
+
+    The writer is meant to be used as a context manager, with the header
+    (including the layer table) written on entry and the end of the file
+    written on exit.
+
+    Parameters
+    ----------
+    file : file-like object
+        The (text) file handle to write to.
+
+    layers : sequence of str
+        The names of the layers.
+
+    tolerance : float
+        The sampling tolerance for the objects that cannot be represented in
+        terms of lines and circular arcs.
+    """
+
+    def __init__(self, file, layers=('0',), tolerance: float = DEFAULT_DXF_TOLERANCE):
+        """Constructor.
+        """
+        self.file = file
+        self.layers = list(layers)
+        self.tolerance = tolerance
+
+    def __enter__(self):
+        """Write the header, the tables and the opening of the entities
+        section.
+        """
+        self.file.write(_section('HEADER') + _group(9, '$ACADVER') + _group(1, 'AC1009') +
+                        _group(0, 'ENDSEC') + _section('TABLES') + _linetype_table() +
+                        _layer_table(self.layers) +
+                        _group(0, 'ENDSEC') + _section('ENTITIES'))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the entities section and write the end of the file.
+        """
+        self.file.write(_group(0, 'ENDSEC') + _group(0, 'EOF'))
+
+    def write_primitives(self, primitives, layer: str = '0', offset=None):
+        """Write a sequence of drawing primitives on a given layer.
+
+        The (optional) offset can be a Point or a Transform object, and is
+        applied to the primitives before they are written.
+        """
+        if layer not in self.layers:
+            raise RuntimeError('Undeclared DXF layer {}'.format(layer))
+        if offset is not None:
+            primitives = as_transform(offset).apply_primitives(primitives)
+        self.file.write(entities(primitives, layer))
+
+    def write(self, obj, layer: str = '0', offset=None):
+        """Write an object (i.e., anything with a primitives() method) on a
+        given layer.
+        """
+        self.write_primitives(obj.primitives(self.tolerance), layer, offset)
+
+
+
+def write_dxf(file_path, parts, offset=None, tolerance: float = DEFAULT_DXF_TOLERANCE):
+    """Write a set of objects to a DXF file, with one layer for each part.
+
+    Parameters
+    ----------
+    file_path : str or file-like object
+        The path to the output file, or an open (text) file handle.
+
+    parts : dict
+        A dictionary mapping the layer names to the objects (or sequences of
+        objects) to be written on each layer, e.g., {'HEAD': head, 'PICKUPS':
+        [neck, bridge]}. All the objects must implement the primitives()
+        method.
+
+    offset : Point or Transform object, optional
+        The offset applied to all the objects.
+    """
+    if hasattr(file_path, 'write'):
+        output_file = contextlib.nullcontext(file_path)
+    else:
+        output_file = open(file_path, 'w')
+    with output_file as _file, DxfWriter(_file, parts.keys(), tolerance) as writer:
+        for layer, objects in parts.items():
+            if not isinstance(objects, (list, tuple)):
+                objects = [objects]
+            for obj in objects:
+                writer.write(obj, layer, offset)
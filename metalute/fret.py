@@ -21,9 +21,9 @@
 from dataclasses import dataclass
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 from metalute.dimension import dim
+from metalute.matplotlib_ import current_context
 
 
 @dataclass
@@ -130,9 +130,10 @@ class Fretboard:
         w2 = 0.5 * self.width_at_reference_fret
         x = np.array([0., 0., -l, -l, 0.]) + x0
         y = np.array([-w1, w1, w2, -w2, -w1]) + y0
-        plt.plot(x, y, **kwargs)
+        context = current_context()
+        context.plot(x, y, **kwargs)
         if axis:
-            plt.hlines(y0, x0, x0 -self.scale_length, ls='dashed', color='lightgray')
+            context.hlines(y0, x0, x0 -self.scale_length, ls='dashed', color='lightgray')
         if dimensioning:
             hdim(-w2 - 5., x0, x0 - self.fret_distance_to_nut(12))
             hdim(-w2 - 15., x0, x0 - l)
@@ -144,14 +145,15 @@ class Fretboard:
         x0, y0 = position
         x = -self.fret_grid + x0
         y = 0.5 * self.width(self.fret_grid) + y0
-        plt.vlines(x, -y, y)
+        context = current_context()
+        context.vlines(x, -y, y)
         if indices:
+            from metalute.matplotlib_ import matplotlib
             fmt = dict(size=15, ha='center', va='center')
             _y = y.max() + 6.
             for i, _x, in enumerate(x):
-                plt.text(_x, _y, '{}'.format(i + 1), **fmt)
-                circle = plt.Circle((_x, _y), radius=4., fill=False)
-                plt.gca().add_patch(circle)
+                context.text(_x, _y, '{}'.format(i + 1), **fmt)
+                context.patch(matplotlib.patches.Circle, (_x, _y), radius=4., fill=False)
 
     def draw_bridge_reference(self, position):
         """
@@ -159,7 +161,7 @@ class Fretboard:
         x0, y0 = position
         x = x0 - self.scale_length
         y = 80.
-        plt.vlines(x, -y, y)
+        current_context().vlines(x, -y, y)
 
     def draw(self, position=(0., 0)):
         """
@@ -19,7 +19,6 @@
 """
 
 import numpy
-import pandas as pd
 
 from metalute.units import inches_to_mm, newton_to_pounds
 from metalute.pitch import GUITAR_STANDARD_TUNING
@@ -89,6 +88,8 @@ class StringGauge:
     def data_frame(self, scale_length, tuning=GUITAR_STANDARD_TUNING):
         """Return a pandas data frame with all the relevant info.
         """
+        # Mind pandas is imported lazily, as it is only needed here.
+        import pandas as pd
         tensions = self.tensions(scale_length, tuning)
         data = {'Note': tuning.notes,
                 'Diameter [in]': self.diameters,
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""G-code generation for routing.
+
+This module turns the exact contours of the routings (and the centering holes
+of the routing templates) into G-code toolpaths, using native circular
+interpolation (G2/G3) for all the circular arcs, and straight moves (G1) for
+lines and for the paths that need to be tessellated (e.g., spirals).
+
+The tool radius compensation is done on our side, by offsetting the contours
+(see ParametricPolyPathBase.offset()), rather than relying on the G41/G42
+compensation of the controller. All the contours are routed in multiple passes
+at increasing depth, with tangent arc lead-ins and lead-outs, and all the
+functions in this module are generators yielding one line of G-code at a time,
+so that long programs can be streamed to disk without ever being built in
+memory.
+
+All the coordinates are in mm, with z = 0 on the top surface of the workpiece.
+"""
+
+from dataclasses import dataclass, replace
+import contextlib
+import math
+
+from metalute.geometry import Circle, DEFAULT_SAMPLING_TOLERANCE
+from metalute.mass import primitive_moments
+from metalute.primitives import LinePrimitive, ArcPrimitive, CirclePrimitive,\
+    PolylinePrimitive, connected
+from metalute.spatial import joints, DEFAULT_WELDING_TOLERANCE
+
+
+
+@dataclass
+class MillingParameters:
+
+    """Small container class for the milling parameters.
+
+    Mind the lead-in radius is capped to the tool radius, and setting it to
+    zero disables lead-ins and lead-outs altogether.
+    """
+
+    tool_diameter : float = 6.35
+    depth : float = 18.
+    depth_per_pass : float = 3.
+    safe_height : float = 5.
+    feed_rate : float = 1000.
+    plunge_rate : float = 250.
+    spindle_speed : int = 18000
+    lead_in_radius : float = 2.
+
+    def __post_init__(self):
+        """Make sure the parameters make sense.
+        """
+        assert self.tool_diameter > 0.
+        assert self.depth > 0.
+        assert self.depth_per_pass > 0.
+
+    @property
+    def tool_radius(self) -> float:
+        """Return the tool radius.
+        """
+        return 0.5 * self.tool_diameter
+
+    def depths(self):
+        """Return the list of the z coordinates of the passes, the last one
+        being at the full depth.
+        """
+        num_passes = math.ceil(self.depth / self.depth_per_pass - 1.e-9)
+        return [-min((i + 1) * self.depth_per_pass, self.depth) for i in range(num_passes)]
+
+
+
+def _fmt(value: float) -> str:
+    """Format a coordinate, with a fixed precision of 1 um.
+    """
+    text = '{:.3f}'.format(value).rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+
+def _arc_moves(start, center, radius: float, start_phi: float, span: float):
+    """Yield the G2/G3 moves for a circular arc, from a given start point.
+
+    Arcs spanning more than 180 degrees are split in two halves, so that full
+    circles are handled seamlessly, and the center is always written in
+    incremental (I, J) form.
+    """
+    command = 'G3' if span > 0. else 'G2'
+    num_pieces = 2 if abs(span) > 180. else 1
+    cx, cy = center
+    x0, y0 = start
+    for i in range(1, num_pieces + 1):
+        phi = math.radians(start_phi + span * i / num_pieces)
+        x = cx + radius * math.cos(phi)
+        y = cy + radius * math.sin(phi)
+        yield '{} X{} Y{} I{} J{}'.format(command, _fmt(x), _fmt(y), _fmt(cx - x0), _fmt(cy - y0))
+        x0, y0 = x, y
+
+
+def primitive_moves(primitives, z: float, params: MillingParameters):
+    """Yield the moves for cutting a sequence of drawing primitives at a given
+    depth.
+
+    The tool is assumed to be at the start point of the first primitive, at
+    the given depth, and whenever a primitive is not connected to the previous
+    one, according to the welding rule in metalute.spatial.joints() (or across
+    rows of NaNs in poly-lines, with the same tolerance) the tool is retracted
+    and plunged again at the start of the next piece.
+    """
+    primitives = list(primitives)
+    last = None
+
+    def _move_to(point):
+        yield 'G0 Z{}'.format(_fmt(params.safe_height))
+        yield 'G0 X{} Y{}'.format(_fmt(point[0]), _fmt(point[1]))
+        yield 'G1 Z{} F{}'.format(_fmt(z), _fmt(params.plunge_rate))
+        yield 'G1 F{}'.format(_fmt(params.feed_rate))
+
+    for primitive, joined in zip(primitives, joints(primitives)):
+        if last is not None and not joined:
+            yield from _move_to(primitive.start_point())
+        if isinstance(primitive, LinePrimitive):
+            yield 'G1 X{} Y{}'.format(_fmt(primitive.end[0]), _fmt(primitive.end[1]))
+        elif isinstance(primitive, ArcPrimitive):
+            yield from _arc_moves(primitive.start_point(), *primitive)
+        elif isinstance(primitive, CirclePrimitive):
+            yield from _arc_moves(primitive.start_point(), primitive.center, primitive.radius, 0., 360.)
+        elif isinstance(primitive, PolylinePrimitive):
+            broken = False
+            last = primitive.start_point()
+            for x, y in primitive.vertices[1:]:
+                if x != x or y != y:
+                    broken = True
+                    continue
+                if broken:
+                    if not connected(last, (x, y), DEFAULT_WELDING_TOLERANCE):
+                        yield from _move_to((x, y))
+                    broken = False
+                else:
+                    yield 'G1 X{} Y{}'.format(_fmt(x), _fmt(y))
+                last = (x, y)
+        else:
+            raise RuntimeError('Unknown primitive {}'.format(primitive))
+        last = primitive.end_point()
+
+
+def _start_tangent(primitive):
+    """Return the unit tangent to a primitive at the start point.
+    """
+    if isinstance(primitive, ArcPrimitive):
+        phi = math.radians(primitive.start_phi)
+        sign = math.copysign(1., primitive.span)
+        return (-sign * math.sin(phi), sign * math.cos(phi))
+    if isinstance(primitive, CirclePrimitive):
+        return (0., 1.)
+    if isinstance(primitive, LinePrimitive):
+        (x1, y1), (x2, y2) = primitive
+    else:
+        (x1, y1), (x2, y2) = primitive.vertices[:2]
+    norm = math.hypot(x2 - x1, y2 - y1)
+    return ((x2 - x1) / norm, (y2 - y1) / norm)
+
+
+def _end_tangent(primitive):
+    """Return the unit tangent to a primitive at the end point.
+    """
+    if isinstance(primitive, ArcPrimitive):
+        phi = math.radians(primitive.end_phi)
+        sign = math.copysign(1., primitive.span)
+        return (-sign * math.sin(phi), sign * math.cos(phi))
+    if isinstance(primitive, CirclePrimitive):
+        return (0., 1.)
+    if isinstance(primitive, LinePrimitive):
+        (x1, y1), (x2, y2) = primitive
+    else:
+        (x1, y1), (x2, y2) = primitive.vertices[-2:]
+    norm = math.hypot(x2 - x1, y2 - y1)
+    return ((x2 - x1) / norm, (y2 - y1) / norm)
+
+
+def _lead_arc(point, tangent, side: float, radius: float, lead_in: bool):
+    """Return the tangent quarter-circle lead-in (or lead-out) to (or from) a
+    given point, on a given side (+1 for left, -1 for right) of the direction
+    of travel.
+    """
+    tx, ty = tangent
+    # Unit vector pointing from the point to the center of the arc.
+    ux, uy = -side * ty, side * tx
+    center = (point[0] + radius * ux, point[1] + radius * uy)
+    phi = math.degrees(math.atan2(-uy, -ux))
+    if lead_in:
+        return ArcPrimitive(center, radius, phi - side * 90., side * 90.)
+    return ArcPrimitive(center, radius, phi, side * 90.)
+
+
+def contour_toolpath(contour, params: MillingParameters, compensation: str = 'inside',
+                     tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+    """Yield the G-code moves for routing a contour in multiple passes.
+
+    Parameters
+    ----------
+    contour : Path object
+        The contour to be routed (typically a closed ParametricPolyPathBase).
+
+    params : MillingParameters object
+        The milling parameters.
+
+    compensation : str
+        The side of the contour where the tool is ('inside' for pockets,
+        'outside' for profiles, or None for no tool radius compensation).
+        Mind that this is defined with respect to the orientation of the
+        contour, i.e., the inside is on the left of a counterclockwise contour.
+
+    tolerance : float
+        The sampling tolerance for the paths that need to be tessellated.
+    """
+    primitives = contour.primitives(tolerance)
+    orientation = math.copysign(1., primitive_moments(primitives)[0])
+    if compensation is None:
+        side = orientation
+    else:
+        side = {'inside': orientation, 'outside': -orientation}[compensation]
+        primitives = contour.offset(side * params.tool_radius, tolerance).primitives(tolerance)
+    lead_in = lead_out = None
+    radius = min(params.lead_in_radius, params.tool_radius)
+    if radius > 0.:
+        lead_in = _lead_arc(primitives[0].start_point(), _start_tangent(primitives[0]),
+                            side, radius, True)
+        lead_out = _lead_arc(primitives[-1].end_point(), _end_tangent(primitives[-1]),
+                             side, radius, False)
+        primitives = [lead_in] + primitives + [lead_out]
+    x, y = primitives[0].start_point()
+    yield '(Contour: {})'.format(getattr(contour, 'name', None) or contour.__class__.__name__)
+    for z in params.depths():
+        yield 'G0 Z{}'.format(_fmt(params.safe_height))
+        yield 'G0 X{} Y{}'.format(_fmt(x), _fmt(y))
+        yield 'G1 Z{} F{}'.format(_fmt(z), _fmt(params.plunge_rate))
+        yield 'G1 F{}'.format(_fmt(params.feed_rate))
+        yield from primitive_moves(primitives, z, params)
+    yield 'G0 Z{}'.format(_fmt(params.safe_height))
+
+
+def drilling_toolpath(holes, params: MillingParameters):
+    """Yield the G-code moves for drilling a set of holes (i.e., any circle
+    with a center and a radius).
+
+    Holes that are not larger than the tool are simply drilled in multiple
+    pecks, while larger holes are routed along their circumference, with
+    the tool radius compensation.
+    """
+    yield '(Holes)'
+    for hole in holes:
+        radius = hole.radius - params.tool_radius
+        if radius <= 1.e-3:
+            cx, cy = hole.center.xy()
+            yield 'G0 Z{}'.format(_fmt(params.safe_height))
+            yield 'G0 X{} Y{}'.format(_fmt(cx), _fmt(cy))
+            for z in params.depths():
+                yield 'G1 Z{} F{}'.format(_fmt(z), _fmt(params.plunge_rate))
+                yield 'G0 Z{}'.format(_fmt(params.safe_height))
+        else:
+            # Mind the lead-in has to fit within the hole.
+            _params = replace(params, lead_in_radius=min(params.lead_in_radius, 0.5 * radius))
+            yield from contour_toolpath(Circle(hole.center, hole.radius), _params)
+
+
+def routing_toolpath(routing, params: MillingParameters, **kwargs):
+    """Yield the G-code moves for a pickup routing (i.e., the contour and the
+    optional drilling holes), with the keyword arguments passed to the holes()
+    method of the routing.
+    """
+    yield from contour_toolpath(routing.contour(), params, 'inside')
+    holes = routing.holes(**kwargs)
+    if holes:
+        yield from drilling_toolpath(holes, params)
+
+
+def template_toolpath(template, params: MillingParameters, **kwargs):
+    """Yield the G-code moves for a routing template, i.e., the centering holes
+    and, for pickup routing templates, the routing itself.
+    """
+    yield from drilling_toolpath(template.holes(), params)
+    routing = getattr(template, 'routing', None)
+    if routing is not None:
+        yield from routing_toolpath(routing, params, **kwargs)
+
+
+def program(toolpaths, params: MillingParameters):
+    """Yield a full G-code program from a sequence of toolpaths (i.e., of
+    generators of G-code lines), with the necessary preamble and epilogue.
+    """
+    yield '(Generated by metalute)'
+    yield 'G21 G90 G17'
+    yield 'G0 Z{}'.format(_fmt(params.safe_height))
+    yield 'M3 S{:d}'.format(int(params.spindle_speed))
+    for toolpath in toolpaths:
+        yield from toolpath
+    yield 'G0 Z{}'.format(_fmt(params.safe_height))
+    yield 'M5'
+    yield 'M30'
+
+
+def write_gcode(file_path, lines):
+    """Write a sequence of G-code lines to file, one line at a time.
+
+    Parameters
+    ----------
+    file_path : str or file-like object
+        The path to the output file, or an open (text) file handle.
+
+    lines : iterable of str
+        The G-code lines (typically the output of program()).
+    """
+    if hasattr(file_path, 'write'):
+        output_file = contextlib.nullcontext(file_path)
+    else:
+        output_file = open(file_path, 'w')
+    with output_file as _file:
+        for line in lines:
+            _file.write(line + '\n')
@@ -18,14 +18,148 @@
 """Geometry-related facilities.
 """
 
+from collections import namedtuple
+from functools import lru_cache, wraps
 from string import ascii_uppercase
 
 import numpy as np
 
-from metalute.matplotlib_ import matplotlib, plt
+from metalute.mass import MassProperties, primitive_moments, segment_moments, curve_moments
+from metalute import matplotlib_
+from metalute.matplotlib_ import current_context
+from metalute.primitives import LinePrimitive, ArcPrimitive, CirclePrimitive,\
+    PolylinePrimitive, bbox_union
+from metalute.spatial import PrimitiveIndex, PointWelder, connectivity, joints, nearest_point
+from metalute.transform import as_transform
 from metalute.units import mm_to_inches
 
 
+def __getattr__(name: str):
+    """Lazy access to the matplotlib and plt attributes (that used to be
+    imported in the module namespace), see the matplotlib_ module.
+    """
+    if name in ('matplotlib', 'plt'):
+        return getattr(matplotlib_, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+# Default tolerance (in mm) on the chord error for the sampling of the paths.
+DEFAULT_SAMPLING_TOLERANCE = 0.01
+
+# Log of the Path objects created during a traced construction (if any), see
+# ParametricPolyPathBase._traced_construct().
+_PATH_CREATION_LOG = None
+
+
+def _num_arc_segments(radius: float, span: float, tolerance: float) -> int:
+    """Return the minimum number of segments needed to approximate a circular
+    arc of a given radius and span (in degrees) with a maximum chord error
+    (i.e., sagitta) smaller than the given tolerance.
+    """
+    radius = abs(radius)
+    if radius == 0.:
+        return 1
+    delta = 2. * np.arccos(np.clip(1. - tolerance / radius, -1., 1.))
+    return max(int(np.ceil(np.radians(abs(span)) / delta)), 1)
+
+
+def adaptive_sample(func, tmin: float, tmax: float, tolerance: float,
+                     min_intervals: int = 8, max_iterations: int = 30,
+                     return_parameters: bool = False):
+    """Adaptive sampling of a generic parametric curve.
+
+    The curve is initially sampled on a coarse, uniform grid in the parameter,
+    and each interval is recursively split in two until the distance of the
+    point at the middle of the interval from the corresponding chord is smaller
+    than the tolerance. All the operations are vectorized over the intervals
+    that are being refined at any given iteration.
+
+    Parameters
+    ---------
+    func : callable
+        The parametric curve, accepting an array of parameter values and
+        returning the corresponding x and y arrays.
+
+    tmin, tmax : float
+        The extremes of the parameter range.
+
+    tolerance : float
+        The maximum chord error.
+
+    return_parameters : bool
+        If True, return the array of parameter values along with the vertices.
+    """
+    t = np.linspace(tmin, tmax, min_intervals + 1)
+    x, y = func(t)
+    for _ in range(max_iterations):
+        tm = 0.5 * (t[:-1] + t[1:])
+        xm, ym = func(tm)
+        dx = np.diff(x)
+        dy = np.diff(y)
+        chord = np.hypot(dx, dy)
+        err = np.where(chord > 0., np.abs((xm - x[:-1]) * dy - (ym - y[:-1]) * dx) /\
+            np.where(chord > 0., chord, 1.), np.hypot(xm - x[:-1], ym - y[:-1]))
+        mask = err > tolerance
+        if not mask.any():
+            break
+        idx = np.nonzero(mask)[0] + 1
+        t = np.insert(t, idx, tm[mask])
+        x = np.insert(x, idx, xm[mask])
+        y = np.insert(y, idx, ym[mask])
+    if return_parameters:
+        return t, np.column_stack((x, y))
+    return np.column_stack((x, y))
+
+
+def mpl_path(primitives):
+    """Convert a sequence of drawing primitives into a single (compound)
+    matplotlib.path.Path object.
+
+    Lines and poly-lines are mapped onto LINETO segments, circles and circular
+    arcs onto native cubic Bezier curves. Whenever a primitive starts where the
+    previous one ends (according to the welding rule in
+    metalute.spatial.joints()), the two are joined without a MOVETO, so that
+    the line joins are rendered properly.
+    """
+    # Mind matplotlib is imported lazily, the first time we need it.
+    from metalute.matplotlib_ import matplotlib
+    Path_ = matplotlib.path.Path
+    primitives = list(primitives)
+    vertices = []
+    codes = []
+    for primitive, joined in zip(primitives, joints(primitives)):
+        if isinstance(primitive, LinePrimitive):
+            _vertices = np.array(primitive, dtype=float)
+            _codes = np.array([Path_.MOVETO, Path_.LINETO])
+        elif isinstance(primitive, PolylinePrimitive):
+            _vertices = np.asarray(primitive.vertices, dtype=float)
+            _codes = np.full(len(_vertices), Path_.LINETO)
+            _codes[0] = Path_.MOVETO
+        elif isinstance(primitive, ArcPrimitive):
+            theta1, theta2 = sorted((primitive.start_phi, primitive.end_phi))
+            arc = Path_.arc(theta1, theta2)
+            _vertices = arc.vertices * primitive.radius + primitive.center
+            _codes = arc.codes
+            # Mind matplotlib arcs always run counterclockwise.
+            if primitive.span < 0.:
+                _vertices = _vertices[::-1]
+        elif isinstance(primitive, CirclePrimitive):
+            circle = Path_.circle(primitive.center, primitive.radius)
+            _vertices = circle.vertices
+            _codes = circle.codes
+        else:
+            raise RuntimeError('Unknown primitive {}'.format(primitive))
+        if joined:
+            _vertices = _vertices[1:]
+            _codes = _codes[1:]
+        vertices.append(_vertices)
+        codes.append(_codes)
+    if not vertices:
+        return Path_(np.empty((0, 2)))
+    return Path_(np.concatenate(vertices), np.concatenate(codes))
+
+
+
 class GeometricalEntity:
 
     """Base class for concrete geometrical entities.
@@ -40,6 +174,8 @@ class GeometricalEntity:
         The unique name of the entity
     """
 
+    __slots__ = ('name',)
+
     def __init__(self, name: str = None) -> None:
         """Constructor.
         """
@@ -82,6 +218,10 @@ class Point(GeometricalEntity):
 
     """Small utility class representing a point in two dimensions.
 
+    Point objects are immutable and use __slots__, so that they are cheap to
+    create in large numbers. The quantized coordinates used for comparisons and
+    hashing are calculated once, the first time they are needed, and cached.
+
     Parameters
     ---------
     x : float
@@ -94,12 +234,25 @@ class Point(GeometricalEntity):
         The unique name of the point
     """
 
+    __slots__ = ('x', 'y', '_key')
+
     def __init__(self, x: float = 0., y: float = 0., name: str = None):
         """Constructor.
         """
-        self.x = x
-        self.y = y
-        super().__init__(name)
+        object.__setattr__(self, 'x', x)
+        object.__setattr__(self, 'y', y)
+        object.__setattr__(self, 'name', name)
+
+    def __setattr__(self, name, value):
+        """Operator overload---Point objects are immutable.
+        """
+        raise AttributeError('Cannot set attribute {} of immutable {}'.format(name, self))
+
+    def __reduce__(self):
+        """Support for pickle and copy, which would otherwise bump into
+        __setattr__().
+        """
+        return (self.__class__, (self.x, self.y, self.name))
 
     @classmethod
     def __roundup(cls, val, digits=3):
@@ -112,21 +265,32 @@ class Point(GeometricalEntity):
         """
         return round(10**digits * val)
 
+    def _quantized(self):
+        """Return the (cached) quantized coordinates of the point.
+        """
+        try:
+            return self._key
+        except AttributeError:
+            key = (self.__roundup(self.x), self.__roundup(self.y))
+            object.__setattr__(self, '_key', key)
+            return key
+
     def __eq__(self, other):
         """Operator overload.
 
         This (along with the fellow __hash__()) is useful if we want remove
         duplicates from a list of points.
         """
-        return self.__roundup(self.x) == self.__roundup(other.x) and\
-               self.__roundup(self.y) == self.__roundup(other.y)
+        if not isinstance(other, Point):
+            return NotImplemented
+        return self._quantized() == other._quantized()
 
     def __hash__(self):
         """Operator overload.
 
         See the comment about __eq__().
         """
-        return hash((self.__roundup(self.x), self.__roundup(self.y)))
+        return hash(self._quantized())
 
     def __add__(self, other):
         """Operator overload.
@@ -160,9 +324,15 @@ class Point(GeometricalEntity):
     def distance_to(self, other) -> float:
         """Return the distance to another Point object.
         """
-        dx, dy = self - other
+        dx, dy = (self - other).xy()
         return np.sqrt(dx**2. + dy**2.)
 
+    def bbox(self):
+        """Return the (degenerate) bounding box (xmin, ymin, xmax, ymax) of
+        the point.
+        """
+        return (self.x, self.y, self.x, self.y)
+
     def text_info(self) -> str:
         """Overloaded method.
         """
@@ -197,25 +367,108 @@ class Point(GeometricalEntity):
 
     def draw(self, offset, ha: str = 'left', va: str = 'bottom', **kwargs):
         """Draw method.
+
+        Mind the offset can be either a Point or a Transform object, and in the
+        latter case the label (if any) is placed at the transformed position of
+        the point, but not rotated.
         """
         kwargs.setdefault('color', 'black')
         kwargs.setdefault('markersize', 4.)
-        x = self.x + offset.x
-        y = self.y + offset.y
-        plt.plot(x, y, 'o', **kwargs)
+        kwargs.update(transform=as_transform(offset).mpl_transform())
+        context = current_context()
+        context.plot(self.x, self.y, 'o', **kwargs)
         if self.name is not None:
             kwargs.pop('markersize')
-            plt.text(x, y, ' {}'.format(self.name), ha=ha, va=va, **kwargs)
+            context.text(self.x, self.y, ' {}'.format(self.name), ha=ha, va=va, **kwargs)
+
 
+class _PathCreationLog:
 
-class Path(GeometricalEntity):
+    """Small container class recording the paths created during a traced
+    construction, in order of creation.
+
+    Each entry is a two-element list [path, end], where end is the length of
+    the log after the creation of the path is completed (i.e., paths created
+    within the factory of another path come right after it in the log).
+
+    If a previous log is passed to the constructor, the first num_reused
+    entries are replayed from there, i.e., the corresponding factories are not
+    called again.
+    """
+
+    def __init__(self, previous=None, num_reused: int = 0):
+        """Constructor.
+        """
+        self.entries = []
+        self.previous = previous
+        self.num_reused = num_reused
+
+    def __len__(self) -> int:
+        """Return the number of paths created so far.
+        """
+        return len(self.entries)
+
+    def create(self, factory, *args, **kwargs):
+        """Create a new path through a given factory (or reuse the one from the
+        previous log).
+        """
+        start = len(self.entries)
+        if start < self.num_reused:
+            path, end = self.previous.entries[start]
+            self.entries += self.previous.entries[start:end]
+            return path
+        entry = [None, None]
+        self.entries.append(entry)
+        entry[0] = factory(*args, **kwargs)
+        entry[1] = len(self.entries)
+        return entry[0]
+
+
+def _traced_creation(method):
+    """Decorator for the methods creating a new path out of an existing one
+    (e.g., the connecting_xxx() methods), so that they are recorded in the
+    log of the traced construction in progress (if any).
+    """
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        if _PATH_CREATION_LOG is None:
+            return method(*args, **kwargs)
+        return _PATH_CREATION_LOG.create(method, *args, **kwargs)
+    return wrapper
+
+
+
+class _PathMeta(type):
+
+    """Metaclass for all the paths, recording their creation if a traced
+    construction is in progress.
+    """
+
+    def __call__(cls, *args, **kwargs):
+        """Overloaded method.
+        """
+        if _PATH_CREATION_LOG is None:
+            return super().__call__(*args, **kwargs)
+        return _PATH_CREATION_LOG.create(super().__call__, *args, **kwargs)
+
+
+
+class Path(GeometricalEntity, metaclass=_PathMeta):
 
     """Do nothing GeometricalEntity subclass.
 
     This is esentially to distinguish points from paths with the possible
     geometrical entities.
+
+    If a traced construction is in progress, the creation of all the paths is
+    logged, so that the order of creation can be recorded.
     """
 
+    def __init__(self, name: str = None) -> None:
+        """Constructor.
+        """
+        super().__init__(name)
+
     def draw_construction(self, offset, **kwargs):
         """Do-nothing method to provide a unified interface for drawing
         intermediate steps of path construction.
@@ -231,6 +484,91 @@ class Path(GeometricalEntity):
         """
         return []
 
+    def _cached(self, key, func, *args):
+        """Small caching facility for quantities derived from the geometry
+        of the path (e.g., the sampled vertices).
+
+        Mind that arrays are returned as read-only views, so that the cache
+        cannot be corrupted by accident.
+        """
+        cache = self.__dict__.setdefault('_cache', {})
+        try:
+            return cache[key]
+        except KeyError:
+            value = func(*args)
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+            cache[key] = value
+            return value
+
+    def _sample(self, tolerance: float):
+        """Do-nothing hook to be reimplemented in derived classes.
+        """
+        raise NotImplementedError
+
+    def primitives(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the list of drawing primitives (lines, circular arcs, circles
+        or poly-lines) that the path is made of.
+
+        In this default implementation the path is approximated by a single
+        poly-line with the given tolerance, and derived classes that can be
+        represented exactly are expected to overload the method.
+        """
+        return [PolylinePrimitive(self.sample(tolerance))]
+
+    def mpl_path(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the (cached) matplotlib.path.Path object for the path.
+        """
+        return self._cached(('mpl_path', tolerance), lambda: mpl_path(self.primitives(tolerance)))
+
+    def _spatial_index(self, tolerance: float):
+        """Build the spatial index for the path.
+
+        This is meant to be overloaded by composite paths, in order to label
+        the primitives with the name of the sub-paths they belong to.
+        """
+        return PrimitiveIndex(self.primitives(tolerance))
+
+    def spatial_index(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the (lazily built and cached) spatial index over the drawing
+        primitives of the path, to be used for nearest-point queries and hit
+        tests.
+        """
+        return self._cached(('spatial_index', tolerance), self._spatial_index, tolerance)
+
+    def _bbox(self, tolerance: float):
+        """Calculate the bounding box of the path.
+
+        This is meant to be overloaded by composite paths, in order to reuse the
+        (cached) bounding boxes of the sub-paths.
+        """
+        return bbox_union(primitive.bbox() for primitive in self.primitives(tolerance))
+
+    def bbox(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the (cached) bounding box (xmin, ymin, xmax, ymax) of the path.
+
+        The bounding box is calculated from the drawing primitives, and is
+        therefore exact for all the paths made of straight lines and circular
+        arcs (e.g., for circular arcs the extremal points of the circle that
+        fall within the span are taken into account), while for all the other
+        paths (e.g., spirals) it is accurate to the sampling tolerance.
+        """
+        return self._cached(('bbox', tolerance), self._bbox, tolerance)
+
+    def sample(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the vertices of a polygonal approximation of the path as a
+        contiguous, (N, 2) numpy array.
+
+        The density of the vertices is adapted to the curvature of the path, in
+        such a way that the chord error never exceeds the given tolerance
+        (e.g., straight lines are always sampled at their end points only).
+        Disconnected pieces, if any, are separated by a row of NaNs, which is
+        the convention used by matplotlib to break lines.
+
+        The output is cached, and read-only.
+        """
+        return self._cached(('sample', tolerance), self._sample, tolerance)
+
 
 
 class PolyLine(Path):
@@ -260,13 +598,47 @@ class PolyLine(Path):
         """
         return self.points
 
+    def _sample(self, tolerance: float):
+        """Overloaded method.
+
+        Poly-lines are exactly represented by their vertices, independently of
+        the tolerance.
+        """
+        return np.array([point.xy() for point in self.points], dtype=float)
+
+    def primitives(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Overloaded method.
+        """
+        return [LinePrimitive(p1.xy(), p2.xy()) for p1, p2 in zip(self.points[:-1], self.points[1:])]
+
+    def offset(self, distance: float, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the offset of the poly-line at a given distance.
+
+        Positive distances are on the left with respect to the direction of
+        travel. The offset of each segment is calculated separately, and the
+        segments are joined as explained in ParametricPolyPathBase.offset().
+        """
+        lines = [Line(p1, p2) for p1, p2 in zip(self.points[:-1], self.points[1:])]
+        return CompositePath(lines).offset(distance, tolerance)
+
+    def trimmed(self, point, at_end: bool = True):
+        """Return a copy of the poly-line trimmed at a given point (assumed to
+        lie on the poly-line), either at the end or at the start.
+        """
+        vertices = np.array([p.xy() for p in self.points])
+        dist = [nearest_point(LinePrimitive(*segment), *point.xy())[1] for segment in
+                zip(vertices[:-1], vertices[1:])]
+        i = int(np.argmin(dist))
+        if at_end:
+            return PolyLine(*self.points[:i + 1], point, name=self.name)
+        return PolyLine(point, *self.points[i + 1:], name=self.name)
+
     def draw(self, offset, **kwargs):
         """Draw method.
         """
-        x = [point.x + offset.x for point in self.points]
-        y = [point.y + offset.y for point in self.points]
-        line = matplotlib.lines.Line2D(x, y, **kwargs)
-        plt.gca().add_line(line)
+        x, y = self.sample().T
+        transform = as_transform(offset).mpl_transform()
+        current_context().line(x, y, transform=transform, **kwargs)
         return self
 
 
@@ -301,15 +673,23 @@ class RoundedRectangle(GeometricalEntity):
         self.height = height
         self.corner_radius = corner_radius
 
+    def bbox(self):
+        """Return the bounding box (xmin, ymin, xmax, ymax) of the rectangle.
+        """
+        w = 0.5 * self.width
+        h = 0.5 * self.height
+        return (self.center.x - w, self.center.y - h, self.center.x + w, self.center.y + h)
+
     def draw(self, offset):
         """
         """
+        offset = as_transform(offset)
         w = 0.5 * self.width - self.corner_radius
         h = 0.5 * self.height - self.corner_radius
         lw = self.width - 2. * self.corner_radius
         lh = self.height - 2. * self.corner_radius
         print(w, h)
-        CircularArc((w, h), self.corner_radius, 0., 90.).draw(offset).\
+        CircularArc(self.center + Point(w, h), self.corner_radius, 0., 90.).draw(offset).\
             connecting_line(lw).draw(offset).\
             connecting_circular_arc(self.corner_radius, 90.).draw(offset).\
             connecting_line(lh).draw(offset).\
@@ -350,9 +730,8 @@ class Line(PolyLine):
     def midpoint(self, name: str = None):
         """Return the midpoint of the line.
         """
-        p = 0.5 * (self.start_point() + self.end_point())
-        p.name = name
-        return p
+        x, y = (0.5 * (self.start_point() + self.end_point())).xy()
+        return Point(x, y, name)
 
     def slope(self):
         """Return the slope of the line.
@@ -360,6 +739,7 @@ class Line(PolyLine):
         dx, dy = (self.end_point() - self.start_point()).xy()
         return np.degrees(np.arctan2(dy, dx))
 
+    @_traced_creation
     def connecting_circular_arc(self, radius, span, name=None):
         """Return the circular arc that connects to the end point of the line in
         such a way that the combined path is differentiable all the way through.
@@ -376,6 +756,22 @@ class Line(PolyLine):
         center = self.end_point().move(radius, slope + 90.)
         return CircularArc(center, radius, slope - 90., span)
 
+    def offset(self, distance: float, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the offset of the line at a given distance.
+
+        Positive distances are on the left with respect to the direction of
+        travel.
+        """
+        phi = self.slope() + 90.
+        return Line(self.start_point().move(distance, phi), self.end_point().move(distance, phi), self.name)
+
+    def trimmed(self, point, at_end: bool = True):
+        """Overloaded method.
+        """
+        if at_end:
+            return Line(self.start_point(), point, self.name)
+        return Line(point, self.end_point(), self.name)
+
     def text_info(self) -> str:
         """Overloaded method.
         """
@@ -400,12 +796,45 @@ class Circle(Path):
         """
         return 2. * self.radius
 
+    def _sample_arc(self, start_phi: float, span: float, tolerance: float):
+        """Sample an arc of the circle with a given maximum chord error.
+        """
+        n = _num_arc_segments(self.radius, span, tolerance)
+        phi = np.radians(np.linspace(start_phi, start_phi + span, n + 1))
+        x = self.center.x + self.radius * np.cos(phi)
+        y = self.center.y + self.radius * np.sin(phi)
+        return np.column_stack((x, y))
+
+    def _sample(self, tolerance: float):
+        """Overloaded method.
+
+        Note the first and the last vertex coincide.
+        """
+        return self._sample_arc(0., 360., tolerance)
+
+    def primitives(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Overloaded method.
+        """
+        return [CirclePrimitive(self.center.xy(), self.radius)]
+
+    def offset(self, distance: float, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the offset of the circle at a given distance.
+
+        Circles run counterclockwise, so that positive distances are toward the
+        center. Return None if the circle collapses.
+        """
+        radius = self.radius - distance
+        if radius <= 0.:
+            return None
+        return Circle(self.center, radius, self.name)
+
     def draw(self, offset, **kwargs):
         """Draw method.
         """
-        xy = (self.center + offset).xy()
-        circle = matplotlib.patches.Circle(xy, self.radius, fill=False, **kwargs)
-        plt.gca().add_patch(circle)
+        from metalute.matplotlib_ import matplotlib
+        transform = as_transform(offset).mpl_transform()
+        current_context().patch(matplotlib.patches.Circle, self.center.xy(), self.radius,
+                                fill=False, transform=transform, **kwargs)
         return self
 
 
@@ -419,15 +848,31 @@ class Cross(Circle):
     arms, the constructors are essentially identical.
     """
 
+    def _sample(self, tolerance: float):
+        """Overloaded method.
+
+        The two arms of the cross are separated by a row of NaNs.
+        """
+        x, y = self.center.xy()
+        r = self.radius
+        return np.array([[x - r, y], [x + r, y], [np.nan, np.nan],
+                         [x, y - r], [x, y + r]])
+
+    def primitives(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Overloaded method.
+        """
+        x, y = self.center.xy()
+        r = self.radius
+        return [LinePrimitive((x - r, y), (x + r, y)), LinePrimitive((x, y - r), (x, y + r))]
+
     def draw(self, offset, **kwargs):
         """Draw method.
+
+        The two arms are drawn as a single artist.
         """
-        p0 = self.center.move(self.radius, 180.)
-        p1 = self.center.move(self.radius, 0.)
-        p2 = self.center.move(self.radius, 90.)
-        p3 = self.center.move(self.radius, -90.)
-        PolyLine(p0, p1).draw(offset, **kwargs)
-        PolyLine(p2, p3).draw(offset, **kwargs)
+        x, y = self.sample().T
+        transform = as_transform(offset).mpl_transform()
+        current_context().line(x, y, transform=transform, **kwargs)
 
 
 
@@ -445,9 +890,25 @@ class Hole(Circle):
         super().__init__(center, 0.5 * diameter, name)
         self.cross_scale = cross_scale
 
+    def _sample(self, tolerance: float):
+        """Overloaded method.
+
+        The circle and the cross are separated by a row of NaNs.
+        """
+        cross = Cross(self.center, self.cross_scale * self.radius)
+        separator = np.full((1, 2), np.nan)
+        return np.vstack((super()._sample(tolerance), separator, cross.sample(tolerance)))
+
+    def primitives(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Overloaded method.
+        """
+        cross = Cross(self.center, self.cross_scale * self.radius)
+        return super().primitives(tolerance) + cross.primitives(tolerance)
+
     def draw(self, offset, **kwargs):
         """Draw method.
         """
+        offset = as_transform(offset)
         super().draw(offset, **kwargs)
         kwargs.update(color='black')
         Cross(self.center, self.cross_scale * self.radius).draw(offset, **kwargs)
@@ -527,6 +988,60 @@ class CircularArc(Circle):
         """
         return [self.start_point(), self.end_point()]
 
+    def _sample(self, tolerance: float):
+        """Overloaded method.
+        """
+        return self._sample_arc(self.start_phi, self.span, tolerance)
+
+    def _normalized(self):
+        """Return the radius and start angle of the arc, normalized in such a
+        way that the radius is positive.
+
+        Mind that arcs with a negative radius are legitimate (e.g., they are
+        created by Line.connecting_circular_arc()) and are equivalent to the
+        arcs with the opposite radius and the start angle rotated by 180 degrees.
+        """
+        if self.radius < 0.:
+            return -self.radius, self.start_phi + 180.
+        return self.radius, self.start_phi
+
+    def primitives(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Overloaded method.
+        """
+        radius, start_phi = self._normalized()
+        return [ArcPrimitive(self.center.xy(), radius, start_phi, self.span)]
+
+    def offset(self, distance: float, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the offset of the arc at a given distance.
+
+        This is exact: the offset arc has the same center, start angle and span,
+        and a radius that is smaller or larger by the offset distance, depending
+        on the orientation of the arc (positive distances are on the left with
+        respect to the direction of travel). Return None if the arc collapses,
+        i.e., if the offset is on the concave side and larger than the radius.
+        """
+        radius, start_phi = self._normalized()
+        radius -= self.orientation() * distance
+        if radius <= 0.:
+            return None
+        return CircularArc(self.center, radius, start_phi, self.span, self.name)
+
+    def trimmed(self, point, at_end: bool = True):
+        """Return a copy of the arc trimmed at a given point (assumed to lie on
+        the arc), either at the end or at the start.
+        """
+        radius, start_phi = self._normalized()
+        dx, dy = (point - self.center).xy()
+        sign = self.orientation()
+        delta = ((np.degrees(np.arctan2(dy, dx)) - start_phi) * sign) % 360.
+        # Take care of the rounding when the point is close to the start.
+        if delta > 360. - 1.e-9:
+            delta = 0.
+        if at_end:
+            return CircularArc(self.center, radius, start_phi, sign * delta, self.name)
+        return CircularArc(self.center, radius, start_phi + sign * delta,
+                           self.span - sign * delta, self.name)
+
     def start_slope(self):
         """Not implemented, yet.
 
@@ -543,6 +1058,7 @@ class CircularArc(Circle):
         """
         return self.end_phi + 90. * self.orientation()
 
+    @_traced_creation
     def connecting_line(self, length, name=None):
         """Return the line that connects to the end point of the arc in such a
         way that the combined path is differentiable all the way through.
@@ -551,6 +1067,7 @@ class CircularArc(Circle):
         end_point = start_point.move(length, self.end_slope())
         return Line(start_point, end_point, name)
 
+    @_traced_creation
     def connecting_circular_arc(self, radius, span, name=None):
         """Return the circular arc that connects to the end point of the arc in
         such a way that the combined path is differentiable all the way through.
@@ -564,16 +1081,15 @@ class CircularArc(Circle):
 
         span : float
             The measure of the connecting arc.
+
+        Note the implementation is branchless, so that it works seamlessly
+        with numpy arrays of parameters (see ParametricPolyPathBase.batch()).
         """
-        slope = self.end_phi
-        phi = self.end_phi
-        if radius > 0:
-            slope += 180.
-            span *= self.orientation()
-        else:
-            phi += 180.
-            span *= -self.orientation()
-        radius = abs(radius)
+        sign = np.sign(radius)
+        slope = self.end_phi + 90. * (1. + sign)
+        phi = self.end_phi + 90. * (1. - sign)
+        span = span * sign * self.orientation()
+        radius = np.abs(radius)
         center = self.end_point().move(radius, slope)
         return CircularArc(center, radius, phi, span)
 
@@ -586,7 +1102,6 @@ class CircularArc(Circle):
     def _draw_center_angle(self, offset, **kwargs):
         """
         """
-        xy = (self.center + offset).xy()
         kwargs.setdefault('color', 'lightgrey')
         self.center.draw(offset, **kwargs)
         kwargs.setdefault('ls', 'dashed')
@@ -600,13 +1115,13 @@ class CircularArc(Circle):
         Note that this should always be called before the draw() method, so that
         all the paths get overlaid in the right order.
         """
+        offset = as_transform(offset)
         kwargs = self._draw_center_angle(offset, **kwargs)
         Circle(self.center, self.radius).draw(offset, **kwargs)
 
     def draw(self, offset, **kwargs):
         """Draw the circular arc.
         """
-        xy = (self.center + offset).xy()
         d = self.diameter()
         theta1 = self.start_phi
         theta2 = self.end_phi
@@ -614,20 +1129,119 @@ class CircularArc(Circle):
         # do have to swap the extremes if the arc measure is negative.
         if self.span < 0.:
             theta1, theta2 = theta2, theta1
-        arc = matplotlib.patches.Arc(xy, d, d, 0., theta1, theta2, **kwargs)
-        plt.gca().add_patch(arc)
+        from metalute.matplotlib_ import matplotlib
+        transform = as_transform(offset).mpl_transform()
+        current_context().patch(matplotlib.patches.Arc, self.center.xy(), d, d, 0., theta1, theta2,
+                                transform=transform, **kwargs)
         return self
 
 
 
+class SpiralRadius(namedtuple('SpiralRadius', 'func params')):
+
+    """Radius of a spiral arc as a function of phi, in the form of a generic
+    function func(phi, *params) and a tuple of parameters.
+
+    Unlike a lambda, this is hashable and compares by value, so that the
+    sampled radius arrays can be shared by all the spiral arcs with the same
+    radius function and parameters.
+    """
+
+    __slots__ = ()
+
+    def __call__(self, phi):
+        """Evaluate the radius.
+        """
+        return self.func(phi, *self.params)
+
+
+
+def complex_step_derivative(func, x, step: float = 1.e-20):
+    """Return the derivative of a real function at a given (array of) point(s)
+    by means of complex-step differentiation.
+
+    This is exact to machine precision for all the analytic functions, and
+    only requires a single function evaluation. Mind this is not applicable to
+    functions that are not implemented in terms of operations supporting
+    complex arguments (e.g., because they take the absolute value), in which
+    case we fall back to central differences.
+    """
+    x = np.asarray(x, dtype=float)
+    try:
+        value = func(x + 1j * step)
+        if np.iscomplexobj(value):
+            return np.imag(value) / step
+    except (TypeError, ValueError):
+        pass
+    h = 1.e-6 * np.maximum(np.abs(x), 1.)
+    return (func(x + h) - func(x - h)) / (2. * h)
+
+
+@lru_cache(maxsize=256)
+def _sample_spiral_radius(radius, start_phi: float, span: float, tolerance: float):
+    """Cached adaptive sampling of the radius of a spiral arc.
+
+    Since the chord error is invariant under translations, this is done for a
+    spiral arc centered in the origin, and the phi and radius arrays are
+    returned, so that they can be reused for any center.
+    """
+    def _xy(phi):
+        r = radius(phi)
+        return r * np.cos(np.radians(phi)), r * np.sin(np.radians(phi))
+
+    phi = adaptive_sample(_xy, start_phi, start_phi + span, tolerance, return_parameters=True)[0]
+    r = np.array(np.broadcast_to(radius(phi), phi.shape), dtype=float)
+    phi.flags.writeable = False
+    r.flags.writeable = False
+    return phi, r
+
+
+
 class SpiralArc(CircularArc):
 
     """Class describing a spiral arc.
 
     This is slightly more sophisticated arc than CircularArc, where the radius
     is not constant, but rather a function of phi.
+
+    Parameters
+    ----------
+    center : Point
+        The center of the spiral.
+
+    radius : callable
+        The radius as a function of phi (in degrees). When this is a
+        SpiralRadius object, the sampled radius arrays are cached across
+        all the spiral arcs with the same radius function and parameters.
+
+    start_phi : float
+        The start angle (in degrees).
+
+    span : float
+        The (signed) angular span (in degrees).
+
+    name : str
+        The name of the arc.
+
+    derivative : callable, optional
+        The derivative of the radius with respect to phi (in degrees). If this
+        is None, the derivative is calculated by complex-step differentiation.
     """
 
+    def __init__(self, center, radius, start_phi: float = 0., span: float = 360.,
+                 name: str = None, derivative=None):
+        """Constructor.
+        """
+        super().__init__(center, radius, start_phi, span, name)
+        self.derivative = derivative
+
+    def radius_derivative(self, phi):
+        """Return the derivative of the radius with respect to phi (in degrees).
+        """
+        if self.derivative is not None:
+            return self.derivative(phi)
+        return complex_step_derivative(self.radius, phi)
+
     def point(self, phi, name=None):
         """Return the point on the arc at a specified phi value.
         """
@@ -643,33 +1257,420 @@ class SpiralArc(CircularArc):
         """
         return self.point(self.end_phi, name)
 
+    def _tangent(self, phi):
+        """Return the (unnormalized) tangent vector to the arc, in the direction
+        of travel, for an array of phi values.
+        """
+        r = self.radius(phi)
+        dr = np.degrees(self.radius_derivative(phi))
+        cos, sin = np.cos(np.radians(phi)), np.sin(np.radians(phi))
+        sign = self.orientation()
+        return sign * (dr * cos - r * sin), sign * (dr * sin + r * cos)
+
+    def tangent_slope(self, phi):
+        """Return the slope (in degrees) of the tangent to the arc, in the
+        direction of travel, at a given (array of) phi value(s).
+        """
+        tx, ty = self._tangent(phi)
+        return np.degrees(np.arctan2(ty, tx))
+
     def start_slope(self):
-        """Return the slope of the line connecting with the arc at the start
-        point.
+        """Return the slope of the tangent to the arc at the start point.
         """
-        return Line(self.point(self.start_phi), self.point(self.start_phi - 0.1)).slope()
+        return self.tangent_slope(self.start_phi)
 
     def end_slope(self):
-        """Return the slope of the line connecting with the arc at the start
+        """Return the slope of the line connecting with the arc at the end
         point.
+
+        This is exact, so that the connecting paths are tangent to the arc.
         """
-        return Line(self.point(self.end_phi), self.point(self.end_phi - 0.1)).slope()
+        return self.tangent_slope(self.end_phi)
 
     def draw_construction(self, offset, **kwargs):
         """Overloaded method.
         """
         kwargs = self._draw_center_angle(offset, **kwargs)
 
-    def draw(self, offset, num_points: int = 250, construction: bool = True, **kwargs):
+    def _xy(self, phi):
+        """Return the x and y coordinates of the points on the arc for an array
+        of phi values.
+        """
+        r = self.radius(phi)
+        x = self.center.x + r * np.cos(np.radians(phi))
+        y = self.center.y + r * np.sin(np.radians(phi))
+        return x, y
+
+    def _sample(self, tolerance: float):
+        """Overloaded method.
+
+        The sampled radius arrays are cached by the radius function and the
+        angular range whenever possible, so that re-building the very same arc
+        (e.g., in a new instance of a parametric path) costs nothing extra.
+        """
+        try:
+            phi, r = _sample_spiral_radius(self.radius, self.start_phi, self.span, tolerance)
+        except TypeError:
+            # The radius function (or any of its parameters) is not hashable.
+            return adaptive_sample(self._xy, self.start_phi, self.end_phi, tolerance)
+        x = self.center.x + r * np.cos(np.radians(phi))
+        y = self.center.y + r * np.sin(np.radians(phi))
+        return np.column_stack((x, y))
+
+    def offset(self, distance: float, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the offset of the spiral arc at a given distance.
+
+        The offset of a spiral cannot be represented exactly in terms of lines
+        and arcs, and we return a PolyLine object, adaptively sampled with the
+        given tolerance. Mind the offset points are calculated from the local
+        normal to the spiral (i.e., from the exact derivative of the radius),
+        rather than from the sampled vertices, so that there is no accumulation
+        of errors.
+        """
+        def _xy(phi):
+            x, y = self._xy(phi)
+            tx, ty = self._tangent(phi)
+            norm = np.hypot(tx, ty)
+            return x - distance * ty / norm, y + distance * tx / norm
+
+        vertices = adaptive_sample(_xy, self.start_phi, self.end_phi, tolerance)
+        return PolyLine(*[Point(x, y) for x, y in vertices], name=self.name)
+
+    def primitives(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Overloaded method.
+
+        Spiral arcs cannot be represented exactly, and we fall back to the
+        poly-line approximation.
+        """
+        return Path.primitives(self, tolerance)
+
+    def draw(self, offset, tolerance: float = DEFAULT_SAMPLING_TOLERANCE,
+             construction: bool = True, **kwargs):
         """Overloaded method.
         """
         kwargs.setdefault('color', 'black')
-        x0, y0 = (self.center + offset).xy()
-        phi = np.linspace(self.start_phi, self.end_phi, num_points)
-        r = self.radius(phi)
-        x = x0 + r * np.cos(np.radians(phi))
-        y = y0 + r * np.sin(np.radians(phi))
-        plt.plot(x, y, **kwargs)
+        x, y = self.sample(tolerance).T
+        current_context().plot(x, y, transform=as_transform(offset).mpl_transform(), **kwargs)
+
+
+
+def _elements(path):
+    """Return the elementary primitives (straight segments or circular arcs)
+    that a Line, CircularArc or PolyLine object is made of, to be used for the
+    calculation of the intersections.
+    """
+    if isinstance(path, CircularArc):
+        return path.primitives()
+    points = [p.xy() for p in path.points]
+    return [LinePrimitive(p1, p2) for p1, p2 in zip(points[:-1], points[1:])]
+
+
+def _line_line_intersections(p1, p2, q1, q2):
+    """Return the intersection (if any) between two infinite lines.
+    """
+    (x1, y1), (x2, y2), (x3, y3), (x4, y4) = p1, p2, q1, q2
+    rx, ry, sx, sy = x2 - x1, y2 - y1, x4 - x3, y4 - y3
+    det = rx * sy - ry * sx
+    if abs(det) <= 1.e-12 * np.hypot(rx, ry) * np.hypot(sx, sy):
+        return []
+    t = ((x3 - x1) * sy - (y3 - y1) * sx) / det
+    return [(x1 + t * rx, y1 + t * ry)]
+
+
+def _line_circle_intersections(p1, p2, center, radius):
+    """Return the intersections (if any) between an infinite line and a circle.
+    """
+    (x1, y1), (x2, y2), (cx, cy) = p1, p2, center
+    dx, dy = x2 - x1, y2 - y1
+    a = dx**2. + dy**2.
+    b = 2. * (dx * (x1 - cx) + dy * (y1 - cy))
+    c = (x1 - cx)**2. + (y1 - cy)**2. - radius**2.
+    delta = b**2. - 4. * a * c
+    if a == 0. or delta < 0.:
+        return []
+    delta = np.sqrt(delta)
+    return [(x1 + t * dx, y1 + t * dy) for t in ((-b - delta) / (2. * a), (-b + delta) / (2. * a))]
+
+
+def _circle_circle_intersections(center1, radius1, center2, radius2):
+    """Return the intersections (if any) between two circles.
+    """
+    (x1, y1), (x2, y2) = center1, center2
+    d = np.hypot(x2 - x1, y2 - y1)
+    if d == 0. or d > radius1 + radius2 or d < abs(radius1 - radius2):
+        return []
+    a = (radius1**2. - radius2**2. + d**2.) / (2. * d)
+    h = np.sqrt(max(radius1**2. - a**2., 0.))
+    x = x1 + a * (x2 - x1) / d
+    y = y1 + a * (y2 - y1) / d
+    return [(x + h * (y2 - y1) / d, y - h * (x2 - x1) / d),
+            (x - h * (y2 - y1) / d, y + h * (x2 - x1) / d)]
+
+
+def _intersections(path1, path2, tolerance: float = 1.e-6):
+    """Return all the intersections between two Line, CircularArc or PolyLine
+    objects.
+
+    The underlying infinite lines and full circles are intersected pairwise
+    (skipping the pairs with disjoint bounding boxes), and only the points lying
+    on both the original elements are retained.
+    """
+    elements2 = [(element, element.bbox()) for element in _elements(path2)]
+    intersections = []
+    for element1 in _elements(path1):
+        xmin1, ymin1, xmax1, ymax1 = element1.bbox()
+        for element2, (xmin2, ymin2, xmax2, ymax2) in elements2:
+            if xmin1 > xmax2 + tolerance or xmin2 > xmax1 + tolerance or \
+               ymin1 > ymax2 + tolerance or ymin2 > ymax1 + tolerance:
+                continue
+            line1 = isinstance(element1, LinePrimitive)
+            line2 = isinstance(element2, LinePrimitive)
+            if line1 and line2:
+                candidates = _line_line_intersections(*element1, *element2)
+            elif line1:
+                candidates = _line_circle_intersections(*element1, *element2[:2])
+            elif line2:
+                candidates = _line_circle_intersections(*element2, *element1[:2])
+            else:
+                candidates = _circle_circle_intersections(*element1[:2], *element2[:2])
+            for x, y in candidates:
+                if nearest_point(element1, x, y)[1] <= tolerance and \
+                   nearest_point(element2, x, y)[1] <= tolerance:
+                    intersections.append(Point(x, y))
+    return intersections
+
+
+def _path_length(path, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+    """Return the (approximate) length of a path.
+    """
+    return np.hypot(*np.diff(path.sample(tolerance), axis=0).T).sum()
+
+
+def _midpoint(path, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+    """Return the (approximate) point halfway along a path, as a numpy array.
+    """
+    vertices = path.sample(tolerance)
+    lengths = np.concatenate(([0.], np.cumsum(np.hypot(*np.diff(vertices, axis=0).T))))
+    s = 0.5 * lengths[-1]
+    return np.array([np.interp(s, lengths, vertices[:, 0]), np.interp(s, lengths, vertices[:, 1])])
+
+
+def _split(path, points, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+    """Split a Line, CircularArc or PolyLine object at a set of points (assumed
+    to lie on the path), and return the list of the pieces.
+
+    Points coinciding with the end points of the path are ignored.
+    """
+    points = sorted(points, key=lambda p: _path_length(path.trimmed(p, at_end=True), tolerance))
+    pieces = []
+    for p in points:
+        if min(p.distance_to(path.start_point()), p.distance_to(path.end_point())) <= 1.e-6:
+            continue
+        pieces.append(path.trimmed(p, at_end=True))
+        path = path.trimmed(p, at_end=False)
+    return pieces + [path]
+
+
+def _tangents(path, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+    """Return the (unnormalized) tangent vectors at the start and at the end of
+    a path, as numpy arrays.
+    """
+    vertices = path.sample(tolerance)
+    return vertices[1] - vertices[0], vertices[-1] - vertices[-2]
+
+
+
+class ArcLengthTable:
+
+    """Cumulative arc-length table over a sequence of paths, supporting fast,
+    vectorized queries of the point, the tangent and the normal at given
+    distances along the paths.
+
+    The paths are broken into elements, whose lengths are calculated exactly
+    for straight segments and circular arcs, and by means of a composite
+    Gauss-Legendre quadrature for spiral arcs, while all the other paths are
+    approximated by their sampled poly-lines. Queries are located with a
+    binary search over the cumulative lengths, and then evaluated in closed
+    form for all the segments and arcs at once. For spiral arcs, the
+    parameter of the spiral is interpolated in a table of cumulative lengths
+    at the edges of the quadrature panels, and refined with a Newton step
+    (with the length from the panel edge evaluated by quadrature), before the
+    point and the tangent are evaluated exactly.
+
+    Mind that standalone circles (e.g., holes) are not part of any contour and
+    are skipped, and that the lengths of disconnected paths are simply
+    concatenated.
+
+    Parameters
+    ----------
+    paths : sequence of Path objects
+        The paths.
+
+    tolerance : float
+        The sampling tolerance for the paths that are approximated by
+        poly-lines.
+
+    num_panels : int
+        The number of quadrature panels for the spiral arcs.
+
+    order : int
+        The number of quadrature points per panel.
+    """
+
+    LINE, ARC, SPIRAL = range(3)
+
+    def __init__(self, paths, tolerance: float = DEFAULT_SAMPLING_TOLERANCE,
+                 num_panels: int = 256, order: int = 8):
+        """Constructor.
+        """
+        self.nodes, self.weights = np.polynomial.legendre.leggauss(order)
+        kinds = []
+        lengths = []
+        params = []
+        self.spirals = []
+        for path in paths:
+            for kind, length, _params in self._elements(path, tolerance, num_panels):
+                kinds.append(kind)
+                lengths.append(length)
+                params.append(_params)
+        self.kind = np.array(kinds, dtype=int)
+        lengths = np.array(lengths, dtype=float)
+        self.start = np.concatenate(([0.], np.cumsum(lengths)))
+        self.length = self.start[-1]
+        self.start = self.start[:-1]
+        self.params = np.array(params, dtype=float).reshape((-1, 5))
+
+    def _elements(self, path, tolerance: float, num_panels: int):
+        """Break a path into elements, each one in the form of a (kind, length,
+        parameters) tuple.
+
+        The parameters are (x0, y0, ux, uy, 0.) for straight segments, i.e.,
+        the start point and the unit vector along the segment, and
+        (cx, cy, r, phi0, sign) for circular arcs, i.e., the center, the
+        (positive) radius, the start angle in radians and the direction.
+        For spiral arcs the first parameter is the index in the list of the
+        spiral tables.
+        """
+        if isinstance(path, SpiralArc):
+            self.spirals.append(self._spiral_table(path, num_panels))
+            _, _, s = self.spirals[-1]
+            return [(self.SPIRAL, s[-1], (len(self.spirals) - 1, 0., 0., 0., 0.))]
+        if isinstance(path, CircularArc):
+            radius, start_phi = path._normalized()
+            length = radius * np.radians(abs(path.span))
+            x, y = path.center.xy()
+            return [(self.ARC, length, (x, y, radius, np.radians(start_phi), path.orientation()))]
+        if isinstance(path, Circle):
+            return []
+        if isinstance(path, PolyLine):
+            vertices = np.array([point.xy() for point in path.points])
+        else:
+            vertices = path.sample(tolerance)
+        elements = []
+        for (x1, y1), (x2, y2) in zip(vertices[:-1], vertices[1:]):
+            length = np.hypot(x2 - x1, y2 - y1)
+            if not np.isfinite(length):
+                continue
+            ux, uy = ((x2 - x1) / length, (y2 - y1) / length) if length > 0. else (0., 0.)
+            elements.append((self.LINE, length, (x1, y1, ux, uy, 0.)))
+        return elements
+
+    @staticmethod
+    def _speed(path, t):
+        """Return the derivative of the arc length of a spiral arc with respect
+        to the normalized parameter t = (phi - start_phi) / span.
+        """
+        tx, ty = path._tangent(path.start_phi + t * path.span)
+        return np.hypot(tx, ty) * np.radians(abs(path.span))
+
+    def _spiral_table(self, path, num_panels: int):
+        """Return the table of the cumulative lengths for a spiral arc, i.e., the
+        path itself, along with the values of the normalized parameter and the
+        corresponding lengths at the edges of the quadrature panels.
+        """
+        t = np.linspace(0., 1., num_panels + 1)
+        half = 0.5 * (t[1] - t[0])
+        speed = self._speed(path, 0.5 * (t[1:] + t[:-1])[:, None] + half * self.nodes)
+        panels = half * (self.weights * speed).sum(axis=1)
+        return path, t, np.concatenate(([0.], np.cumsum(panels)))
+
+    def _spiral_parameter(self, path, t, s, target):
+        """Return the normalized parameter of a spiral arc at an array of
+        distances from the start of the arc.
+        """
+        k = np.clip(np.searchsorted(s, target, side='right') - 1, 0, len(t) - 2)
+        t0 = np.interp(target, s, t)
+        # Newton step, with the length from the edge of the panel calculated
+        # by means of a Gauss-Legendre quadrature.
+        half = 0.5 * (t0 - t[k])
+        speed = self._speed(path, (t[k] + half)[:, None] + half[:, None] * self.nodes)
+        s0 = s[k] + half * (self.weights * speed).sum(axis=1)
+        speed = self._speed(path, t0)
+        return t0 + np.where(speed > 0., (target - s0) / np.where(speed > 0., speed, 1.), 0.)
+
+    def _locate(self, s):
+        """Locate an array of distances along the paths, returning the indices
+        of the elements and the distances from the start of the elements.
+        """
+        s = np.clip(np.asarray(s, dtype=float), 0., self.length)
+        idx = np.clip(np.searchsorted(self.start, s, side='right') - 1, 0, len(self.start) - 1)
+        return idx, s - self.start[idx]
+
+    def evaluate(self, s):
+        """Return the points and the unit tangent vectors (in the direction of
+        travel) at an array of distances along the paths, in the form of two
+        arrays with an additional trailing dimension of size 2.
+
+        Distances outside the [0, length] interval are clipped.
+        """
+        idx, ds = self._locate(s)
+        kind = self.kind[idx]
+        x0, y0, p1, p2, p3 = np.moveaxis(self.params[idx], -1, 0)
+        points = np.empty(ds.shape + (2,))
+        tangents = np.empty(ds.shape + (2,))
+        # Straight segments.
+        mask = kind == self.LINE
+        points[mask] = np.column_stack((x0[mask] + ds[mask] * p1[mask], y0[mask] + ds[mask] * p2[mask]))
+        tangents[mask] = np.column_stack((p1[mask], p2[mask]))
+        # Circular arcs.
+        mask = kind == self.ARC
+        phi = p2[mask] + p3[mask] * ds[mask] / p1[mask]
+        cos, sin = np.cos(phi), np.sin(phi)
+        points[mask] = np.column_stack((x0[mask] + p1[mask] * cos, y0[mask] + p1[mask] * sin))
+        tangents[mask] = np.column_stack((-p3[mask] * sin, p3[mask] * cos))
+        # Spiral arcs.
+        for i, (path, t, _s) in enumerate(self.spirals):
+            mask = (kind == self.SPIRAL) & (x0 == i)
+            if not mask.any():
+                continue
+            phi = path.start_phi + self._spiral_parameter(path, t, _s, ds[mask]) * path.span
+            points[mask] = np.column_stack(path._xy(phi))
+            tx, ty = path._tangent(phi)
+            norm = np.hypot(tx, ty)
+            tangents[mask] = np.column_stack((tx / norm, ty / norm))
+        return points, tangents
+
+    def point_at(self, s):
+        """Return the points at an array of distances along the paths.
+        """
+        return self.evaluate(s)[0]
+
+    def tangent_at(self, s):
+        """Return the unit tangent vectors at an array of distances along the
+        paths.
+        """
+        return self.evaluate(s)[1]
+
+    def normal_at(self, s):
+        """Return the unit normal vectors at an array of distances along the
+        paths.
+
+        The normals are rotated by 90 degrees counter-clockwise with respect to
+        the tangents, i.e., they point in the direction in which the paths move
+        when offset by a positive distance.
+        """
+        tx, ty = np.moveaxis(self.evaluate(s)[1], -1, 0)
+        return np.stack((-ty, tx), axis=-1)
 
 
 
@@ -714,13 +1715,68 @@ class ParametricPolyPathBase(Path):
         self.par_dict.update(**kwargs)
         self.anchor = Point(0., 0., 'anchor')
         self.path_dict = {}
-        self.__finalize(self.construct())
+        self.dependency_dict = {}
+        self.__finalize(self._traced_construct())
 
     def __getattr__(self, name):
         """Overloaded method so that the parameters can be accessed by name
         within the class.
-        """
-        return self.par_dict[name]
+
+        If a traced construction is in progress, the first read of each
+        parameter is recorded, along with the number of paths created so far.
+        """
+        par_dict = self.__dict__.get('par_dict', {})
+        try:
+            value = par_dict[name]
+        except KeyError:
+            raise AttributeError('{} has no attribute or parameter {}'.format(
+                self.__class__.__name__, name)) from None
+        trace = self.__dict__.get('_trace')
+        if trace is not None:
+            reads, log = trace
+            reads.setdefault(name, len(log))
+        return value
+
+    def _traced_construct(self, num_reused: int = 0):
+        """Call construct() recording the dependencies of all the sub-paths on
+        the parameters.
+
+        Since each path in the construction chain is built from the ones
+        created before, we conservatively assume that each path depends on all
+        the parameters that have been read before its creation. The resulting
+        sets of parameters are stored in the dependency_dict class member,
+        indexed by sub-path name (after the construction is finalized).
+
+        If num_reused is not zero, the first num_reused paths in the creation
+        log of the previous construction are reused, rather than created anew.
+
+        Mind that parameters read directly from par_dict are not tracked.
+        """
+        global _PATH_CREATION_LOG
+        previous_log = _PATH_CREATION_LOG
+        log = _PATH_CREATION_LOG = _PathCreationLog(self.__dict__.get('_creation_log'), num_reused)
+        reads = {}
+        self.__dict__['_trace'] = (reads, log)
+        try:
+            locals_ = self.construct()
+        finally:
+            _PATH_CREATION_LOG = previous_log
+            del self.__dict__['_trace']
+        log.previous = None
+        self.__dict__['_creation_log'] = log
+        # Mind the parameters are sorted by the position of their first read.
+        names = sorted(reads, key=reads.get)
+        dependencies = []
+        params = frozenset()
+        num_read = 0
+        for i in range(len(log)):
+            if num_read < len(names) and reads[names[num_read]] <= i:
+                while num_read < len(names) and reads[names[num_read]] <= i:
+                    num_read += 1
+                params = frozenset(names[:num_read])
+            dependencies.append(params)
+        self.__dict__['_creation_dependencies'] = dependencies
+        return locals_
 
     def construct(self):
         """No-op method to be overloaded by derived classes.
@@ -729,6 +1785,118 @@ class ParametricPolyPathBase(Path):
         """
         raise NotImplementedError
 
+    @classmethod
+    def batch(cls, **kwargs):
+        """Construct many variants of the path at once.
+
+        All the keyword arguments (which update the default parameter values,
+        just like in the constructor) can be numpy arrays, which are broadcast
+        against each other, and the entire construction chain is run once,
+        with all the coordinates being arrays, rather than once per variant.
+        This is orders of magnitude faster than instantiating the objects in a
+        loop, and is meant for design exploration.
+
+        Mind this requires that construct() only uses operations that work
+        element-wise on arrays (i.e., numpy functions rather than the math
+        module, and no branching on the parameter values).
+
+        Return a PathBatch object.
+        """
+        arrays = np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in kwargs.values()])
+        kwargs = dict(zip(kwargs.keys(), arrays))
+        shape = arrays[0].shape if arrays else ()
+        return PathBatch(cls(**kwargs), shape)
+
+    def _closure_residuals(self, batch, target=None):
+        """Return the closure residuals for a PathBatch object, i.e., the vector
+        from the end point of the last sub-path to the target (by default, the
+        start point of the first sub-path).
+        """
+        if target is None:
+            return batch.closure_vector()
+        return np.array(target.xy()) - batch.end_point()
+
+    def solve_closure(self, *free_params, target=None, tolerance: float = 1.e-9,
+                      max_iterations: int = 25, step: float = 1.e-6):
+        """Adjust a set of free parameters in such a way that the path closes.
+
+        This runs a Newton (or, more precisely, a Gauss-Newton, if the number of
+        free parameters is not two) iteration on the closure residuals, with all
+        the columns of the Jacobian evaluated at once through central
+        differences in a single vectorized batch() call. The final parameter
+        values are applied through set_params().
+
+        Parameters
+        ----------
+        free_params : str
+            The names of the parameters to be adjusted.
+
+        target : Point instance, optional
+            The target for the end point of the last sub-path (by default this
+            is the start point of the first one).
+
+        tolerance : float
+            The tolerance (in mm) on the closure error.
+
+        max_iterations : int
+            The maximum number of iterations.
+
+        step : float
+            The relative step used for the numerical derivatives.
+
+        Return a dictionary with the values of the free parameters.
+        """
+        names = list(free_params)
+        num_params = len(names)
+        x = np.array([self.par_dict[name] for name in names], dtype=float)
+        for _ in range(max_iterations):
+            h = step * np.maximum(np.abs(x), 1.)
+            values = np.tile(x, (2 * num_params + 1, 1))
+            values[1:num_params + 1] += np.diag(h)
+            values[num_params + 1:] -= np.diag(h)
+            par_dict = dict(self.par_dict, **dict(zip(names, values.T)))
+            residuals = self._closure_residuals(self.batch(**par_dict), target)
+            if np.hypot(*residuals[0]) <= tolerance:
+                break
+            jacobian = (residuals[1:num_params + 1] - residuals[num_params + 1:]).T / (2. * h)
+            x = x - np.linalg.lstsq(jacobian, residuals[0], rcond=None)[0]
+        else:
+            raise RuntimeError('Closure solver did not converge after {} iterations'.format(max_iterations))
+        solution = dict(zip(names, x.tolist()))
+        self.set_params(**solution)
+        return solution
+
+    def set_params(self, **kwargs):
+        """Update the parameter values and re-construct the path, returning the
+        list of the names of the sub-paths that have been rebuilt.
+
+        This is incremental, in that the dependencies recorded at construction
+        time are used to figure out which paths are affected by the change.
+        Nothing happens if none of the parameters that have actually changed
+        was used in the construction; otherwise construct() is called again,
+        but all the paths created before the first one depending on the
+        changed parameters are replayed from the previous construction, rather
+        than created anew. Mind construct() still runs in its entirety, i.e.,
+        all the code in there that is not the creation of a path (e.g., the
+        arithmetics on the points) is executed again, but all the quantities
+        derived from the geometry of the replayed sub-paths (e.g., the sampled
+        vertices) remain cached. The quantities derived from the geometry of
+        the overall path are invalidated.
+        """
+        changed = {name for name, value in kwargs.items() if
+                   name not in self.par_dict or self.par_dict[name] != value}
+        self.par_dict.update(**kwargs)
+        dependencies = self.__dict__.get('_creation_dependencies', [])
+        affected = [i for i, params in enumerate(dependencies) if params & changed]
+        if not affected:
+            return []
+        old_path_dict = self.path_dict
+        self.path_dict = {}
+        self.dependency_dict = {}
+        self.__dict__.pop('_cache', None)
+        self.__finalize(self._traced_construct(affected[0]))
+        return [name for name, path in self.path_dict.items() if old_path_dict.get(name) is not path]
+
     def path(self, name):
         """
         """
@@ -749,33 +1917,528 @@ class ParametricPolyPathBase(Path):
         we need to add an explicit check, here, in order to avoid infinite
         recursion.
         """
+        log = self.__dict__.get('_creation_log')
+        position = {} if log is None else \
+            {id(path): i for i, (path, _) in enumerate(log.entries)}
+        dependencies = self.__dict__.get('_creation_dependencies', [])
+        all_params = frozenset(self.par_dict)
         for name, obj in locals_.items():
             if isinstance(obj, Path) and not isinstance(obj, self.__class__):
                 obj.name = name
                 self.add_path(obj)
+                # Paths we have no record of are assumed to depend on everything.
+                try:
+                    self.dependency_dict[name] = dependencies[position[id(obj)]]
+                except KeyError:
+                    self.dependency_dict[name] = all_params
+
+    def _sample(self, tolerance: float):
+        """Overloaded method.
+
+        The sampled vertices of all the sub-paths are concatenated in a single
+        buffer, dropping the first vertex of each sub-path when it coincides
+        with the last vertex of the previous one (within the tolerance), and
+        inserting a row of NaNs otherwise. Mind the sub-paths are cached
+        individually, so this only involves a single copy.
+        """
+        separator = np.full((1, 2), np.nan)
+        chunks = []
+        last = None
+        for path in self.path_dict.values():
+            vertices = path.sample(tolerance)
+            if last is not None:
+                if np.hypot(*(vertices[0] - last)) <= tolerance:
+                    vertices = vertices[1:]
+                else:
+                    chunks.append(separator)
+            chunks.append(vertices)
+            if len(vertices):
+                last = vertices[-1]
+        if not chunks:
+            return np.empty((0, 2))
+        return np.concatenate(chunks)
+
+    def _spatial_index(self, tolerance: float):
+        """Overloaded method.
+
+        The primitives are labeled with the name of the sub-paths they belong
+        to.
+        """
+        primitives = []
+        keys = []
+        for name, path in self.path_dict.items():
+            _primitives = path.primitives(tolerance)
+            primitives += _primitives
+            keys += [name] * len(_primitives)
+        return PrimitiveIndex(primitives, keys)
+
+    def _bbox(self, tolerance: float):
+        """Overloaded method.
+
+        Mind the bounding boxes of the sub-paths are cached individually, and
+        survive the updates through set_params().
+        """
+        return bbox_union(path.bbox(tolerance) for path in self.path_dict.values())
+
+    def nearest(self, points, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Find the closest sub-path (and the closest point on it) for a set
+        of query points.
+
+        See the documentation of metalute.spatial.PrimitiveIndex.nearest() for
+        the details.
+        """
+        return self.spatial_index(tolerance).nearest(points)
+
+    def hits(self, bbox, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the names of all the sub-paths overlapping with a given
+        bounding box (xmin, ymin, xmax, ymax).
+        """
+        return self.spatial_index(tolerance).hits(bbox)
+
+    def open_ends(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the list of the open ends of the path, i.e., all the end
+        points of the sub-paths that are not connected to any other sub-path.
+
+        This is empty for a closed contour.
+        """
+        points, _, degree = connectivity(self.primitives(tolerance))
+        return [Point(x, y) for (x, y), n in zip(points, degree) if n == 1]
+
+    def _flat_paths(self):
+        """Return the list of all the sub-paths, recursively flattening the
+        sub-paths that are composite paths themselves.
+        """
+        paths = []
+        for path in self.path_dict.values():
+            if isinstance(path, ParametricPolyPathBase):
+                paths += path._flat_paths()
+            else:
+                paths.append(path)
+        return paths
+
+    def offset(self, distance: float, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the offset of the path at a given distance, in the form of a
+        CompositePath object.
+
+        Positive distances are on the left with respect to the direction of
+        travel (e.g., a counterclockwise contour shrinks for positive distances)
+        and standalone circles (e.g., holes) are offset toward their center.
+
+        The offset of all the lines and circular arcs is exact (the arcs keep
+        their center, start angle and span, while the radius is adjusted), and
+        the spiral arcs are offset along their local normal into poly-lines.
+        Since consecutive sub-paths are tangent to each other, their offsets
+        typically connect seamlessly, and the joints only need a fix where the
+        original path has a corner, or where an arc on the concave side
+        collapses because its radius is smaller than the offset distance. In
+        this case the collapsed arc is dropped, and the neighboring pieces are
+        either trimmed at their intersection (which removes the local
+        self-intersection) or joined with a round arc centered at the original
+        corner, as a router bit would do.
+
+        Finally, the global self-intersections (i.e., those between
+        non-consecutive pieces, which happen when two distinct parts of the
+        path, such as the two sides of a narrow waist or horn, are closer than
+        twice the offset distance) are trimmed away, see _trim_crossings().
+        Mind that the offset of a narrow waist might be split in two (or more)
+        separate loops.
+        """
+        chain = []
+        others = []
+        for path in self._flat_paths():
+            if isinstance(path, Cross):
+                continue
+            if isinstance(path, Circle) and not isinstance(path, CircularArc):
+                circle = path.offset(distance, tolerance)
+                if circle is not None:
+                    others.append(circle)
+                continue
+            chain.append((path, path.offset(distance, tolerance)))
+        # Group the offset pieces in connected chains. Each item in a group is
+        # a list containing the offset piece and the original joint with the
+        # preceding piece.
+        groups = []
+        last = None
+        for original, piece in chain:
+            if last is None or not last.end_point().distance_to(original.start_point()) <= 1.e-6:
+                groups.append([])
+                joint = None
+            else:
+                joint = original.start_point() if joint is None else joint
+            if piece is not None:
+                groups[-1].append([piece, joint])
+                joint = None
+            last = original
+        closed = len(groups) == 1 and len(chain) > 1 and \
+            chain[-1][0].end_point().distance_to(chain[0][0].start_point()) <= 1.e-6
+        if closed and groups[0] and groups[0][0][1] is None:
+            groups[0][0][1] = chain[0][0].start_point()
+        paths = []
+        for group in groups:
+            paths += self._join_offset_pieces(group, distance, closed, tolerance)
+        paths = self._trim_crossings(paths, [original for original, _ in chain],
+                                     distance, tolerance)
+        return CompositePath(paths + others)
+
+    @staticmethod
+    def _trim_crossings(pieces, originals, distance: float, tolerance: float):
+        """Remove the global self-intersections from a list of offset pieces
+        (see offset()).
+
+        The pieces are indexed by their primitives in a PrimitiveIndex object,
+        that serves as the broad phase for finding the crossings between pairs
+        of pieces (the intersections at the joints between consecutive pieces
+        do not count). All the pieces are split at the crossing points, and the
+        parts that are closer to the original paths than the offset distance
+        (i.e., the inverted loops that would gouge the part, in the case of a
+        tool path) are dropped. The remaining parts are re-arranged in
+        connected chains.
+        """
+        index = PrimitiveIndex(*zip(*[(primitive, i) for i, piece in enumerate(pieces) for
+                                      primitive in piece.primitives(tolerance)]))
+
+        def _is_end(path, point):
+            return min(point.distance_to(path.start_point()),
+                       point.distance_to(path.end_point())) <= 1.e-6
+
+        crossings = [[] for _ in pieces]
+        for i, a in enumerate(pieces):
+            for j in index.hits(a.bbox(tolerance)):
+                if j <= i:
+                    continue
+                b = pieces[j]
+                for p in _intersections(a, b):
+                    if not (_is_end(a, p) and _is_end(b, p)):
+                        crossings[i].append(p)
+                        crossings[j].append(p)
+        if not any(crossings):
+            return pieces
+        parts = []
+        for piece, points in zip(pieces, crossings):
+            parts += _split(piece, points, tolerance) if points else [piece]
+        primitives = [primitive for path in originals for primitive in path.primitives(tolerance)]
+        _, _, dist = PrimitiveIndex(primitives).nearest([_midpoint(part, tolerance) for part in parts])
+        parts = [part for part, d in zip(parts, dist) if d > abs(distance) - 5. * tolerance]
+        chains = []
+        while parts:
+            chain = [parts.pop(0)]
+            while True:
+                end = chain[-1].end_point()
+                k = next((k for k, part in enumerate(parts) if \
+                          part.start_point().distance_to(end) <= 1.e-6), None)
+                if k is None:
+                    break
+                chain.append(parts.pop(k))
+            chains += chain
+        return chains
+
+    @staticmethod
+    def _join_offset_pieces(group, distance: float, closed: bool, tolerance: float):
+        """Join a connected chain of offset pieces (see offset()), where each
+        item in the chain is a list [piece, joint] with the offset piece and the
+        joint of the original path with the previous piece.
+        """
+        pieces = [piece for piece, _ in group]
+        joints = [joint for _, joint in group]
+        k = 0
+        while len(pieces) > 1 and k < len(pieces) - 1 + int(closed):
+            j = (k + 1) % len(pieces)
+            a, b = pieces[k], pieces[j]
+            joint = joints[j]
+            if a.end_point().distance_to(b.start_point()) <= 1.e-6:
+                k += 1
+                continue
+            if joint is None:
+                joint = 0.5 * (a.end_point() + b.start_point())
+            candidates = _intersections(a, b)
+            if candidates:
+                p = min(candidates, key=lambda p: p.distance_to(joint))
+                pieces[k] = a.trimmed(p, at_end=True)
+                pieces[j] = b.trimmed(p, at_end=False)
+                k += 1
+                continue
+            _, ta = _tangents(a, tolerance)
+            tb, _ = _tangents(b, tolerance)
+            if (ta[0] * tb[1] - ta[1] * tb[0]) * distance <= 0.:
+                # Convex corner: insert a round joint.
+                dx1, dy1 = (a.end_point() - joint).xy()
+                dx2, dy2 = (b.start_point() - joint).xy()
+                phi1 = np.degrees(np.arctan2(dy1, dx1))
+                span = (np.degrees(np.arctan2(dy2, dx2)) - phi1 + 180.) % 360. - 180.
+                pieces.insert(k + 1, CircularArc(joint, abs(distance), phi1, span, 'join'))
+                joints.insert(k + 1, None)
+                joints[(k + 2) % len(pieces)] = None
+                k += 2
+                continue
+            # Concave corner with no intersection: one of the two pieces is
+            # entirely swallowed by the other, and we drop the shorter one.
+            drop = k if _path_length(a, tolerance) < _path_length(b, tolerance) else j
+            del pieces[drop]
+            del joints[drop]
+            if drop < k:
+                k -= 1
+        return pieces
+
+    def _mass_properties(self, tolerance: float):
+        """Calculate the mass properties of the region enclosed by the path.
+        """
+        boundary = []
+        correction = np.zeros(6)
+        pockets = MassProperties([0.] * 6)
+        for path in self._flat_paths():
+            if isinstance(path, Cross):
+                continue
+            if isinstance(path, Circle) and not isinstance(path, CircularArc):
+                pockets += MassProperties.from_primitives(path.primitives(tolerance))
+            elif isinstance(path, SpiralArc):
+                # Spiral arcs are replaced by their chord, and the difference
+                # between the line integrals along the spiral and the chord is
+                # integrated numerically.
+                chord = LinePrimitive(path.start_point().xy(), path.end_point().xy())
+                boundary.append(chord)
+                correction += curve_moments(path._xy, path.start_phi, path.end_phi)
+                correction -= segment_moments(*chord.start, *chord.end)
+            else:
+                boundary += path.primitives(tolerance)
+        moments = primitive_moments(boundary) + correction
+        if moments[0] < 0.:
+            moments = -moments
+        return MassProperties(moments) - pockets
+
+    def arc_length_table(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the (cached) cumulative arc-length table over all the
+        sub-paths.
+
+        See the documentation of the ArcLengthTable class for the details.
+        """
+        return self._cached(('arc_length_table', tolerance), ArcLengthTable,
+                            self._flat_paths(), tolerance)
+
+    def length(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE) -> float:
+        """Return the overall length of the path.
+        """
+        return self.arc_length_table(tolerance).length
+
+    def point_at(self, s, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the (x, y) coordinates of the points at a given (array of)
+        distance(s) along the path, as an array with a trailing dimension of
+        size 2.
+
+        This is vectorized, and meant to be used, e.g., for placing features
+        evenly spaced along a contour.
+        """
+        return self.arc_length_table(tolerance).point_at(s)
+
+    def tangent_at(self, s, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the unit tangent vectors at a given (array of) distance(s)
+        along the path.
+        """
+        return self.arc_length_table(tolerance).tangent_at(s)
+
+    def normal_at(self, s, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the unit normal vectors at a given (array of) distance(s)
+        along the path.
+        """
+        return self.arc_length_table(tolerance).normal_at(s)
+
+    def mass_properties(self, pockets=(), tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the mass properties (area, centroid and second moments) of the
+        region enclosed by the path, in the form of a MassProperties object.
+
+        The calculation is based on Green's theorem, and is exact for lines and
+        circular arcs, while spiral arcs are integrated numerically (the
+        tolerance only applies to other generic paths, which are integrated
+        along their poly-line approximation). If the boundary is open (e.g.,
+        for a headstock contour) it is implicitly closed with a straight
+        segment. Standalone circles (e.g., holes) are treated as pockets, and
+        subtracted, and so are all the (closed) paths passed as pockets.
+        """
+        props = self._cached(('mass_properties', tolerance), self._mass_properties, tolerance)
+        for pocket in pockets:
+            if isinstance(pocket, ParametricPolyPathBase):
+                props = props - pocket.mass_properties(tolerance=tolerance)
+            else:
+                props = props - MassProperties.from_primitives(pocket.primitives(tolerance))
+        return props
+
+    def area(self, pockets=(), tolerance: float = DEFAULT_SAMPLING_TOLERANCE) -> float:
+        """Return the area of the region enclosed by the path.
+
+        See mass_properties() for the details.
+        """
+        return self.mass_properties(pockets, tolerance).area()
+
+    def centroid(self, pockets=(), tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the centroid of the region enclosed by the path.
+
+        See mass_properties() for the details.
+        """
+        return Point(*self.mass_properties(pockets, tolerance).centroid())
+
+    def inertia(self, pockets=(), tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the second moments of area (Ixx, Iyy, Ixy) of the region
+        enclosed by the path, with respect to the centroid.
+
+        See mass_properties() for the details.
+        """
+        return self.mass_properties(pockets, tolerance).inertia()
 
     def draw_reference_points(self, offset, **kwargs):
         """Draw the reference points for all the sub-paths.
         """
-        points = []
+        offset = as_transform(offset)
+        welder = PointWelder()
         for path in self.path_dict.values():
-            for p in path.reference_points():
-                if p not in points:
-                    points.append(p)
-        for i, p in enumerate(points):
-            # Mind we create a copy of the original point so that we can
-            # set the name according to the index without modifying the
-            # original.
-            Point(p.x, p.y, '{:d}'.format(i + 1)).draw(offset, **kwargs)
+            welder.weld([p.xy() for p in path.reference_points()])
+        for i, (x, y) in enumerate(welder.points()):
+            Point(x, y, '{:d}'.format(i + 1)).draw(offset, **kwargs)
 
     def draw_construction(self, offset, **kwargs):
         """Draw the object.
         """
+        offset = as_transform(offset)
         for path in self.path_dict.values():
             path.draw_construction(offset, **kwargs)
 
-    def draw(self, offset, **kwargs):
-        """Draw the object.
+    def primitives(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Overloaded method.
         """
+        primitives = []
         for path in self.path_dict.values():
-            path.draw(offset, **kwargs)
+            primitives += path.primitives(tolerance)
+        return primitives
+
+    def draw(self, offset, batched: bool = False,
+             tolerance: float = DEFAULT_SAMPLING_TOLERANCE, **kwargs):
+        """Draw the object.
+
+        By default each sub-path is drawn separately, which results in (at
+        least) one matplotlib artist per sub-path. In batched mode the entire
+        path is drawn as a single PathPatch, built (and cached) from one
+        compound matplotlib.path.Path with native line and Bezier-arc segments.
+
+        In both cases the offset (either a Point or a Transform object) is
+        turned into a single transformation, that is shared by all the artists
+        and applied by matplotlib at rendering time.
+        """
+        offset = as_transform(offset)
+        if not batched:
+            for path in self.path_dict.values():
+                path.draw(offset, **kwargs)
+            return
+        from metalute.matplotlib_ import matplotlib
+        kwargs.setdefault('color', 'black')
+        current_context().patch(matplotlib.patches.PathPatch, self.mpl_path(tolerance), fill=False,
+                                transform=offset.mpl_transform(), **kwargs)
+
+
+
+class CompositePath(ParametricPolyPathBase):
+
+    """Composite path built from an explicit sequence of paths, rather than from
+    a set of parameters.
+
+    This is useful, e.g., to hold the output of an offset calculation, or to
+    group together paths that are constructed elsewhere. The paths retain
+    their names, if they have any, and are assigned a unique name otherwise.
+
+    Parameters
+    ----------
+    paths : sequence of Path objects
+        The paths making up the composite path.
+    """
+
+    def __init__(self, paths, name: str = None):
+        """Constructor.
+        """
+        self._paths = list(paths)
+        super().__init__()
+        self.name = name
+
+    def construct(self):
+        """Overloaded method.
+        """
+        path_dict = {}
+        for i, path in enumerate(self._paths):
+            name = path.name
+            if name is None or name in path_dict:
+                name = '{}{:d}'.format(name or path.__class__.__name__.lower(), i + 1)
+            path_dict[name] = path
+        return path_dict
+
+
+
+class PathBatch:
+
+    """Small container class for the output of ParametricPolyPathBase.batch().
+
+    All the coordinates are returned as arrays of shape (..., 2), where the
+    leading dimensions are those of the (broadcast) input parameters.
+
+    Parameters
+    ----------
+    path : ParametricPolyPathBase instance
+        The path constructed with array parameters.
+
+    shape : tuple
+        The shape of the (broadcast) input parameters.
+    """
+
+    def __init__(self, path, shape):
+        """Constructor.
+        """
+        self.path = path
+        self.shape = shape
+        self.par_dict = {key: np.broadcast_to(value, shape) for key, value in path.par_dict.items()
+                         if np.ndim(value) > 0}
+        self._paths = list(path.path_dict.values())
+
+    @property
+    def start_points(self):
+        """Return a dictionary with the start points of all the sub-paths.
+        """
+        return {path.name: self._xy(path.start_point()) for path in self._paths}
+
+    @property
+    def end_points(self):
+        """Return a dictionary with the end points of all the sub-paths.
+        """
+        return {path.name: self._xy(path.end_point()) for path in self._paths}
+
+    @property
+    def reference_points(self):
+        """Return a dictionary with the reference points of all the sub-paths.
+        """
+        return {path.name: [self._xy(p) for p in path.reference_points()] for path in self._paths}
+
+    def __len__(self):
+        """Return the number of variants.
+        """
+        return int(np.prod(self.shape))
+
+    def _xy(self, point):
+        """Convert a Point object with (possibly) array coordinates into an
+        array of shape (..., 2).
+        """
+        x = np.broadcast_to(point.x, self.shape)
+        y = np.broadcast_to(point.y, self.shape)
+        return np.stack((x, y), axis=-1)
+
+    def closure_vector(self):
+        """Return the vector from the end point of the last sub-path to the
+        start point of the first one, for all the variants.
+
+        This is identically zero for a closed contour.
+        """
+        return self._xy(self._paths[0].start_point()) - self.end_point()
+
+    def end_point(self):
+        """Return the end point of the last sub-path for all the variants.
+        """
+        return self._xy(self._paths[-1].end_point())
+
+    def closure_error(self):
+        """Return the distance between the start point of the first sub-path
+        and the end point of the last one, for all the variants.
+        """
+        return np.hypot(*np.moveaxis(self.closure_vector(), -1, 0))
@@ -23,12 +23,13 @@ of experience using it for designing things.
 """
 
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 
 import numpy as np
-import matplotlib
 
-from metalute.matplotlib_ import plt
+from metalute.matplotlib_ import current_context
+from metalute.primitives import LinePrimitive, ArcPrimitive, CirclePrimitive, bbox_union
+from metalute.transform import as_transform
 
 
 
@@ -38,25 +39,53 @@ class Drawable:
     """Base class for all 2-d drawable objects.
     """
 
+    __slots__ = ()
+
     @staticmethod
     def _parse_offset(offset):
-        """Parse the draw offset.
+        """Parse the draw offset into a Transform object.
         """
-        if isinstance(offset, Point):
-            return offset
-        if offset is None:
-            return Point(0., 0.)
-        if isinstance(offset, tuple):
-            return Point(*point)
-        raise RuntimeError(f'Cannot cast {offset} to Point.')
+        return as_transform(offset)
 
-    def _draw(self, offset, **kwargs):
+    def _draw(self, transform, **kwargs):
         """Do nothing _draw method.
 
         This is intended to be implemented in derived classes.
         """
         raise NotImplementedError
 
+    def primitives(self, tolerance: float = None):
+        """Return the list of drawing primitives (see the primitives module)
+        that the object is made of.
+
+        Mind all the objects in this module are made of straight lines and
+        circular arcs, and the tolerance argument is only there for
+        compatibility with the geometry module.
+        """
+        raise NotImplementedError
+
+    def _bbox(self):
+        """Do-nothing _bbox method.
+
+        This is intended to be implemented in derived classes.
+        """
+        raise NotImplementedError
+
+    def bbox(self):
+        """Return the bounding box (xmin, ymin, xmax, ymax) of the object.
+
+        The bounding box is cached, along with the values of the fields it was
+        calculated from, so that it is only re-calculated if any of the fields
+        has been changed in the meantime.
+        """
+        key = tuple(value.xy() if isinstance(value, Point) else value for value in \
+                    (getattr(self, field.name) for field in fields(self)))
+        cache = self.__dict__.get('_bbox_cache')
+        if cache is None or cache[0] != key:
+            cache = (key, self._bbox())
+            self.__dict__['_bbox_cache'] = cache
+        return cache[1]
+
     def draw(self, offset=None, **kwargs):
         """Base draw method.
 
@@ -65,8 +94,10 @@ class Drawable:
 
         * it sets the default values for the keyword arguments;
         * it provides a sensible default for the offset parameter;
-        * it allows to specify the offset as a 2-element tuple of float, rather
-          than a Point instance;
+        * it allows to specify the offset as a Point instance, a 2-element tuple
+          of float or a generic Transform object, and turns it into a Transform
+          object that derived classes hand over to matplotlib, so that no new
+          geometry is created at draw time;
         * it makes sure that the object being draw is returned, so that
           multiple draw operations can be effectively chained.
         """
@@ -77,14 +108,39 @@ class Drawable:
 
 
 
-@dataclass
+@dataclass(init=False, eq=False)
 class Point(Drawable):
 
     """Point in two dimensions.
+
+    Mind that, unlike all the other Drawable objects, this comes with custom
+    __init__(), __eq__() and __hash__(): points are by far the most numerous
+    objects in any design, and we want them to be immutable, compact (i.e.,
+    using __slots__) and with the quantized coordinates used for comparisons and
+    hashing calculated only once.
     """
 
-    x : float = 0.
-    y : float = 0.
+    __slots__ = ('x', 'y', '_key')
+
+    x : float
+    y : float
+
+    def __init__(self, x : float = 0., y : float = 0.):
+        """Constructor.
+        """
+        object.__setattr__(self, 'x', x)
+        object.__setattr__(self, 'y', y)
+
+    def __setattr__(self, name, value):
+        """Operator overload---Point objects are immutable.
+        """
+        raise AttributeError(f'Cannot set attribute {name} of immutable {self}.')
+
+    def __reduce__(self):
+        """Support for pickle and copy, which would otherwise bump into
+        __setattr__().
+        """
+        return (self.__class__, (self.x, self.y))
 
     @staticmethod
     def _round(value, digits=3):
@@ -97,30 +153,45 @@ class Point(Drawable):
         """
         return round(10.**digits * value)
 
+    def _quantized(self):
+        """Return the (cached) quantized coordinates of the point.
+        """
+        try:
+            return self._key
+        except AttributeError:
+            key = (self._round(self.x), self._round(self.y))
+            object.__setattr__(self, '_key', key)
+            return key
+
     def __eq__(self, other):
         """Operator overload.
 
         This (along with the fellow __hash__()) is useful if we want remove
         duplicates from a list of points.
         """
-        return self._round(self.x) == self._round(other.x) and\
-               self._round(self.y) == self._round(other.y)
+        if not isinstance(other, Point):
+            return NotImplemented
+        return self._quantized() == other._quantized()
 
     def __hash__(self):
         """Operator overload.
 
         See the comment about __eq__().
         """
-        return hash((self._round(self.x), self._round(self.y)))
+        return hash(self._quantized())
 
     def __add__(self, other):
         """Operator overload.
         """
+        if isinstance(other, PointArray):
+            return other + self
         return self.__class__(self.x + other.x, self.y + other.y)
 
     def __sub__(self, other):
         """Operator overload.
         """
+        if isinstance(other, PointArray):
+            return -1. * other + self
         return self.__class__(self.x - other.x, self.y - other.y)
 
     def __rmul__(self, const: float):
@@ -133,11 +204,11 @@ class Point(Drawable):
         """
         return self.__class__(self.x / const, self.y / const)
 
-    def _draw(self, offset, **kwargs):
+    def _draw(self, transform, **kwargs):
         """Overloaded method.
         """
         kwargs.setdefault('markersize', 4.)
-        plt.plot(self.x + offset.x, self.y + offset.y, 'o', **kwargs)
+        current_context().plot(self.x, self.y, 'o', transform=transform.mpl_transform(), **kwargs)
 
     def xy(self):
         """Return the two orthogonal coordinates as a 2-element tuple.
@@ -148,10 +219,24 @@ class Point(Drawable):
         """
         return (self.x, self.y)
 
+    def primitives(self, tolerance: float = None):
+        """Overloaded method.
+
+        Points are markers, rather than geometry, and have no primitives.
+        """
+        return []
+
+    def bbox(self):
+        """Overloaded method.
+
+        Mind there is no need for any caching, here.
+        """
+        return (self.x, self.y, self.x, self.y)
+
     def distance_to(self, other) -> float:
         """Return the distance to another Point object.
         """
-        dx, dy = self - other
+        dx, dy = (self - other).xy()
         return np.sqrt(dx**2. + dy**2.)
 
     def move(self, dist: float, slope: float):
@@ -190,6 +275,156 @@ def point(x : float = 0., y : float = 0., offset=None, **kwargs):
 
 
 
+@dataclass(eq=False)
+class PointArray(Drawable):
+
+    """Array of points in two dimensions.
+
+    This is the struct-of-arrays counterpart of the Point class: the x and y
+    coordinates are stored in two contiguous float64 numpy arrays, and all the
+    basic operations (moving, offsetting, scaling and measuring distances) are
+    carried out in a single vectorized pass, rather than one Point object at
+    a time.
+
+    PointArray objects interoperate with plain Point objects, i.e., you can
+    add or subtract a Point to a PointArray (and vice versa), and indexing or
+    iterating over a PointArray yields Point objects.
+    """
+
+    x : np.ndarray
+    y : np.ndarray
+
+    def __post_init__(self):
+        """Overloaded method.
+        """
+        x, y = np.broadcast_arrays(np.asarray(self.x, dtype=float),
+                                   np.asarray(self.y, dtype=float))
+        assert x.ndim == 1
+        self.x = np.ascontiguousarray(x)
+        self.y = np.ascontiguousarray(y)
+
+    @classmethod
+    def from_points(cls, points):
+        """Create a PointArray from an iterable of Point objects.
+        """
+        points = list(points)
+        x = np.fromiter((p.x for p in points), dtype=float, count=len(points))
+        y = np.fromiter((p.y for p in points), dtype=float, count=len(points))
+        return cls(x, y)
+
+    def __len__(self):
+        """Return the number of points in the array.
+        """
+        return len(self.x)
+
+    def __getitem__(self, index):
+        """Return a single Point (for an integer index) or a PointArray (for a
+        slice or an index array).
+        """
+        if np.ndim(index) == 0 and not isinstance(index, slice):
+            return Point(float(self.x[index]), float(self.y[index]))
+        return self.__class__(self.x[index], self.y[index])
+
+    def __iter__(self):
+        """Iterate over the points as Point objects.
+        """
+        for x, y in zip(self.x.tolist(), self.y.tolist()):
+            yield Point(x, y)
+
+    def __add__(self, other):
+        """Operator overload.
+
+        Note other can be either a Point or a PointArray object.
+        """
+        return self.__class__(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other):
+        """Operator overload.
+
+        Note other can be either a Point or a PointArray object.
+        """
+        return self.__class__(self.x - other.x, self.y - other.y)
+
+    def __rmul__(self, const):
+        """Operator overload.
+
+        Note const can be either a scalar or an array with one element per point.
+        """
+        return self.__class__(self.x * const, self.y * const)
+
+    def __truediv__(self, const):
+        """Operator overload.
+        """
+        return self.__class__(self.x / const, self.y / const)
+
+    def _draw(self, transform, **kwargs):
+        """Overloaded method.
+
+        All the points are drawn in a single call.
+        """
+        kwargs.setdefault('markersize', 4.)
+        kwargs.setdefault('ls', 'none')
+        current_context().plot(self.x, self.y, 'o', transform=transform.mpl_transform(), **kwargs)
+
+    def xy(self):
+        """Return the two coordinate arrays as a 2-element tuple.
+        """
+        return (self.x, self.y)
+
+    def primitives(self, tolerance: float = None):
+        """Overloaded method.
+
+        Points are markers, rather than geometry, and have no primitives.
+        """
+        return []
+
+    def bbox(self):
+        """Overloaded method.
+
+        Mind this is not cached, as the underlying arrays might be modified
+        in place.
+        """
+        return (self.x.min(), self.y.min(), self.x.max(), self.y.max())
+
+    def distance_to(self, other):
+        """Return the array of distances to another Point or PointArray object.
+        """
+        return np.hypot(self.x - other.x, self.y - other.y)
+
+    def move(self, dist, slope):
+        """Return the points a distance dist from the initial ones in a given
+        direction.
+
+        Both dist and slope can be either scalars or arrays with one element
+        per point.
+
+        Parameters
+        ---------
+        dist : float or array_like
+            The distant from the initial points.
+
+        slope : float or array_like
+            The angle (in degrees) determing the direction to move along,
+            measured from the x-axis counter-clockwise.
+        """
+        slope = np.radians(slope)
+        return self.__class__(self.x + dist * np.cos(slope), self.y + dist * np.sin(slope))
+
+    def hmove(self, dist):
+        """Move the points horizontally.
+
+        Mind we don't go through move(), here, as there is no need to evaluate
+        any trigonometric function.
+        """
+        return self.__class__(self.x + dist, self.y)
+
+    def vmove(self, dist):
+        """Move the points vertically.
+        """
+        return self.__class__(self.x, self.y + dist)
+
+
+
 @dataclass
 class Line(Drawable):
 
@@ -199,15 +434,27 @@ class Line(Drawable):
     start_point : Point
     end_point : Point
 
-    def _draw(self, offset, **kwargs):
+    def _draw(self, transform, **kwargs):
         """Overloaded method.
 
         This could be likely improved, possibly with axline(), that is only
         supported in matplotlib 3.3 and later.
         """
-        x1, y1 = (self.start_point + offset).xy()
-        x2, y2 = (self.end_point + offset).xy()
-        plt.plot((x1, x2), (y1, y2), '-', **kwargs)
+        x1, y1 = self.start_point.xy()
+        x2, y2 = self.end_point.xy()
+        current_context().plot((x1, x2), (y1, y2), '-', transform=transform.mpl_transform(),
+                               **kwargs)
+
+    def primitives(self, tolerance: float = None):
+        """Overloaded method.
+        """
+        return [LinePrimitive(self.start_point.xy(), self.end_point.xy())]
+
+    def _bbox(self):
+        """Overloaded method.
+        """
+        (x1, y1), (x2, y2) = self.start_point.xy(), self.end_point.xy()
+        return (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
 
     def slope(self):
         """Return the slope of the line.
@@ -285,22 +532,49 @@ class Rectangle(Drawable):
         assert self.height >= 0.
         assert self.corner_radius >= 0.
 
-    def _draw(self, offset, **kwargs):
+    def pieces(self):
+        """Return the list of lines and arcs that the rectangle is made of.
+        """
+        p = self.center + Point(-0.5 * self.width, -0.5 * self.height)
+        p = p.vmove(self.corner_radius)
+        w = self.width - 2. * self.corner_radius
+        h = self.height - 2. * self.corner_radius
+        r = self.corner_radius
+        pieces = [Line(p, p.vmove(h))]
+        for length in (w, h, w):
+            pieces.append(pieces[-1].connecting_arc(r, -90.))
+            pieces.append(pieces[-1].connecting_line(length))
+        pieces.append(pieces[-1].connecting_arc(r, -90.))
+        return pieces
+
+    def primitives(self, tolerance: float = None):
+        """Overloaded method.
+        """
+        return [primitive for piece in self.pieces() for primitive in piece.primitives()]
+
+    def _bbox(self):
         """Overloaded method.
         """
-        p = self.center + Point(-0.5 * self.width, -0.5 * self.height) + offset
+        w = 0.5 * self.width
+        h = 0.5 * self.height
+        return (self.center.x - w, self.center.y - h, self.center.x + w, self.center.y + h)
+
+    def _draw(self, transform, **kwargs):
+        """Overloaded method.
+        """
+        p = self.center + Point(-0.5 * self.width, -0.5 * self.height)
         p = p.vmove(self.corner_radius)
         w = self.width - 2. * self.corner_radius
         h = self.height - 2. * self.corner_radius
         r = self.corner_radius
-        line(p, p.vmove(h), **kwargs).\
-            draw_connecting_arc(r, -90., **kwargs).\
-            draw_connecting_line(w, **kwargs).\
-            draw_connecting_arc(r, -90., **kwargs).\
-            draw_connecting_line(h, **kwargs).\
-            draw_connecting_arc(r, -90., **kwargs).\
-            draw_connecting_line(w, **kwargs).\
-            draw_connecting_arc(r, -90., **kwargs)
+        line(p, p.vmove(h), transform, **kwargs).\
+            draw_connecting_arc(r, -90., transform, **kwargs).\
+            draw_connecting_line(w, transform, **kwargs).\
+            draw_connecting_arc(r, -90., transform, **kwargs).\
+            draw_connecting_line(h, transform, **kwargs).\
+            draw_connecting_arc(r, -90., transform, **kwargs).\
+            draw_connecting_line(w, transform, **kwargs).\
+            draw_connecting_arc(r, -90., transform, **kwargs)
 
 
 
@@ -323,16 +597,38 @@ class Cap(Drawable):
     height : float
     corner_radius : float = 0.
 
-    def _draw(self, offset, **kwargs):
+    def pieces(self):
+        """Return the list of lines and arcs that the cap is made of.
+        """
+        b = self.base - 2. * self.corner_radius
+        h = self.height - self.corner_radius
+        line1 = Line(self.start_point, self.start_point.move(h, self.start_slope))
+        arc1 = line1.connecting_arc(self.corner_radius, 90.)
+        line2 = arc1.connecting_line(b)
+        arc2 = line2.connecting_arc(self.corner_radius, 90.)
+        line3 = arc2.connecting_line(h)
+        return [line1, arc1, line2, arc2, line3]
+
+    def primitives(self, tolerance: float = None):
+        """Overloaded method.
+        """
+        return [primitive for piece in self.pieces() for primitive in piece.primitives()]
+
+    def _bbox(self):
+        """Overloaded method.
+        """
+        return bbox_union(piece.bbox() for piece in self.pieces())
+
+    def _draw(self, transform, **kwargs):
         """Overloaded method.
         """
         b = self.base - 2. * self.corner_radius
         h = self.height - self.corner_radius
-        line(self.start_point, self.start_point.move(h, self.start_slope), offset).\
-            draw_connecting_arc(self.corner_radius, 90., offset).\
-            draw_connecting_line(b, offset).\
-            draw_connecting_arc(self.corner_radius, 90., offset).\
-            draw_connecting_line(h, offset)
+        line(self.start_point, self.start_point.move(h, self.start_slope), transform).\
+            draw_connecting_arc(self.corner_radius, 90., transform).\
+            draw_connecting_line(b, transform).\
+            draw_connecting_arc(self.corner_radius, 90., transform).\
+            draw_connecting_line(h, transform)
 
 
 
@@ -414,10 +710,28 @@ class Arc(Drawable):
         """
         return self.end_angle() + 90. + 180. * (self.span_angle < 0.)
 
-    def _draw(self, offset, **kwargs):
+    def primitives(self, tolerance: float = None):
+        """Overloaded method.
+
+        Mind degenerate arcs (e.g., the corners of a rectangle with no corner
+        radius) have no primitives.
+        """
+        if self.radius == 0.:
+            return []
+        return [ArcPrimitive(self.center.xy(), self.radius, self.start_angle, self.span_angle)]
+
+    def _bbox(self):
+        """Overloaded method.
+
+        This is exact, i.e., it includes the extremal points of the circle at
+        multiples of 90 degrees that fall within the span of the arc.
+        """
+        return ArcPrimitive(self.center.xy(), self.radius, self.start_angle, self.span_angle).bbox()
+
+    def _draw(self, transform, **kwargs):
         """Draw the circular arc.
         """
-        xy = (self.center + offset).xy()
+        xy = self.center.xy()
         d = 2. * self.radius
         # Mind that matplotlib is always drawing arcs counterclockwise, so we
         # do have to swap the extremes if the arc measure is negative.
@@ -425,8 +739,9 @@ class Arc(Drawable):
         theta2 = self.end_angle()
         if self.span_angle < 0.:
             theta1, theta2 = theta2, theta1
-        _arc = matplotlib.patches.Arc(xy, d, d, 0., theta1, theta2, **kwargs)
-        plt.gca().add_patch(_arc)
+        from metalute.matplotlib_ import matplotlib
+        current_context().patch(matplotlib.patches.Arc, xy, d, d, 0., theta1, theta2,
+                                transform=transform.mpl_transform(), **kwargs)
         return self
 
     def connecting_line(self, dist : float):
@@ -458,12 +773,26 @@ class Cross(Drawable):
     center : Point
     radius : float
 
-    def _draw(self, offset, **kwargs):
+    def primitives(self, tolerance: float = None):
+        """Overloaded method.
+        """
+        x, y = self.center.xy()
+        r = self.radius
+        return [LinePrimitive((x - r, y), (x + r, y)), LinePrimitive((x, y - r), (x, y + r))]
+
+    def _bbox(self):
+        """Overloaded method.
+        """
+        x, y = self.center.xy()
+        r = self.radius
+        return (x - r, y - r, x + r, y + r)
+
+    def _draw(self, transform, **kwargs):
         """Overloaded method.
         """
-        p0 = self.center + offset
-        line(p0.hmove(-self.radius), p0.hmove(self.radius))
-        line(p0.vmove(-self.radius), p0.vmove(self.radius))
+        p0 = self.center
+        line(p0.hmove(-self.radius), p0.hmove(self.radius), transform, **kwargs)
+        line(p0.vmove(-self.radius), p0.vmove(self.radius), transform, **kwargs)
 
 
 
@@ -483,13 +812,26 @@ class Circle(Drawable):
     center : Point
     radius : float
 
-    def _draw(self, offset, **kwargs):
+    def primitives(self, tolerance: float = None):
+        """Overloaded method.
+        """
+        return [CirclePrimitive(self.center.xy(), self.radius)]
+
+    def _bbox(self):
         """Overloaded method.
         """
-        xy = (self.center + offset).xy()
+        x, y = self.center.xy()
+        r = self.radius
+        return (x - r, y - r, x + r, y + r)
+
+    def _draw(self, transform, **kwargs):
+        """Overloaded method.
+        """
+        xy = self.center.xy()
         d = 2. * self.radius
-        _arc = matplotlib.patches.Arc(xy, d, d, 0., 0., 360., **kwargs)
-        plt.gca().add_patch(_arc)
+        from metalute.matplotlib_ import matplotlib
+        current_context().patch(matplotlib.patches.Arc, xy, d, d, 0., 0., 360.,
+                                transform=transform.mpl_transform(), **kwargs)
         return self
 
 
@@ -517,11 +859,26 @@ class Hole(Drawable):
         assert self.diameter >= 0
         self.radius = 0.5 * self.diameter
 
-    def _draw(self, offset, **kwargs):
+    def primitives(self, tolerance: float = None):
+        """Overloaded method.
+        """
+        cross = Cross(self.center, 0.5 * self.diameter * self.cross_scale)
+        return Circle(self.center, 0.5 * self.diameter).primitives() + cross.primitives()
+
+    def _bbox(self):
+        """Overloaded method.
+
+        Mind the cross might extend beyond the circle.
+        """
+        x, y = self.center.xy()
+        r = 0.5 * self.diameter * max(1., self.cross_scale)
+        return (x - r, y - r, x + r, y + r)
+
+    def _draw(self, transform, **kwargs):
         """Overloaded method.
         """
-        circle(self.center, self.radius, offset, **kwargs)
-        cross(self.center, self.radius * self.cross_scale, offset, **kwargs)
+        circle(self.center, self.radius, transform, **kwargs)
+        cross(self.center, self.radius * self.cross_scale, transform, **kwargs)
 
 
 
@@ -22,7 +22,10 @@ import numpy as np
 
 from metalute.units import inches_to_mm
 from metalute.matplotlib_ import plt
-from metalute.geometry import Point, Line, CircularArc, Hole, ParametricPolyPathBase
+from metalute.geometry import Point, Line, CircularArc, Hole, ParametricPolyPathBase,\
+    DEFAULT_SAMPLING_TOLERANCE
+from metalute.primitives import bbox_union
+from metalute.transform import Transform, as_transform
 from metalute.dimension import dim, vdim
 
 
@@ -68,22 +71,60 @@ class HeadstockBase:
         """
         self.holes.append(Hole(center, self.hole_diameter))
 
+    def axis(self, padding: float = 20., length: float = 150.):
+        """Return the axis of the headstock, as drawn in the top view.
+        """
+        p1 = self.contour.anchor.hmove(-padding)
+        p2 = self.contour.anchor.hmove(length + padding)
+        return Line(p1, p2)
+
+    def bbox(self):
+        """Return the bounding box (xmin, ymin, xmax, ymax) of the top view,
+        i.e., of the contour, the holes and the axis.
+
+        Mind this includes the rotation by the headstock angle, in which case
+        the bounding box is calculated from the sampled vertices.
+        """
+        paths = [self.contour, self.axis()] + self.holes
+        if self.angle == 0.:
+            return bbox_union(path.bbox() for path in paths)
+        vertices = self.top_transform(None).apply(np.vstack([path.sample() for path in paths]))
+        return tuple(np.nanmin(vertices, axis=0)) + tuple(np.nanmax(vertices, axis=0))
+
+    def primitives(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the list of drawing primitives for the top view (i.e., the
+        contour and the holes, but not the axis), including the rotation by
+        the headstock angle.
+        """
+        primitives = self.contour.primitives(tolerance)
+        for hole in self.holes:
+            primitives += hole.primitives(tolerance)
+        if self.angle != 0.:
+            primitives = self.top_transform(None).apply_primitives(primitives)
+        return primitives
+
+    def top_transform(self, offset):
+        """Return the transformation placing the top view on the canvas, i.e.,
+        the rotation by the headstock angle around the anchor of the contour,
+        followed by the offset (either a Point or a Transform object).
+        """
+        return as_transform(offset) @ Transform.rotation(self.angle, self.contour.anchor)
+
     def draw_top(self, offset, **kwargs):
         """Draw the top view.
+
+        The transformation is composed once, and shared by all the pieces.
         """
+        transform = self.top_transform(offset)
         # Draw the contour.
-        self.contour.draw(offset, **kwargs)
+        self.contour.draw(transform, **kwargs)
         # Draw the holes.
         for hole in self.holes:
-            hole.draw(offset, **kwargs)
+            hole.draw(transform, **kwargs)
         # Draw the axis.
-        padding = 20.
-        length = 150.
-        p1 = self.contour.anchor.hmove(-padding)
-        p2 = self.contour.anchor.hmove(length + padding)
         kwargs.setdefault('color', 'lightgrey')
         kwargs.setdefault('ls', 'dashdot')
-        Line(p1, p2).draw(offset, **kwargs)
+        self.axis().draw(transform, **kwargs)
 
 
 class FenderStratocasterContour(HeadstockContourBase):
@@ -125,6 +166,11 @@ class FenderStratocasterContour(HeadstockContourBase):
         arc5 = arc4.connecting_circular_arc(self.r5, self.span5)
         arc6 = arc5.connecting_circular_arc(-self.r6, self.span6)
         # Last circle---here things are a little bit tricky :-)
+        # The arc has a fixed radius, passes through the end point of the
+        # previous arc (with a corner) and is tangent to the bottom edge of the
+        # neck, which fixes its span in closed form. Mind there is no free
+        # parameter to adjust, here, so solve_closure() does not apply, and
+        # the expression works element-wise on the arrays passed to batch().
         p = arc6.end_point()
         phi = np.degrees(np.arccos(1. - (-0.5 * self.width_at_nut - p.y) / self.r7))
         dx = self.r7 * np.sin(np.radians(phi))
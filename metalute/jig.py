@@ -21,7 +21,7 @@ from dataclasses import dataclass
 import numpy as np
 
 from metalute.blueprint import blueprint
-from metalute.geometry2 import Drawable, Point, line, rectangle, circle, hole
+from metalute.geometry2 import Drawable, Point, PointArray, line, rectangle, circle, hole
 from metalute.matplotlib_ import plt
 
 
@@ -49,24 +49,25 @@ class JigsawJig(Drawable):
         """
         # Draw the outer contour.
         w = 0.5 * self.width
-        p = Point(0.5 * self.length + 0.5 * w, w) + offset
+        p = Point(0.5 * self.length + 0.5 * w, w)
         l = 0.5 * self.width * np.sqrt(2.) - self.head_radius
-        _arc = line(p, p.hmove(-self.length)).draw_connecting_line(l, 225.).\
-            draw_connecting_arc(self.head_radius, 90.)
-        _arc.draw_connecting_line(l).draw_connecting_line(self.length, 0.).\
-            draw_connecting_line(self.width, 90.)
+        _arc = line(p, p.hmove(-self.length), offset).draw_connecting_line(l, 225., offset).\
+            draw_connecting_arc(self.head_radius, 90., offset)
+        _arc.draw_connecting_line(l, offset).draw_connecting_line(self.length, 0., offset).\
+            draw_connecting_line(self.width, 90., offset)
         # The pin hole.
-        hole(_arc.center, self.pin_hole_diameter)
+        hole(_arc.center, self.pin_hole_diameter, offset=offset)
         # The two borders.
-        c = Point(0.5 * w, 0.5 * (self.channel_width + self.border_width)) + offset
-        rectangle(c, self.length, self.border_width)
+        c = Point(0.5 * w, 0.5 * (self.channel_width + self.border_width))
+        rectangle(c, self.length, self.border_width, offset=offset)
         c = c.vmove(-self.channel_width - self.border_width)
-        rectangle(c, self.length, self.border_width)
+        rectangle(c, self.length, self.border_width, offset=offset)
         # The two big holes.
         c = Point(p.x - self.hole_diameter, 0.)
-        hole(c, self.hole_diameter)
-        hole(c.hmove(-self.length + 2. * self.hole_diameter), self.hole_diameter)
-        line(c.hmove(-0.5 * self.hole_diameter), c.hmove(-self.length + 2.5 * self.hole_diameter))
+        hole(c, self.hole_diameter, offset=offset)
+        hole(c.hmove(-self.length + 2. * self.hole_diameter), self.hole_diameter, offset=offset)
+        line(c.hmove(-0.5 * self.hole_diameter), c.hmove(-self.length + 2.5 * self.hole_diameter),
+             offset)
 
 
 
@@ -101,14 +102,13 @@ class Workbench(Drawable):
         rectangle(center.hmove(d), self.base_stud_thickness, h, 0., offset, ls='dashed')
         # Hole grid and channels.
         h = 4. * self.hole_pitch + self.hole_diameter
-        for i in range(-4, 5):
-            for j in range(-2, 3):
-                if i in  [-3, 0, 3]:
-                    p = Point(i * self.hole_pitch, 0.)
-                    rectangle(p, self.channel_width, h, 0.4999 * self.channel_width, offset)
-                else:
-                    c = Point(i * self.hole_pitch, j * self.hole_pitch)
-                    hole(c, self.hole_diameter, offset=offset)
+        for i in [-3, 0, 3]:
+            p = Point(i * self.hole_pitch, 0.)
+            rectangle(p, self.channel_width, h, 0.4999 * self.channel_width, offset)
+        i, j = np.meshgrid([-4, -2, -1, 1, 2, 4], np.arange(-2, 3))
+        centers = self.hole_pitch * PointArray(i.ravel(), j.ravel())
+        for c in centers:
+            hole(c, self.hole_diameter, offset=offset)
 
 
 
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Mass properties of planar regions.
+
+All the calculations are based on Green's theorem, i.e., the area integrals of
+1, x, y, x^2, y^2 and xy over a region are turned into line integrals along
+the boundary, which are evaluated in closed form for each of the elementary
+drawing primitives (straight segments and circular arcs). Poly-lines are
+handled as sequences of straight segments, and generic parametric curves can
+be integrated numerically.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from metalute.primitives import LinePrimitive, ArcPrimitive, CirclePrimitive,\
+    PolylinePrimitive, connected
+
+
+def segment_moments(x1, y1, x2, y2):
+    """Return the line integrals of the moments along a set of straight
+    segments (passed as arrays of end-point coordinates), summed together.
+
+    The output is a 6-element array with the contributions to the area
+    integrals of 1, x, y, y^2, x^2 and xy (in this order).
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+    area = 0.5 * (x1 * y2 - x2 * y1)
+    sx = dy * (x1**2. + x1 * x2 + x2**2.) / 6.
+    sy = -dx * (y1**2. + y1 * y2 + y2**2.) / 6.
+    ixx = -dx * (y1 + y2) * (y1**2. + y2**2.) / 12.
+    iyy = dy * (x1 + x2) * (x1**2. + x2**2.) / 12.
+    ixy = 0.5 * dy * (x1**2. * y1 + 0.5 * x1**2. * dy + x1 * dx * y1 + 2. / 3. * x1 * dx * dy +
+                      dx**2. * y1 / 3. + 0.25 * dx**2. * dy)
+    return np.array([np.sum(val) for val in (area, sx, sy, ixx, iyy, ixy)])
+
+
+@lru_cache()
+def _gauss_legendre(order: int):
+    """Cached Gauss-Legendre nodes and weights.
+    """
+    return np.polynomial.legendre.leggauss(order)
+
+
+def curve_moments(func, tmin: float, tmax: float, num_panels: int = 64, order: int = 8):
+    """Return the line integrals of the moments along a generic parametric
+    curve, integrated numerically.
+
+    The integrals are evaluated with a composite Gauss-Legendre quadrature,
+    and the derivatives of the coordinates with respect to the parameter are
+    calculated with central differences.
+
+    Parameters
+    ----------
+    func : callable
+        A vectorized function of the parameter returning the x and y
+        coordinates of the curve.
+
+    tmin, tmax : float
+        The extremes of the parameter range.
+
+    num_panels : int
+        The number of panels for the composite quadrature.
+
+    order : int
+        The number of quadrature points per panel.
+    """
+    nodes, weights = _gauss_legendre(order)
+    edges = np.linspace(tmin, tmax, num_panels + 1)
+    half = 0.5 * (edges[1:] - edges[:-1])[:, None]
+    t = (0.5 * (edges[1:] + edges[:-1])[:, None] + half * nodes).ravel()
+    w = (half * weights).ravel()
+    h = 1.e-6 * max(abs(tmax - tmin), 1.)
+    x, y = func(t)
+    x1, y1 = func(t - h)
+    x2, y2 = func(t + h)
+    dx = (x2 - x1) / (2. * h)
+    dy = (y2 - y1) / (2. * h)
+    integrands = (0.5 * (x * dy - y * dx), 0.5 * x**2. * dy, -0.5 * y**2. * dx,
+                  -y**3. * dx / 3., x**3. * dy / 3., 0.5 * x**2. * y * dy)
+    return np.array([np.sum(w * val) for val in integrands])
+
+
+def sector_moments(center, radius, start_phi, span):
+    """Return the moments of a set of circular sectors (passed as arrays of
+    parameters), with the sign of the span, summed together.
+    """
+    cx, cy = center
+    theta1 = np.radians(start_phi)
+    theta2 = np.radians(start_phi + span)
+    delta = theta2 - theta1
+    r2 = radius**2.
+    sin1, sin2, cos1, cos2 = np.sin(theta1), np.sin(theta2), np.cos(theta1), np.cos(theta2)
+    # Moments in the reference system centered in the center of the circle...
+    area = 0.5 * r2 * delta
+    su = radius**3. / 3. * (sin2 - sin1)
+    sv = radius**3. / 3. * (cos1 - cos2)
+    suu = 0.25 * r2**2. * (0.5 * delta + 0.5 * (sin2 * cos2 - sin1 * cos1))
+    svv = 0.25 * r2**2. * (0.5 * delta - 0.5 * (sin2 * cos2 - sin1 * cos1))
+    suv = 0.125 * r2**2. * (sin2**2. - sin1**2.)
+    # ...and translated into the global reference system.
+    moments = (area, cx * area + su, cy * area + sv, cy**2. * area + 2. * cy * sv + svv,
+               cx**2. * area + 2. * cx * su + suu, cx * cy * area + cx * sv + cy * su + suv)
+    return np.array([np.sum(val) for val in moments])
+
+
+def primitive_moments(primitives):
+    """Return the line integrals of the moments along a sequence of primitives.
+
+    Consecutive primitives that are connected to each other are grouped into
+    runs, and each run that is not closed is implicitly closed with a
+    straight segment (e.g., an open headstock contour is closed along the nut).
+    Full circles are closed by construction, and always count as positive
+    (counterclockwise) loops.
+
+    The line integral along a circular arc is calculated as the moments of the
+    circular sector subtended by the arc, minus the contributions of the two
+    radial segments. All the straight segments and all the sectors are
+    collected and evaluated at once.
+    """
+    segments = []
+    sectors = []
+    run_start = None
+    last = None
+
+    def _close(start, end):
+        if start is not None and not connected(start, end):
+            segments.append(end + start)
+
+    for primitive in primitives:
+        if isinstance(primitive, CirclePrimitive):
+            sectors.append(primitive.center + (primitive.radius, 0., 360.))
+            continue
+        if last is None or not connected(last, primitive.start_point()):
+            if last is not None:
+                _close(run_start, last)
+            run_start = primitive.start_point()
+        if isinstance(primitive, LinePrimitive):
+            segments.append(primitive.start + primitive.end)
+        elif isinstance(primitive, PolylinePrimitive):
+            vertices = np.asarray(primitive.vertices, dtype=float)
+            chunk = np.hstack((vertices[:-1], vertices[1:]))
+            # Mind that poly-lines might contain NaN separators.
+            segments += chunk[np.isfinite(chunk).all(axis=1)].tolist()
+        elif isinstance(primitive, ArcPrimitive):
+            center = tuple(primitive.center)
+            sectors.append(center + tuple(primitive[1:]))
+            # Mind the radial segments are traversed backwards, so that their
+            # contributions are subtracted.
+            segments.append(primitive.start_point() + center)
+            segments.append(center + primitive.end_point())
+        else:
+            raise RuntimeError('Unknown primitive {}'.format(primitive))
+        last = primitive.end_point()
+    if last is not None:
+        _close(run_start, last)
+    moments = np.zeros(6)
+    if segments:
+        moments += segment_moments(*np.array(segments, dtype=float).T)
+    if sectors:
+        cx, cy, radius, start_phi, span = np.array(sectors, dtype=float).T
+        moments += sector_moments((cx, cy), radius, start_phi, span)
+    return moments
+
+
+class MassProperties:
+
+    """Mass properties (area, first and second moments) of a planar region.
+
+    The region is described by the six area integrals of 1, x, y, y^2, x^2
+    and xy, and mass properties can be added and subtracted (e.g., to account
+    for pockets).
+
+    Parameters
+    ----------
+    moments : array_like
+        The six area integrals.
+    """
+
+    def __init__(self, moments):
+        """Constructor.
+        """
+        self.moments = np.array(moments, dtype=float)
+
+    @classmethod
+    def from_primitives(cls, primitives):
+        """Create a MassProperties object from the boundary of a region, in
+        the form of a sequence of drawing primitives.
+
+        Mind the orientation of the boundary is irrelevant, i.e., the area is
+        always positive.
+        """
+        moments = primitive_moments(primitives)
+        if moments[0] < 0.:
+            moments = -moments
+        return cls(moments)
+
+    def __add__(self, other):
+        """Operator overload.
+        """
+        return self.__class__(self.moments + other.moments)
+
+    def __sub__(self, other):
+        """Operator overload.
+        """
+        return self.__class__(self.moments - other.moments)
+
+    def area(self) -> float:
+        """Return the area.
+        """
+        return self.moments[0]
+
+    def centroid(self):
+        """Return the (x, y) coordinates of the centroid.
+        """
+        area, sx, sy = self.moments[:3]
+        return sx / area, sy / area
+
+    def inertia(self, centroidal: bool = True):
+        """Return the second moments of area (Ixx, Iyy, Ixy), i.e., the area
+        integrals of y^2, x^2 and xy.
+
+        By default these are calculated with respect to axes through the
+        centroid, and with respect to the origin otherwise.
+        """
+        ixx, iyy, ixy = self.moments[3:]
+        if centroidal:
+            area = self.area()
+            x, y = self.centroid()
+            ixx -= area * y**2.
+            iyy -= area * x**2.
+            ixy -= area * x * y
+        return ixx, iyy, ixy
@@ -16,27 +16,75 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 """matplotlib configuration.
+
+Mind that all the drawing in the package goes through a RenderContext object
+(i.e., a figure, the axes to draw on and the page style), rather than through
+the global pyplot state. The current context is held in a context variable,
+and when no context is active the drawing falls back to the current pyplot
+axes, as usual.
+
+Also mind that matplotlib is imported lazily, i.e., the first time that the
+matplotlib or plt attributes of this module are accessed (e.g., through
+``from metalute.matplotlib_ import plt``), so that all the modules that only
+need to draw things occasionally can be imported without paying the (hefty)
+start-up cost of matplotlib.
 """
 
-import numpy as np
-from matplotlib import pyplot as plt
-import matplotlib
+import contextvars
+
 # We have to sort this out---the default is not working on my Fedora 30.
 #matplotlib.use('TkAgg')
 
 from metalute.units import mm_to_inches
 
 
+_MODULES = {}
+
+
+def _import(name: str):
+    """Import matplotlib (along with all the submodules that we use) or pyplot
+    the first time this is called, and return the corresponding module.
+
+    The basic setup is applied as soon as matplotlib is imported.
+    """
+    if name not in _MODULES:
+        if name == 'matplotlib':
+            import matplotlib
+            import matplotlib.figure
+            import matplotlib.font_manager
+            import matplotlib.lines
+            import matplotlib.patches
+            import matplotlib.path
+            import matplotlib.transforms
+            _MODULES[name] = matplotlib
+            basic_setup()
+        elif name == 'plt':
+            _import('matplotlib')
+            from matplotlib import pyplot
+            _MODULES[name] = pyplot
+        else:
+            raise ModuleNotFoundError(f'Cannot import {name}')
+    return _MODULES[name]
+
+
+def __getattr__(name: str):
+    """Lazy access to the matplotlib and plt attributes of the module.
+    """
+    if name in ('matplotlib', 'plt'):
+        return _import(name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
 def _set(key, value):
     """Set a specific parameter to a given value.
     """
-    matplotlib.rcParams[key] = value
+    _import('matplotlib').rcParams[key] = value
 
 
 def _get(key):
     """Retrieve the value of a given parameter.
     """
-    return matplotlib.rcParams[key]
+    return _import('matplotlib').rcParams[key]
 
 
 def mm_to_points(mm: float, ppi: float = 72.):
@@ -71,5 +119,148 @@ def setup_page(size, dpi: float = 100., text_size: float = 3., line_width: float
     return width, height, dpi
 
 
-# Apply the basic setup.
-basic_setup()
+def points_to_mm(points: float, ppi: float = 72.):
+    """Convert a length in points to a physical length (in mm).
+    """
+    return points / mm_to_points(1., ppi)
+
+
+
+_RENDER_CONTEXT = contextvars.ContextVar('metalute_render_context', default=None)
+
+
+
+class RenderContext:
+
+    """Rendering context, i.e., a figure, the axes to draw on, and the page
+    style (the default text size and line width, both in mm).
+
+    All the draw methods in the package target the current context (see
+    current_context()), and all the styling is passed to the artists
+    explicitly, rather than through the global matplotlib.rcParams, so that
+    different contexts (e.g., in different threads) can be rendered
+    independently. A context can be made current within a with statement, or
+    indefinitely through activate().
+
+    Parameters
+    ----------
+    figure : matplotlib.figure.Figure object
+        The figure.
+
+    axes : matplotlib.axes.Axes object
+        The axes to draw on.
+
+    text_size : float, optional
+        The default text size (in mm). If None, the matplotlib default is used.
+
+    line_width : float, optional
+        The default line width (in mm). If None, the matplotlib default is used.
+    """
+
+    def __init__(self, figure, axes, text_size: float = None, line_width: float = None):
+        """Constructor.
+        """
+        self.figure = figure
+        self.axes = axes
+        self.text_size = text_size
+        self.line_width = line_width
+        self._tokens = []
+
+    def __enter__(self):
+        """Make the context current.
+        """
+        self._tokens.append(_RENDER_CONTEXT.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Restore the previous context.
+        """
+        _RENDER_CONTEXT.reset(self._tokens.pop())
+
+    def activate(self):
+        """Make the context current until further notice.
+        """
+        _RENDER_CONTEXT.set(self)
+        return self
+
+    def font_size(self, size=None):
+        """Return the font size (in points) for a given size specification
+        (either absolute, in points, or relative, e.g., 'small').
+        """
+        if size is not None and not isinstance(size, str):
+            return size
+        if self.text_size is None:
+            base = _get('font.size')
+        else:
+            base = mm_to_points(self.text_size)
+        if size is None:
+            return base
+        return base * _import('matplotlib').font_manager.font_scalings[size]
+
+    def line_style(self, kwargs: dict) -> dict:
+        """Add the default line width to a dictionary of keyword arguments for
+        an artist (unless it is set explicitly), and return the dictionary.
+        """
+        if self.line_width is not None and not {'lw', 'linewidth', 'linewidths'} & set(kwargs):
+            kwargs['linewidth'] = mm_to_points(self.line_width)
+        return kwargs
+
+    def text_style(self, kwargs: dict) -> dict:
+        """Resolve the font size in a dictionary of keyword arguments for a
+        piece of text, and return the dictionary.
+        """
+        key = 'fontsize' if 'fontsize' in kwargs else 'size'
+        kwargs[key] = self.font_size(kwargs.get(key))
+        return kwargs
+
+    def plot(self, *args, **kwargs):
+        """Same as matplotlib.axes.Axes.plot(), with the default line width.
+        """
+        return self.axes.plot(*args, **self.line_style(kwargs))
+
+    def hlines(self, *args, **kwargs):
+        """Same as matplotlib.axes.Axes.hlines(), with the default line width.
+        """
+        return self.axes.hlines(*args, **self.line_style(kwargs))
+
+    def vlines(self, *args, **kwargs):
+        """Same as matplotlib.axes.Axes.vlines(), with the default line width.
+        """
+        return self.axes.vlines(*args, **self.line_style(kwargs))
+
+    def text(self, x, y, text, **kwargs):
+        """Same as matplotlib.axes.Axes.text(), with the default text size.
+        """
+        return self.axes.text(x, y, text, **self.text_style(kwargs))
+
+    def line(self, x, y, **kwargs):
+        """Create a Line2D object with the default line width and add it to
+        the axes.
+        """
+        line = _import('matplotlib').lines.Line2D(x, y, **self.line_style(kwargs))
+        return self.axes.add_line(line)
+
+    def patch(self, patch_class, *args, **kwargs):
+        """Create a patch of a given class with the default line width and add
+        it to the axes.
+        """
+        return self.axes.add_patch(patch_class(*args, **self.line_style(kwargs)))
+
+    def savefig(self, *args, **kwargs):
+        """Save the figure.
+        """
+        return self.figure.savefig(*args, **kwargs)
+
+
+
+def current_context() -> RenderContext:
+    """Return the current rendering context.
+
+    If no context is active, a context wrapping the current pyplot figure and
+    axes (and with no style, i.e., relying on matplotlib.rcParams) is returned.
+    """
+    context = _RENDER_CONTEXT.get()
+    if context is None:
+        plt = _import('plt')
+        return RenderContext(plt.gcf(), plt.gca())
+    return context
@@ -24,8 +24,10 @@ import numpy as np
 
 from metalute.units import inches_to_mm
 from metalute.blueprint import blueprint
-from metalute.matplotlib_ import plt
-from metalute.geometry import Point, Line, Circle, Hole, Rectangle, RoundedRectangle, ParametricPolyPathBase, CircularArc
+from metalute.matplotlib_ import plt, current_context
+from metalute.geometry import Point, Line, Circle, Hole, Rectangle, RoundedRectangle, ParametricPolyPathBase, CircularArc,\
+    CompositePath, DEFAULT_SAMPLING_TOLERANCE
+from metalute.transform import Transform, as_transform
 
 
 
@@ -50,12 +52,14 @@ class PickupBase:
 
         This is relevant for both single-coils and humbuckers.
         """
+        offset = as_transform(offset)
         for i in range(self.num_strings):
             Circle((0., self.string_spacing * (i - 2.5)), self.magnet_diameter).draw(offset)
 
     def draw_screw_holes(self, offset):
         """Draw the holes for the mounting screws.
         """
+        offset = as_transform(offset)
         w = 0.5 * self.screw_spacing
         Circle((0., w), self.screw_hole_diameter).draw(offset)
         Circle((0., -w), self.screw_hole_diameter).draw(offset)
@@ -80,6 +84,7 @@ class SingleCoilBase(PickupBase):
         This is factored out as a staticmethod because it will be reused in
         drawing humbukers.
         """
+        offset = as_transform(offset)
         r = 0.5 * length
         w = 0.5 * width - r
         l = length - width
@@ -91,6 +96,7 @@ class SingleCoilBase(PickupBase):
     def draw(self, offset):
         """Overloaded method.
         """
+        offset = as_transform(offset)
         self._draw_contour(self.inner_length, self.inner_width, offset)
         self._draw_contour(self.inner_length, self.outer_width, offset)
         if self.outer_length != self.inner_length:
@@ -120,6 +126,7 @@ class HumbuckerBase(PickupBase):
     def draw_wings(self, offset):
         """Draw the hanging metal wings with the screw holes.
         """
+        offset = as_transform(offset)
         w = 0.5 * (self.outer_width - self.inner_width) - self.corner_radius
         l = self.wing_length - 2. * self.corner_radius
         p = Point(0.5 * self.wing_length, 0.5 * self.inner_width)
@@ -138,13 +145,13 @@ class HumbuckerBase(PickupBase):
     def draw(self, offset):
         """Overloaded method.
         """
+        offset = as_transform(offset)
         l = 0.5 * self.inner_length
         w = self.inner_width
-        d = Point(0.5 * l, 0.)
-        SingleCoilBase._draw_contour(l, w, offset - d)
-        self.draw_magnets(offset - d)
-        SingleCoilBase._draw_contour(l, w, offset + d)
-        self.draw_magnets(offset + d)
+        for transform in (offset @ Transform.translation(-0.5 * l, 0.),
+                          offset @ Transform.translation(0.5 * l, 0.)):
+            SingleCoilBase._draw_contour(l, w, transform)
+            self.draw_magnets(transform)
         self.draw_screw_holes(offset)
         RoundedRectangle((0., 0.), self.inner_length, self.inner_width, self.corner_radius).draw(offset)
         self.draw_wings(offset)
@@ -171,6 +178,7 @@ class SingleCoilEMG(SingleCoilBase):
 
         We overload this because the magnets are hidden by the plastic cover.
         """
+        offset = as_transform(offset)
         self._draw_contour(self.inner_length, self.inner_width, offset)
         self._draw_contour(self.outer_length, self.outer_width, offset)
         self.draw_screw_holes(offset)
@@ -213,6 +221,7 @@ class HumbuckerEMG(HumbuckerBase):
     def draw(self, offset):
         """Overloaded method.
         """
+        offset = as_transform(offset)
         self.draw_screw_holes(offset)
         RoundedRectangle((0., 0.), self.inner_length, self.inner_width, self.corner_radius).draw(offset)
         self.draw_wings(offset)
@@ -271,12 +280,46 @@ class HumbuckerSeymourDuncan(HumbuckerBase):
 @dataclass
 class RoutingBase:
 
+    """Base class for a pickup routing.
     """
-    """
+
+    def contour(self):
+        """Return the contour of the routing, as a CompositePath object.
+        """
+        raise NotImplementedError
+
+    def holes(self, **kwargs):
+        """Return the list of the (optional) drilling holes.
+        """
+        return []
+
+    def primitives(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE, **kwargs):
+        """Return the list of drawing primitives for the routing (i.e., the
+        contour and the holes), with the keyword arguments passed to holes().
+        """
+        primitives = self.contour().primitives(tolerance)
+        for hole in self.holes(**kwargs):
+            primitives += hole.primitives(tolerance)
+        return primitives
+
+    def bbox(self):
+        """Return the bounding box (xmin, ymin, xmax, ymax) of the contour.
+        """
+        return self.contour().bbox()
+
+    def draw(self, offset, **kwargs):
+        """Draw the routing, with the keyword arguments passed to holes().
+        """
+        offset = as_transform(offset)
+        self.contour().draw(offset)
+        for hole in self.holes(**kwargs):
+            hole.draw(offset)
 
     def draw_parameters(self, offset, line_spacing=6.):
         """
         """
+        context = current_context()
+        transform = as_transform(offset).mpl_transform()
         y = 0.
         params = asdict(self)
         keys = list(params.keys())
@@ -284,7 +327,7 @@ class RoutingBase:
         for key in keys:
             value = params[key]
             key = key.replace('_', ' ')
-            plt.text(offset.x, offset.y - y, f'{key} = {value} mm')
+            context.text(0., -y, f'{key} = {value} mm', transform=transform)
             y -= line_spacing
 
 
@@ -304,24 +347,27 @@ class SingleCoilRouting(RoutingBase):
     width : float = 87.
     flat_width : float = 18.
 
-    def draw(self, offset):
-        """
+    def contour(self):
+        """Overloaded method.
         """
         radius = 0.5 * self.inner_length
         a = self.outer_length - self.inner_length
         b = 0.5 * (self.width - self.flat_width) - radius
         theta = (-b + np.sqrt(b**2. + 2 * a * radius)) / radius
         l = np.sqrt((a + 0.5 * radius * theta**2.)**2. + (b + radius * theta)**2.)
+        span = 180. - np.degrees(theta)
+        # Mind the contour is a closed loop running counterclockwise, starting
+        # from the rightmost point of the top arc.
         p = Point(0., 0.5 * self.width - radius)
-        line = CircularArc(p, radius, 0., 180. - np.degrees(theta)).draw(offset).\
-            connecting_line(l).draw(offset)
-        p = line.end_point()
-        Line(p, p.vmove(-self.flat_width)).draw(offset)
-        p = Point(0., - 0.5 * self.width + radius)
-        line = CircularArc(p, radius, 0., -180. + np.degrees(theta)).draw(offset).\
-            connecting_line(l).draw(offset)
-        p = p.hmove(0.5 * self.inner_length)
-        Line(p, p.vmove(self.width - 2. * radius)).draw(offset)
+        arc1 = CircularArc(p, radius, 0., span)
+        line1 = arc1.connecting_line(l)
+        p = line1.end_point()
+        line2 = Line(p, p.vmove(-self.flat_width))
+        arc2 = CircularArc(Point(0., - 0.5 * self.width + radius), radius, -span, span)
+        line3 = Line(line2.end_point(), arc2.start_point())
+        p = arc2.end_point()
+        line4 = Line(p, p.vmove(self.width - 2. * radius))
+        return CompositePath([arc1, line1, line2, line3, arc2, line4])
 
 
 
@@ -341,40 +387,45 @@ class HumbuckerRouting(RoutingBase):
     wing_length : float = 16.
     corner_radius : float = 3.
 
-    def _draw_cap(self, start_point, start_phi, d1, d2, offset):
-        """convenience function to draw a half rectangle with rounded borders.
+    def _cap(self, start_point, start_phi, d1, d2):
+        """Convenience function returning the paths for a half rectangle with
+        rounded borders.
         """
-        line = Line(start_point, start_point.move(d1, start_phi)).draw(offset).\
-            connecting_circular_arc(self.corner_radius, 90.).draw(offset).\
-            connecting_line(d2).draw(offset).\
-            connecting_circular_arc(self.corner_radius, 90.).draw(offset).\
-            connecting_line(d1).draw(offset)
-        return line
-
-    def draw(self, offset, drilling_holes=False):
-        """Draw the routing.
+        paths = [Line(start_point, start_point.move(d1, start_phi))]
+        paths.append(paths[-1].connecting_circular_arc(self.corner_radius, 90.))
+        paths.append(paths[-1].connecting_line(d2))
+        paths.append(paths[-1].connecting_circular_arc(self.corner_radius, 90.))
+        paths.append(paths[-1].connecting_line(d1))
+        return paths
+
+    def contour(self):
+        """Overloaded method.
         """
         l1 = 0.5 * (self.length - self.wing_length) - self.corner_radius
         l2 = self.wing_length - 2. * self.corner_radius
         w1 = self.inner_width - 2. * self.corner_radius
         w2 = 0.5 * (self.outer_width - self.inner_width) - self.corner_radius
         p = Point(0.5 * self.wing_length, 0.5 * self.inner_width)
-        line = self._draw_cap(p, 90., w2, l2, offset)
-        p = line.end_point()
-        line = self._draw_cap(p, 180., l1, w1, offset)
-        p = line.end_point()
-        line = self._draw_cap(p, -90., w2, l2, offset)
-        p = line.end_point()
-        line = self._draw_cap(p, 0., l1, w1, offset)
+        paths = []
+        for start_phi, d1, d2 in ((90., w2, l2), (180., l1, w1), (-90., w2, l2), (0., l1, w1)):
+            paths += self._cap(p, start_phi, d1, d2)
+            p = paths[-1].end_point()
+        return CompositePath(paths)
+
+    def holes(self, drilling_holes=False):
+        """Overloaded method.
+        """
+        holes = []
         if drilling_holes:
             l = self.length - 2. * self.corner_radius
             w = self.inner_width - 2. * self.corner_radius
             for p in Rectangle((0., 0.), l, w).points:
-                Hole(p, 2 * self.corner_radius, 1.).draw(offset)
+                holes.append(Hole(p, 2 * self.corner_radius, 1.))
             l = self.wing_length - 2. * self.corner_radius
             w = self.outer_width - 2. * self.corner_radius
             for p in Rectangle((0., 0.), l, w).points:
-                Hole(p, 2 * self.corner_radius, 1.).draw(offset)
+                holes.append(Hole(p, 2 * self.corner_radius, 1.))
+        return holes
 
 
 
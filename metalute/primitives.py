@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Elementary drawing primitives.
+
+This module defines the handful of exact, elementary primitives (straight
+segments, circular arcs, full circles and, for everything else, poly-lines)
+that any of our geometrical entities can be broken into. They are the common
+currency between the geometry engines and all the consumers that need to
+render or export the geometry (matplotlib paths, file writers, toolpaths).
+
+Mind this module is deliberately dependency-free.
+"""
+
+from collections import namedtuple
+import math
+
+
+
+class LinePrimitive(namedtuple('LinePrimitive', 'start end')):
+
+    """Straight segment between two (x, y) tuples.
+    """
+
+    __slots__ = ()
+
+    def start_point(self):
+        """Return the start point.
+        """
+        return self.start
+
+    def end_point(self):
+        """Return the end point.
+        """
+        return self.end
+
+    def bbox(self):
+        """Return the bounding box (xmin, ymin, xmax, ymax).
+        """
+        (x1, y1), (x2, y2) = self
+        return (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+
+
+class ArcPrimitive(namedtuple('ArcPrimitive', 'center radius start_phi span')):
+
+    """Circular arc.
+
+    As everywhere else in the package, the arc is defined by the angle of the
+    start point (in degrees) and by the (signed) span, so that we keep track
+    of the direction of the arc.
+    """
+
+    __slots__ = ()
+
+    def _point(self, phi):
+        """Return the point on the arc at a given angle.
+        """
+        x, y = self.center
+        phi = math.radians(phi)
+        return (x + self.radius * math.cos(phi), y + self.radius * math.sin(phi))
+
+    @property
+    def end_phi(self):
+        """Return the angle of the end point.
+        """
+        return self.start_phi + self.span
+
+    def start_point(self):
+        """Return the start point.
+        """
+        return self._point(self.start_phi)
+
+    def end_point(self):
+        """Return the end point.
+        """
+        return self._point(self.end_phi)
+
+    def contains_angle(self, phi):
+        """Return True if a given angle (in degrees) is within the span of the
+        arc.
+        """
+        phi1, phi2 = sorted((self.start_phi, self.end_phi))
+        return (phi - phi1) % 360. <= phi2 - phi1
+
+    def bbox(self):
+        """Return the bounding box (xmin, ymin, xmax, ymax).
+
+        This is exact, i.e., on top of the end points we include all the
+        extremal points of the circle at multiples of 90 degrees that fall
+        within the span of the arc.
+        """
+        points = [self.start_point(), self.end_point()]
+        points += [self._point(phi) for phi in (0., 90., 180., 270.) if self.contains_angle(phi)]
+        x, y = zip(*points)
+        return (min(x), min(y), max(x), max(y))
+
+
+
+class CirclePrimitive(namedtuple('CirclePrimitive', 'center radius')):
+
+    """Full circle.
+    """
+
+    __slots__ = ()
+
+    def start_point(self):
+        """Return the start point, i.e., the point at phi = 0.
+        """
+        x, y = self.center
+        return (x + self.radius, y)
+
+    def end_point(self):
+        """Return the end point (that is the same as the start point).
+        """
+        return self.start_point()
+
+    def bbox(self):
+        """Return the bounding box (xmin, ymin, xmax, ymax).
+        """
+        x, y = self.center
+        r = self.radius
+        return (x - r, y - r, x + r, y + r)
+
+
+
+class PolylinePrimitive(namedtuple('PolylinePrimitive', 'vertices')):
+
+    """Poly-line, with the vertices stored as a (N, 2) array.
+
+    This is used for all the paths that cannot be exactly represented in terms
+    of lines and circular arcs (e.g., spirals or splines).
+    """
+
+    __slots__ = ()
+
+    def start_point(self):
+        """Return the start point.
+        """
+        return tuple(self.vertices[0])
+
+    def end_point(self):
+        """Return the end point.
+        """
+        return tuple(self.vertices[-1])
+
+    def bbox(self):
+        """Return the bounding box (xmin, ymin, xmax, ymax).
+
+        Mind that the vertices might contain rows of NaNs, which need to be
+        skipped.
+        """
+        x = [x for x, y in self.vertices if x == x]
+        y = [y for x, y in self.vertices if y == y]
+        return (min(x), min(y), max(x), max(y))
+
+
+
+def connected(point1, point2, tolerance: float = 1.e-6) -> bool:
+    """Return True if two (x, y) tuples coincide within a given tolerance.
+    """
+    return math.hypot(point1[0] - point2[0], point1[1] - point2[1]) <= tolerance
+
+
+def bbox_union(bboxes):
+    """Return the smallest bounding box (xmin, ymin, xmax, ymax) containing all
+    the bounding boxes in a given iterable.
+    """
+    xmin, ymin, xmax, ymax = zip(*bboxes)
+    return (min(xmin), min(ymin), max(xmax), max(ymax))
@@ -21,9 +21,11 @@
 import numpy as np
 
 from metalute import GITHUB_URL
-from metalute.matplotlib_ import plt
+from metalute.matplotlib_ import plt, current_context
 from metalute.blueprint import blueprint
-from metalute.geometry import Point, Rectangle, Hole
+from metalute.geometry import Point, Line, Rectangle, Hole, DEFAULT_SAMPLING_TOLERANCE
+from metalute.primitives import bbox_union
+from metalute.transform import Transform, as_transform
 from metalute.pickup import SingleCoilRouting, HumbuckerRouting
 
 
@@ -43,32 +45,59 @@ class RoutingTemplateBase:
     CENTER = Point(0., 0.)
     BORDER = 10.
 
+    def holes(self):
+        """Return the list of the centering holes.
+        """
+        l = 0.5 * self.LENGTH
+        w = 0.5 * self.WIDTH
+        # Small centering holes.
+        r = 1.5
+        holes = [Hole(self.CENTER.vmove(w), r), Hole(self.CENTER.vmove(-w), r),
+                 Hole(self.CENTER.hmove(l), r), Hole(self.CENTER.hmove(-l), r)]
+        # Bigger centering holes.
+        r = 3.
+        holes += [Hole(self.CENTER.vmove(w - self.BORDER), r),
+                  Hole(self.CENTER.vmove(-w + self.BORDER), r),
+                  Hole(self.CENTER.hmove(l - self.BORDER), r),
+                  Hole(self.CENTER.hmove(-l + self.BORDER), r)]
+        return holes
+
+    def bbox(self):
+        """Return the bounding box (xmin, ymin, xmax, ymax) of the template.
+        """
+        rectangle = Rectangle(self.CENTER, self.LENGTH, self.WIDTH)
+        return bbox_union(path.bbox() for path in [rectangle] + self.holes())
+
+    def primitives(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE):
+        """Return the list of drawing primitives for the template, i.e., the
+        outer rectangle, the center lines and the centering holes.
+        """
+        l = 0.5 * self.LENGTH
+        w = 0.5 * self.WIDTH
+        paths = [Rectangle(self.CENTER, self.LENGTH, self.WIDTH),
+                 Line(Point(-l, 0.), Point(l, 0.)), Line(Point(0., -w), Point(0., w))]
+        return [primitive for path in paths + self.holes() for primitive in path.primitives(tolerance)]
+
     def draw(self, offset):
         """Fundamental draw method.
         """
+        offset = as_transform(offset)
+        transform = offset.mpl_transform()
         # The big rectangle.
         l = 0.5 * self.LENGTH
         w = 0.5 * self.WIDTH
         Rectangle(self.CENTER, self.LENGTH, self.WIDTH).draw(offset)
         # The two center lines.
-        plt.hlines(0, -l, l)
-        plt.vlines(0, -w, w)
-        # Small centering holes.
-        r = 1.5
-        Hole(self.CENTER.vmove(w), r).draw(offset)
-        Hole(self.CENTER.vmove(-w), r).draw(offset)
-        Hole(self.CENTER.hmove(l), r).draw(offset)
-        Hole(self.CENTER.hmove(-l), r).draw(offset)
-        # Bigger centering holes.
-        r = 3.
-        Hole(self.CENTER.vmove(w - self.BORDER), r).draw(offset)
-        Hole(self.CENTER.vmove(-w + self.BORDER), r).draw(offset)
-        Hole(self.CENTER.hmove(l - self.BORDER), r).draw(offset)
-        Hole(self.CENTER.hmove(-l + self.BORDER), r).draw(offset)
+        context = current_context()
+        context.hlines(0, -l, l, transform=transform)
+        context.vlines(0, -w, w, transform=transform)
+        # The centering holes.
+        for hole in self.holes():
+            hole.draw(offset)
         # And, finally, the branding :-)
-        x = -l + self.BORDER + offset.x
-        y = w - 2. * self.BORDER + offset.y
-        plt.text(x, y, GITHUB_URL)
+        x = -l + self.BORDER
+        y = w - 2. * self.BORDER
+        context.text(x, y, GITHUB_URL, transform=transform)
 
 
 
@@ -85,13 +114,22 @@ class PickupRoutingTemplateBase(RoutingTemplateBase):
         """
         self.routing = routing_class(**params)
 
+    def primitives(self, tolerance: float = DEFAULT_SAMPLING_TOLERANCE, **kwargs):
+        """Overloaded method.
+
+        The keyword arguments are passed to the primitives() method of the
+        underlying pickup routing.
+        """
+        return super().primitives(tolerance) + self.routing.primitives(tolerance, **kwargs)
+
     def draw(self, offset, **kwargs):
         """Overloaded method.
         """
+        offset = as_transform(offset)
         super().draw(offset)
         self.routing.draw(offset, **kwargs)
         p = Point(-0.5 * self.LENGTH + self.BORDER, -0.5 * self.WIDTH + self.BORDER)
-        self.routing.draw_parameters(offset + p)
+        self.routing.draw_parameters(offset @ Transform.translation(p.x, p.y))
 
 
 
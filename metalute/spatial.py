@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Spatial indexing facilities.
+"""
+
+import math
+
+import numpy as np
+
+from metalute.primitives import LinePrimitive, ArcPrimitive, CirclePrimitive,\
+    PolylinePrimitive
+
+
+def _nearest_on_segments(x1, y1, x2, y2, x, y):
+    """Return the point closest to (x, y) on a set of straight segments
+    (passed as arrays of end-point coordinates).
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+    norm = dx**2. + dy**2.
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = np.clip(((x - x1) * dx + (y - y1) * dy) / norm, 0., 1.)
+    # Degenerate segments.
+    t = np.where(norm > 0., t, 0.)
+    px = x1 + t * dx
+    py = y1 + t * dy
+    dist = np.hypot(px - x, py - y)
+    # Segments involving NaNs (i.e., breaks in poly-lines) are never the closest.
+    dist = np.where(np.isnan(dist), np.inf, dist)
+    i = np.argmin(dist)
+    return (px[i], py[i]), dist[i]
+
+
+def nearest_point(primitive, x: float, y: float):
+    """Return the point on a drawing primitive that is closest to a given point
+    (x, y), along with the corresponding distance.
+
+    This is exact for lines, circular arcs and circles, and exact for the
+    poly-line approximation of anything else.
+    """
+    if isinstance(primitive, LinePrimitive):
+        (x1, y1), (x2, y2) = primitive
+        return _nearest_on_segments(np.array([x1]), np.array([y1]),
+                                    np.array([x2]), np.array([y2]), x, y)
+    if isinstance(primitive, PolylinePrimitive):
+        vertices = np.asarray(primitive.vertices, dtype=float)
+        if len(vertices) == 1:
+            vertices = np.vstack((vertices, vertices))
+        (x1, y1), (x2, y2) = vertices[:-1].T, vertices[1:].T
+        return _nearest_on_segments(x1, y1, x2, y2, x, y)
+    if isinstance(primitive, (ArcPrimitive, CirclePrimitive)):
+        cx, cy = primitive.center
+        r = primitive.radius
+        rho = math.hypot(x - cx, y - cy)
+        # Mind the center of the circle is equidistant from all the points.
+        phi = math.degrees(math.atan2(y - cy, x - cx)) if rho > 0. else 0.
+        if isinstance(primitive, CirclePrimitive) or primitive.contains_angle(phi):
+            phi = math.radians(phi)
+            return (cx + r * math.cos(phi), cy + r * math.sin(phi)), abs(rho - r)
+        candidates = (primitive.start_point(), primitive.end_point())
+        dist = [math.hypot(px - x, py - y) for px, py in candidates]
+        i = int(dist[1] < dist[0])
+        return candidates[i], dist[i]
+    raise RuntimeError('Unknown primitive {}'.format(primitive))
+
+
+def _bbox_distance(bbox, x: float, y: float) -> float:
+    """Return the distance between a point and a bounding box (zero if the point
+    is inside the box).
+    """
+    xmin, ymin, xmax, ymax = bbox
+    dx = max(xmin - x, 0., x - xmax)
+    dy = max(ymin - y, 0., y - ymax)
+    return math.hypot(dx, dy)
+
+
+
+class PrimitiveIndex:
+
+    """Uniform-grid spatial index over the bounding boxes of a list of drawing
+    primitives.
+
+    Each primitive is registered in all the grid cells overlapping with its
+    bounding box, so that nearest-point queries can be answered by visiting
+    the cells in rings of increasing size around the query point, stopping as
+    soon as no unvisited cell can possibly contain a closer primitive, and
+    hit tests only need to look at the cells overlapping with the target box.
+
+    Parameters
+    ----------
+    primitives : sequence of drawing primitives
+        The primitives to be indexed.
+
+    keys : sequence, optional
+        Arbitrary labels (e.g., the names of the sub-paths the primitives
+        belong to) to be associated to the primitives.
+
+    cell_size : float, optional
+        The linear size of the grid cells (by default this is chosen so that
+        there is approximately one primitive per cell).
+    """
+
+    def __init__(self, primitives, keys=None, cell_size: float = None):
+        """Constructor.
+        """
+        self.primitives = list(primitives)
+        if keys is None:
+            keys = range(len(self.primitives))
+        self.keys = list(keys)
+        if len(self.keys) != len(self.primitives):
+            raise RuntimeError('The number of keys does not match the number of primitives')
+        self.bboxes = np.array([primitive.bbox() for primitive in self.primitives], dtype=float)
+        self.bboxes = self.bboxes.reshape((-1, 4))
+        if len(self.primitives):
+            self.xmin, self.ymin = self.bboxes[:, :2].min(axis=0)
+            xmax, ymax = self.bboxes[:, 2:].max(axis=0)
+        else:
+            self.xmin = self.ymin = xmax = ymax = 0.
+        width = xmax - self.xmin
+        height = ymax - self.ymin
+        if cell_size is None:
+            cell_size = math.sqrt(width * height / max(len(self.primitives), 1))
+            if cell_size <= 0.:
+                cell_size = max(width, height, 1.)
+        self.cell_size = cell_size
+        self.nx = int(width // cell_size) + 1
+        self.ny = int(height // cell_size) + 1
+        self._grid = {}
+        for i, bbox in enumerate(self.bboxes):
+            ix1, iy1 = self._cell(*bbox[:2])
+            ix2, iy2 = self._cell(*bbox[2:])
+            for ix in range(ix1, ix2 + 1):
+                for iy in range(iy1, iy2 + 1):
+                    self._grid.setdefault((ix, iy), []).append(i)
+
+    def __len__(self):
+        """Return the number of primitives in the index.
+        """
+        return len(self.primitives)
+
+    def _cell(self, x: float, y: float):
+        """Return the indices of the grid cell containing a given point.
+
+        Mind that points outside the grid are mapped onto the closest cell on
+        the border.
+        """
+        ix = int((x - self.xmin) // self.cell_size)
+        iy = int((y - self.ymin) // self.cell_size)
+        return min(max(ix, 0), self.nx - 1), min(max(iy, 0), self.ny - 1)
+
+    def _ring(self, ix: int, iy: int, k: int):
+        """Return the primitive indices in all the cells at a Chebyshev distance
+        k from a given cell.
+        """
+        if k == 0:
+            return self._grid.get((ix, iy), [])
+        indices = []
+        for jx in range(ix - k, ix + k + 1):
+            for jy in (iy - k, iy + k):
+                indices += self._grid.get((jx, jy), [])
+        for jy in range(iy - k + 1, iy + k):
+            for jx in (ix - k, ix + k):
+                indices += self._grid.get((jx, jy), [])
+        return indices
+
+    def _nearest(self, x: float, y: float):
+        """Return the index of the primitive closest to a single query point,
+        along with the closest point and the distance.
+
+        Since the query point is always within (or projected onto) the central
+        cell, all the primitives not yet visited after the k-th ring are at
+        least k cell sizes away, and we can stop as soon as we have found
+        something closer than that.
+        """
+        ix, iy = self._cell(x, y)
+        visited = set()
+        best = (-1, (math.nan, math.nan), math.inf)
+        for k in range(max(self.nx, self.ny)):
+            for i in self._ring(ix, iy, k):
+                if i in visited:
+                    continue
+                visited.add(i)
+                # Cheap rejection based on the bounding box.
+                if _bbox_distance(self.bboxes[i], x, y) >= best[2]:
+                    continue
+                point, dist = nearest_point(self.primitives[i], x, y)
+                if dist < best[2]:
+                    best = (i, point, dist)
+            if best[2] <= k * self.cell_size:
+                break
+        return best
+
+    def nearest(self, points):
+        """Find the closest primitive for a set of query points.
+
+        Parameters
+        ----------
+        points : array_like
+            The query points, in the form of a (N, 2) array.
+
+        Returns
+        -------
+        keys : list
+            The keys of the closest primitive for each query point.
+
+        xy : (N, 2) array
+            The closest points on the primitives.
+
+        dist : (N,) array
+            The corresponding distances.
+
+        Non-finite query points (e.g., NaN separators) map onto a None key, and
+        an infinite distance.
+        """
+        points = np.asarray(points, dtype=float).reshape((-1, 2))
+        keys = []
+        xy = np.full(points.shape, np.nan)
+        dist = np.full(len(points), np.inf)
+        for j, (x, y) in enumerate(points):
+            # Mind the query points might contain NaN separators.
+            if not (math.isfinite(x) and math.isfinite(y)):
+                keys.append(None)
+                continue
+            i, xy[j], dist[j] = self._nearest(x, y)
+            keys.append(self.keys[i] if i >= 0 else None)
+        return keys, xy, dist
+
+    def hits(self, bbox):
+        """Return the keys of all the primitives whose bounding box overlaps
+        with a given box (xmin, ymin, xmax, ymax).
+
+        The keys are returned in the same order as the primitives have been
+        indexed, and each key is only returned once.
+        """
+        xmin, ymin, xmax, ymax = bbox
+        ix1, iy1 = self._cell(xmin, ymin)
+        ix2, iy2 = self._cell(xmax, ymax)
+        candidates = set()
+        for ix in range(ix1, ix2 + 1):
+            for iy in range(iy1, iy2 + 1):
+                candidates.update(self._grid.get((ix, iy), []))
+        keys = []
+        for i in sorted(candidates):
+            _xmin, _ymin, _xmax, _ymax = self.bboxes[i]
+            if _xmin <= xmax and _xmax >= xmin and _ymin <= ymax and _ymax >= ymin:
+                if self.keys[i] not in keys:
+                    keys.append(self.keys[i])
+        return keys
+
+
+
+DEFAULT_WELDING_TOLERANCE = 1.e-3
+
+
+class PointWelder:
+
+    """Tolerance-aware point-welding facility.
+
+    Points are stored in a hashed grid with a cell size equal to the welding
+    tolerance, so that any two points closer than the tolerance are guaranteed
+    to be in the same cell or in neighboring ones, and a new point only needs
+    to be checked against the content of the 3 x 3 cells around it. This
+    makes welding linear in the number of points, and, unlike rounding the
+    coordinates, it works correctly across the cell borders.
+
+    Each new point is merged into the first point already stored (if any)
+    within the tolerance.
+
+    Parameters
+    ----------
+    tolerance : float
+        The welding tolerance.
+    """
+
+    def __init__(self, tolerance: float = DEFAULT_WELDING_TOLERANCE):
+        """Constructor.
+        """
+        if tolerance <= 0.:
+            raise RuntimeError('The welding tolerance must be positive')
+        self.tolerance = tolerance
+        self._grid = {}
+        self._points = []
+
+    def __len__(self):
+        """Return the number of unique points.
+        """
+        return len(self._points)
+
+    def _cell(self, x: float, y: float):
+        """Return the indices of the grid cell for a given point.
+        """
+        return math.floor(x / self.tolerance), math.floor(y / self.tolerance)
+
+    def add(self, x: float, y: float) -> int:
+        """Add a point and return the index of the unique point it is welded to.
+        """
+        ix, iy = self._cell(x, y)
+        for jx in (ix - 1, ix, ix + 1):
+            for jy in (iy - 1, iy, iy + 1):
+                for i in self._grid.get((jx, jy), ()):
+                    _x, _y = self._points[i]
+                    if math.hypot(_x - x, _y - y) <= self.tolerance:
+                        return i
+        i = len(self._points)
+        self._points.append((x, y))
+        self._grid.setdefault((ix, iy), []).append(i)
+        return i
+
+    def weld(self, points):
+        """Weld a set of points.
+
+        Return the indices of the unique points each input point is welded to,
+        as an integer array.
+        """
+        points = np.asarray(points, dtype=float).reshape((-1, 2))
+        return np.array([self.add(x, y) for x, y in points], dtype=int)
+
+    def points(self):
+        """Return the unique points as a (N, 2) array.
+        """
+        return np.array(self._points, dtype=float).reshape((-1, 2))
+
+
+def weld(points, tolerance: float = DEFAULT_WELDING_TOLERANCE):
+    """Convenience function to weld a set of points.
+
+    Return the unique points and the index map from the input points to the
+    unique ones.
+    """
+    welder = PointWelder(tolerance)
+    inverse = welder.weld(points)
+    return welder.points(), inverse
+
+
+def connectivity(primitives, tolerance: float = DEFAULT_WELDING_TOLERANCE):
+    """Calculate the connectivity of a set of drawing primitives.
+
+    Full circles are closed and ignored, while all other primitives are
+    considered as edges connecting their (welded) start and end points.
+
+    Return the unique end points, the edges (as a (N, 2) integer array of
+    indices into the unique points) and the number of edges each unique point
+    belongs to. Mind that, for a closed contour, this is exactly 2 for all
+    the points, so that the points with degree 1 are open ends.
+    """
+    welder = PointWelder(tolerance)
+    edges = []
+    for primitive in primitives:
+        if isinstance(primitive, CirclePrimitive):
+            continue
+        edges.append((welder.add(*primitive.start_point()), welder.add(*primitive.end_point())))
+    edges = np.array(edges, dtype=int).reshape((-1, 2))
+    degree = np.bincount(edges.ravel(), minlength=len(welder))
+    return welder.points(), edges, degree
+
+
+def joints(primitives, tolerance: float = DEFAULT_WELDING_TOLERANCE):
+    """Return a boolean array flagging the primitives, in a sequence, that start
+    where the previous one ends.
+
+    This uses the very same welding rule as connectivity(), i.e., two end points
+    are joined if they are welded to the same unique point, so that the joints
+    found here are consistent with the gaps found by the gap checks. Full
+    circles are closed, and are never joined to anything.
+    """
+    _, edges, _ = connectivity(primitives, tolerance)
+    joined = np.zeros(len(primitives), dtype=bool)
+    last = None
+    edges = iter(edges)
+    for i, primitive in enumerate(primitives):
+        if isinstance(primitive, CirclePrimitive):
+            last = None
+            continue
+        start, end = next(edges)
+        joined[i] = last is not None and start == last
+        last = end
+    return joined
@@ -24,13 +24,15 @@ from scipy.interpolate import UnivariateSpline
 
 from metalute.body import MusicManAxis as Body
 from metalute.head import MusicMan as Head
-from metalute.geometry import Point, Circle, CircularArc, Line
-from metalute.matplotlib_ import plt
+from metalute.geometry import Point, Circle, CircularArc, Line, adaptive_sample,\
+    DEFAULT_SAMPLING_TOLERANCE
+from metalute.matplotlib_ import plt, current_context
 from metalute.blueprint import blueprint
 from metalute.geometry import Point
 from metalute.fret import Fretboard
 from metalute.pickup import SingleCoilRouting, HumbuckerRouting
 from metalute.bridge import HardtailBridgeBase
+from metalute.transform import as_transform
 
 
 
@@ -53,33 +55,46 @@ class ParametricSpline:
         """
         """
         kwargs.setdefault('color', 'orange')
-        plt.plot(self.x + offset.x, self.y + offset.y, 'x', **kwargs)
+        transform = as_transform(offset).mpl_transform()
+        current_context().plot(self.x, self.y, 'x', transform=transform, **kwargs)
 
-    def draw(self, offset, tmin=0., tmax=1., num_points=1000, **kwargs):
+    def sample(self, tolerance=DEFAULT_SAMPLING_TOLERANCE, tmin=0., tmax=1.,
+               return_parameters=False):
+        """Return the vertices of a polygonal approximation of the spline, with
+        a given maximum chord error, as a (N, 2) numpy array.
+
+        If return_parameters is True, the array of the corresponding values of
+        the spline parameter is returned, too.
+        """
+        return adaptive_sample(lambda t: interpolate.splev(t, self.tck), tmin, tmax,
+                               tolerance, return_parameters=return_parameters)
+
+    def draw(self, offset, tmin=0., tmax=1., tolerance=DEFAULT_SAMPLING_TOLERANCE, **kwargs):
         """
         """
         kwargs.setdefault('color', 'black')
-        t = np.linspace(tmin, tmax, num_points)
-        x, y = interpolate.splev(t, self.tck)
-        plt.plot(x + offset.x, y + offset.y, **kwargs)
+        x, y = self.sample(tolerance, tmin, tmax).T
+        current_context().plot(x, y, transform=as_transform(offset).mpl_transform(), **kwargs)
 
-    def calculate_contour(self, offset, border=-15., tmin=0., tmax=1., num_points=1000):
+    def calculate_contour(self, offset, border=-15., tmin=0., tmax=1.,
+                          tolerance=DEFAULT_SAMPLING_TOLERANCE):
         """
         """
-        t = np.linspace(tmin, tmax, num_points)
-        x, y = interpolate.splev(t, self.tck)
+        t, vertices = self.sample(tolerance, tmin, tmax, return_parameters=True)
+        x, y = vertices.T
         dx, dy = interpolate.splev(t, self.tck, 1)
         phi = np.arctan2(dx, -dy)
-        x += border * np.cos(phi) + offset.x
-        y += border * np.sin(phi) + offset.y
-        return x, y
+        x += border * np.cos(phi)
+        y += border * np.sin(phi)
+        return as_transform(offset).apply(np.column_stack((x, y))).T
 
-    def draw_contour(self, offset, border=-15., tmin=0., tmax=1., num_points=1000, **kwargs):
+    def draw_contour(self, offset, border=-15., tmin=0., tmax=1.,
+                     tolerance=DEFAULT_SAMPLING_TOLERANCE, **kwargs):
         """
         """
         kwargs.setdefault('color', 'black')
-        x, y = self.calculate_contour(offset, border, tmin, tmax, num_points)
-        plt.plot(x, y, **kwargs)
+        x, y = self.calculate_contour(offset, border, tmin, tmax, tolerance)
+        current_context().plot(x, y, **kwargs)
 
 
 
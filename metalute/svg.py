@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Native SVG writer.
+
+This module writes geometrical objects straight to SVG files, without going
+through matplotlib: each object is broken into its elementary drawing
+primitives, that are mapped onto the commands of a single SVG <path> element,
+with native elliptical-arc (A) commands for circular arcs and full circles.
+The output is streamed to the underlying file handle one object at a time.
+
+Any object with a primitives() method can be written, i.e., all the paths in
+the geometry module (including parametric paths), all the drawables in the
+geometry2 module, as well as composite objects such as headstocks.
+
+Mind that the SVG coordinate system has the y axis pointing downward, and all
+the objects are placed in a top-level group flipping the y axis, so that the
+coordinates in the file are the same as in the design (in mm).
+"""
+
+import contextlib
+import math
+
+from metalute.primitives import LinePrimitive, ArcPrimitive, CirclePrimitive,\
+    PolylinePrimitive, bbox_union
+from metalute.spatial import joints
+from metalute.transform import as_transform
+
+
+DEFAULT_SVG_TOLERANCE = 0.01
+
+_SVG_HEADER = """<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<svg xmlns="http://www.w3.org/2000/svg" version="1.1" width="{width:.3f}mm" height="{height:.3f}mm" viewBox="{xmin:.3f} {ymin:.3f} {width:.3f} {height:.3f}">
+<g transform="scale(1 -1)" fill="none" stroke="black" stroke-width="{stroke_width}" stroke-linecap="round" stroke-linejoin="round">
+"""
+
+_SVG_FOOTER = """</g>
+</svg>
+"""
+
+
+def _fmt(value: float) -> str:
+    """Format a coordinate.
+
+    Mind we use a fixed precision of 1 um, stripping the trailing zeros to
+    keep the files small.
+    """
+    text = '{:.4f}'.format(value).rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+
+def _arc_commands(center, radius: float, start_phi: float, span: float):
+    """Return the SVG commands for a circular arc, starting from the start point
+    of the arc.
+
+    Arcs spanning more than 180 degrees are split in two halves, so that the
+    large-arc flag is never needed, and full circles are handled seamlessly.
+    Mind the sweep flag refers to the coordinate system of the path (i.e.,
+    before the y-axis flip), where a positive span is in the direction of
+    increasing angles.
+    """
+    num_pieces = 2 if abs(span) > 180. else 1
+    cx, cy = center
+    r = _fmt(abs(radius))
+    sweep = 1 if span > 0. else 0
+    commands = []
+    for i in range(1, num_pieces + 1):
+        phi = math.radians(start_phi + span * i / num_pieces)
+        x = cx + radius * math.cos(phi)
+        y = cy + radius * math.sin(phi)
+        commands.append('A{} {} 0 0 {} {} {}'.format(r, r, sweep, _fmt(x), _fmt(y)))
+    return commands
+
+
+def path_data(primitives) -> str:
+    """Convert a sequence of drawing primitives into the data (i.e., the d
+    attribute) of a single SVG <path> element.
+
+    A move command is only issued when a primitive does not start at the end
+    point of the previous one, according to the welding rule in
+    metalute.spatial.joints() (or, for poly-lines, across rows of NaNs
+    separating disconnected pieces).
+    """
+    primitives = list(primitives)
+    commands = []
+    joined = False
+
+    def _move_to(point):
+        if not joined:
+            commands.append('M{} {}'.format(_fmt(point[0]), _fmt(point[1])))
+
+    for primitive, joined in zip(primitives, joints(primitives)):
+        if isinstance(primitive, LinePrimitive):
+            _move_to(primitive.start)
+            commands.append('L{} {}'.format(_fmt(primitive.end[0]), _fmt(primitive.end[1])))
+        elif isinstance(primitive, ArcPrimitive):
+            _move_to(primitive.start_point())
+            commands += _arc_commands(*primitive)
+        elif isinstance(primitive, CirclePrimitive):
+            _move_to(primitive.start_point())
+            commands += _arc_commands(primitive.center, primitive.radius, 0., 360.)
+        elif isinstance(primitive, PolylinePrimitive):
+            command = None
+            for x, y in primitive.vertices:
+                if x != x or y != y:
+                    command = 'M'
+                    continue
+                if command is None:
+                    _move_to((x, y))
+                    command = 'L'
+                    continue
+                commands.append('{}{} {}'.format(command, _fmt(x), _fmt(y)))
+                command = 'L'
+        else:
+            raise RuntimeError('Unknown primitive {}'.format(primitive))
+    return ' '.join(commands)
+
+
+def _transformed_bbox(bbox, transform):
+    """Return the bounding box of a bounding box transformed by a given
+    Transform object.
+
+    This is exact for translations, and conservative otherwise.
+    """
+    xmin, ymin, xmax, ymax = bbox
+    corners = [(xmin, ymin), (xmin, ymax), (xmax, ymin), (xmax, ymax)]
+    x, y = zip(*[transform.apply_point(corner) for corner in corners])
+    return (min(x), min(y), max(x), max(y))
+
+
+
+class SvgWriter:
+
+    """Streaming SVG writer.
+
+    The writer is meant to be used as a context manager, with the SVG header
+    written on entry and the footer on exit. Since the header contains the
+    size of the drawing, the bounding box of the drawing (in mm) has to be
+    known in advance---see write_svg() for a convenience function taking care
+    of that.
+
+    Parameters
+    ----------
+    file : file-like object
+        The (text) file handle to write to.
+
+    bbox : 4-element tuple
+        The bounding box (xmin, ymin, xmax, ymax) of the drawing.
+
+    margin : float
+        The margin (in mm) around the bounding box.
+
+    stroke_width : float
+        The default stroke width (in mm).
+
+    tolerance : float
+        The sampling tolerance for the objects that cannot be represented in
+        terms of lines and circular arcs.
+    """
+
+    def __init__(self, file, bbox, margin: float = 5., stroke_width: float = 0.25,
+                 tolerance: float = DEFAULT_SVG_TOLERANCE):
+        """Constructor.
+        """
+        self.file = file
+        self.bbox = bbox
+        self.margin = margin
+        self.stroke_width = stroke_width
+        self.tolerance = tolerance
+
+    def __enter__(self):
+        """Write the header.
+        """
+        xmin, ymin, xmax, ymax = self.bbox
+        # Mind the view box is expressed in the flipped coordinate system.
+        self.file.write(_SVG_HEADER.format(xmin=xmin - self.margin, ymin=-ymax - self.margin,
+                                           width=xmax - xmin + 2. * self.margin,
+                                           height=ymax - ymin + 2. * self.margin,
+                                           stroke_width=self.stroke_width))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Write the footer.
+        """
+        self.file.write(_SVG_FOOTER)
+
+    def write_primitives(self, primitives, offset=None, **attributes):
+        """Write a sequence of drawing primitives as a single <path> element.
+
+        The (optional) offset can be a Point or a Transform object, and is
+        written as the transform attribute of the element, rather than being
+        applied to the coordinates. Additional keyword arguments are written
+        as attributes of the element (e.g., stroke='red'), with underscores in
+        the names replaced by dashes.
+        """
+        data = path_data(primitives)
+        if not data:
+            return
+        if offset is not None:
+            (a, c, e), (b, d, f) = as_transform(offset).matrix[:2]
+            attributes['transform'] = 'matrix({} {} {} {} {} {})'.format(
+                *[_fmt(value) for value in (a, b, c, d, e, f)])
+        attributes = ''.join(' {}="{}"'.format(key.replace('_', '-'), value) \
+                             for key, value in attributes.items())
+        self.file.write('<path{} d="{}"/>\n'.format(attributes, data))
+
+    def write(self, obj, offset=None, **attributes):
+        """Write an object (i.e., anything with a primitives() method) as a
+        single <path> element.
+        """
+        self.write_primitives(obj.primitives(self.tolerance), offset, **attributes)
+
+
+
+def write_svg(file_path, *objects, offset=None, margin: float = 5.,
+              stroke_width: float = 0.25, tolerance: float = DEFAULT_SVG_TOLERANCE):
+    """Write a set of objects to an SVG file.
+
+    The objects must implement both the primitives() and the bbox() methods,
+    and the size of the drawing is calculated from the union of their bounding
+    boxes (transformed by the offset, if any).
+
+    Parameters
+    ----------
+    file_path : str or file-like object
+        The path to the output file, or an open (text) file handle.
+
+    objects : objects with primitives() and bbox() methods
+        The objects to be written.
+
+    offset : Point or Transform object, optional
+        The offset applied to all the objects.
+    """
+    bbox = bbox_union(obj.bbox() for obj in objects)
+    if offset is not None:
+        bbox = _transformed_bbox(bbox, as_transform(offset))
+    if hasattr(file_path, 'write'):
+        output_file = contextlib.nullcontext(file_path)
+    else:
+        output_file = open(file_path, 'w')
+    with output_file as _file, SvgWriter(_file, bbox, margin, stroke_width, tolerance) as writer:
+        for obj in objects:
+            writer.write(obj, offset)
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Tiled output for large blueprints.
+
+This module splits a (large) blueprint into a set of overlapping pages in a
+smaller paper format (e.g., A4), that can be printed on an ordinary printer
+and taped together. All the pages are rendered from the very same figure:
+the axes are temporarily stretched to fill the printable area of a single
+page and, for each page, only the view limits are changed, so that no artist
+is ever duplicated and all the pages are streamed to a single multi-page PDF
+file.
+
+Since the PDF backend writes out all the paths of an artist, whether or not
+they fall within the page, the members of the collections in data
+coordinates (e.g., the outlines of the labels of the rulers, that account for
+most of the size of a blueprint) are culled on a page-by-page basis, so that
+the total size of the output does not scale with the number of pages times the
+size of the entire sheet. Only the public matplotlib API is used.
+
+Each page carries four registration marks, placed in the middle of the
+overlapping bands, so that the marks on adjacent pages lie on top of each
+other when the pages are correctly aligned.
+"""
+
+import math
+
+import numpy as np
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.collections import LineCollection
+from matplotlib.offsetbox import AnchoredOffsetbox
+
+from metalute.blueprint import paper_dimensions, PAPER_ORIENTATIONS
+from metalute.matplotlib_ import matplotlib, current_context
+from metalute.units import mm_to_inches
+
+
+def figure_extent(figure=None):
+    """Return the extent (xmin, ymin, xmax, ymax) of an entire blueprint figure
+    (i.e., including the frame around the axes) in data coordinates.
+    """
+    figure = figure or current_context().figure
+    ax = figure.axes[0]
+    ax.apply_aspect()
+    corners = ax.transData.inverted().transform(figure.bbox.corners())
+    (xmin, ymin), (xmax, ymax) = corners.min(axis=0), corners.max(axis=0)
+    return xmin, ymin, xmax, ymax
+
+
+def tile_grid(extent, tile_width: float, tile_height: float, overlap: float):
+    """Return the list of the lower-left corners (x, y) of the tiles covering a
+    given extent, in row-major order starting from the top-left tile.
+
+    The tiles overlap by a fixed amount on all sides, and the grid is centered
+    on the extent.
+    """
+    xmin, ymin, xmax, ymax = extent
+    nx = max(math.ceil((xmax - xmin - overlap) / (tile_width - overlap) - 1.e-9), 1)
+    ny = max(math.ceil((ymax - ymin - overlap) / (tile_height - overlap) - 1.e-9), 1)
+    x0 = 0.5 * (xmin + xmax - nx * (tile_width - overlap) - overlap)
+    y0 = 0.5 * (ymin + ymax + ny * (tile_height - overlap) + overlap) - tile_height
+    return [(x0 + i * (tile_width - overlap), y0 - j * (tile_height - overlap)) \
+            for j in range(ny) for i in range(nx)], (nx, ny)
+
+
+def _registration_marks(ax, width: float, height: float, overlap: float, size: float = 4.):
+    """Create the registration marks for a page, in axes coordinates.
+    """
+    artists = []
+    dx = size / width
+    dy = size / height
+    for x in (0.5 * overlap / width, 1. - 0.5 * overlap / width):
+        for y in (0.5 * overlap / height, 1. - 0.5 * overlap / height):
+            artists += ax.plot([x - dx, x + dx], [y, y], color='black', transform=ax.transAxes,
+                               clip_on=False)
+            artists += ax.plot([x, x], [y - dy, y + dy], color='black', transform=ax.transAxes,
+                               clip_on=False)
+            circle = matplotlib.patches.Ellipse((x, y), dx, dy, fill=False, transform=ax.transAxes,
+                                                clip_on=False)
+            artists.append(ax.add_patch(circle))
+    return artists
+
+
+class _CollectionCuller:
+
+    """Small helper class to cull the members of a collection that fall outside
+    a given rectangle in data coordinates.
+
+    The original paths, along with the properties that are defined on a
+    member-by-member basis, are cached at creation time and restored by the
+    restore() method.
+    """
+
+    PROPERTIES = ('linewidths', 'edgecolors', 'facecolors')
+
+    def __init__(self, collection):
+        """Constructor.
+        """
+        self.collection = collection
+        self.visible = collection.get_visible()
+        self.paths = list(collection.get_paths())
+        self.properties = {}
+        for name in self.PROPERTIES:
+            value = np.asarray(getattr(collection, f'get_{name}')())
+            if len(value) == len(self.paths):
+                self.properties[name] = value
+        # Mind the bounding box of the control points is a conservative (and
+        # much faster to calculate) estimate of the extent of each path.
+        self.extents = np.array([np.concatenate((path.vertices.min(axis=0),
+                                                 path.vertices.max(axis=0))) \
+                                 for path in self.paths])
+
+    @staticmethod
+    def cullable(collection, ax) -> bool:
+        """Return True if a collection can be culled, i.e., if it is drawn in
+        data coordinates without offsets, and has more than one member.
+        """
+        return collection.get_transform() == ax.transData and \
+            not np.any(collection.get_offsets()) and len(collection.get_paths()) > 1
+
+    def _set(self, mask):
+        """Only retain the members of the collection selected by a mask.
+        """
+        paths = [path for path, selected in zip(self.paths, mask) if selected]
+        if isinstance(self.collection, LineCollection):
+            self.collection.set_segments([path.vertices for path in paths])
+        else:
+            self.collection.set_paths(paths)
+        for name, value in self.properties.items():
+            getattr(self.collection, f'set_{name}')(value[mask])
+
+    def cull(self, xmin: float, ymin: float, xmax: float, ymax: float):
+        """Only retain the members of the collection overlapping a given
+        rectangle.
+        """
+        x0, y0, x1, y1 = self.extents.T
+        mask = (x0 <= xmax) & (x1 >= xmin) & (y0 <= ymax) & (y1 >= ymin)
+        self.collection.set_visible(self.visible and mask.any())
+        if mask.any():
+            self._set(mask)
+
+    def restore(self):
+        """Restore the original state of the collection.
+        """
+        self._set(np.full(len(self.paths), True))
+        self.collection.set_visible(self.visible)
+
+
+def save_tiled(file_path, figure=None, size: str = 'A4', orientation: str = None,
+               overlap: float = 15., printer_margin: float = 5.):
+    """Save a blueprint figure as a tiled, multi-page PDF file, and return the
+    number of pages.
+
+    The figure is restored to its original state when done.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the output file.
+
+    figure : matplotlib.figure.Figure, optional
+        The figure to be tiled (by default, the figure of the current rendering
+        context).
+
+    size : str
+        The paper size of the pages.
+
+    orientation : str, optional
+        The orientation of the pages. If None, the orientation requiring the
+        smallest number of pages is used.
+
+    overlap : float
+        The overlap (in mm) between adjacent pages.
+
+    printer_margin : float
+        The non-printable margin (in mm) on all sides of the page.
+    """
+    figure = figure or current_context().figure
+    ax = figure.axes[0]
+    extent = figure_extent(figure)
+    layouts = []
+    for _orientation in PAPER_ORIENTATIONS if orientation is None else [orientation]:
+        page_width, page_height = paper_dimensions(size, _orientation)
+        width = page_width - 2. * printer_margin
+        height = page_height - 2. * printer_margin
+        assert width > 2. * overlap and height > 2. * overlap
+        tiles, (nx, ny) = tile_grid(extent, width, height, overlap)
+        layouts.append((len(tiles), page_width, page_height, width, height, tiles, nx))
+    _, page_width, page_height, width, height, tiles, nx = min(layouts, key=lambda layout: layout[0])
+    # Cache the original state of the figure...
+    figsize = figure.get_size_inches()
+    position = ax.get_position()
+    limits = ax.get_xlim(), ax.get_ylim()
+    hidden = [artist for artist in ax.artists if isinstance(artist, AnchoredOffsetbox) \
+              and artist.get_visible()]
+    # ...and prepare it for the tiling. Mind the frame of the axes is replaced
+    # by an equivalent rectangle in data coordinates.
+    (xmin, xmax), (ymin, ymax) = limits
+    frame = ax.add_patch(matplotlib.patches.Rectangle((xmin, ymin), xmax - xmin, ymax - ymin,
+                                                      fill=False, zorder=0.))
+    ax.set_frame_on(False)
+    for artist in hidden:
+        artist.set_visible(False)
+    figure.set_size_inches(mm_to_inches(page_width), mm_to_inches(page_height))
+    ax.set_position([printer_margin / page_width, printer_margin / page_height,
+                     width / page_width, height / page_height])
+    cullers = [_CollectionCuller(collection) for collection in ax.collections \
+               if _CollectionCuller.cullable(collection, ax)]
+    marks = _registration_marks(ax, width, height, overlap)
+    label = ax.text(0.5, 0.25 * overlap / height, '', transform=ax.transAxes, ha='center',
+                    va='center', size='small', clip_on=False)
+    try:
+        with PdfPages(file_path) as pdf:
+            for i, (x, y) in enumerate(tiles):
+                ax.set_xlim(x, x + width)
+                ax.set_ylim(y, y + height)
+                for culler in cullers:
+                    culler.cull(x, y, x + width, y + height)
+                row, column = divmod(i, nx)
+                label.set_text('{} - page {} of {} (row {}, column {})'.format(
+                    figure.get_label(), i + 1, len(tiles), row + 1, column + 1))
+                pdf.savefig(figure)
+    finally:
+        # Restore the original state of the figure.
+        for culler in cullers:
+            culler.restore()
+        for artist in marks + [label, frame]:
+            artist.remove()
+        for artist in hidden:
+            artist.set_visible(True)
+        ax.set_frame_on(True)
+        figure.set_size_inches(*figsize)
+        ax.set_position(position)
+        ax.set_xlim(*limits[0])
+        ax.set_ylim(*limits[1])
+    return len(tiles)
@@ -39,15 +39,15 @@ class DrillPress(Drawable):
     def _draw(self, offset, **kwargs):
         """Overloaded method.
         """
-        p = Point(0., 0.) + offset
-        hole(p, self.mandrel_diameter)
+        p = Point(0., 0.)
+        hole(p, self.mandrel_diameter, offset=offset)
         p = p.hmove(-0.75 * self.width)
         slope = -np.degrees(np.arctan2(0.5 * (self.height - self.mandrel_diameter), self.width))
         l = 0.85 * self.width
-        vline(p.vmove(-0.4 * self.height), self.height).\
-            draw_connecting_line(l, slope).\
-            draw_connecting_arc(self.head_radius, -180. + 2. * abs(slope)).\
-            draw_connecting_line(l)
+        vline(p.vmove(-0.4 * self.height), self.height, offset).\
+            draw_connecting_line(l, slope, offset).\
+            draw_connecting_arc(self.head_radius, -180. + 2. * abs(slope), offset).\
+            draw_connecting_line(l, offset)
 
 
 
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Affine transformations in two dimensions.
+
+Transformations are used to place objects on the drawing canvas: rather than
+moving every single point of an object by the drawing offset, a transformation
+is composed once for each group of objects (e.g., all the sub-paths of a
+parametric path) and either applied to entire vertex buffers at once, or handed
+over to matplotlib, so that the transformation is carried out at rendering
+time, with no additional geometry being created on our side.
+
+Mind that all the drawing methods accepting an offset accept a Transform object
+as well, and plain offsets (i.e., Point objects or (x, y) tuples) are turned
+into translations.
+"""
+
+import numpy as np
+
+from metalute.matplotlib_ import current_context
+from metalute.primitives import LinePrimitive, ArcPrimitive, CirclePrimitive, PolylinePrimitive
+
+
+def _xy(point):
+    """Return the (x, y) coordinates of a point, passed either as a Point
+    object or as a 2-element tuple.
+    """
+    try:
+        return point.xy()
+    except AttributeError:
+        return tuple(point)
+
+
+
+class Transform:
+
+    """Affine transformation in two dimensions.
+
+    The transformation is stored as a 3 x 3 matrix acting on homogeneous
+    coordinates, and Transform objects are immutable. Transformations can be
+    composed with the @ operator, where t1 @ t2 is the transformation applying
+    t2 first, and then t1. For convenience, the translate(), rotate(), mirror()
+    and scale() methods return the transformation followed by the given
+    elementary transformation, so that placing an object can be written as, e.g.,
+
+    >>> Transform().rotate(30.).translate(100., 0.)
+
+    Parameters
+    ----------
+    matrix : array_like, optional
+        The 3 x 3 transformation matrix (defaults to the identity).
+    """
+
+    __slots__ = ('matrix', '_mpl_transform')
+
+    def __init__(self, matrix=None):
+        """Constructor.
+        """
+        matrix = np.identity(3) if matrix is None else np.array(matrix, dtype=float)
+        assert matrix.shape == (3, 3)
+        matrix.flags.writeable = False
+        self.matrix = matrix
+        self._mpl_transform = None
+
+    @classmethod
+    def translation(cls, dx: float, dy: float):
+        """Return a translation.
+        """
+        return cls([[1., 0., dx], [0., 1., dy], [0., 0., 1.]])
+
+    @classmethod
+    def rotation(cls, angle: float, center=(0., 0.)):
+        """Return a counter-clockwise rotation by a given angle (in degrees)
+        around a given center.
+        """
+        phi = np.radians(angle)
+        c, s = np.cos(phi), np.sin(phi)
+        return cls._around(cls([[c, -s, 0.], [s, c, 0.], [0., 0., 1.]]), center)
+
+    @classmethod
+    def reflection(cls, slope: float = 0., point=(0., 0.)):
+        """Return the reflection across the line through a given point with a
+        given slope (in degrees).
+
+        The default is a reflection across the x-axis.
+        """
+        phi = np.radians(2. * slope)
+        c, s = np.cos(phi), np.sin(phi)
+        return cls._around(cls([[c, s, 0.], [s, -c, 0.], [0., 0., 1.]]), point)
+
+    @classmethod
+    def scaling(cls, sx: float, sy: float = None, center=(0., 0.)):
+        """Return a scaling around a given center.
+
+        If sy is None the scaling is isotropic.
+        """
+        if sy is None:
+            sy = sx
+        return cls._around(cls([[sx, 0., 0.], [0., sy, 0.], [0., 0., 1.]]), center)
+
+    @classmethod
+    def _around(cls, transform, center):
+        """Conjugate a transformation by the translation to a given center.
+        """
+        x, y = _xy(center)
+        if x == 0. and y == 0.:
+            return transform
+        return cls.translation(x, y) @ transform @ cls.translation(-x, -y)
+
+    def __matmul__(self, other):
+        """Operator overload---composition of transformations.
+        """
+        if not isinstance(other, Transform):
+            return NotImplemented
+        return self.__class__(self.matrix @ other.matrix)
+
+    def __repr__(self):
+        """String formatting.
+        """
+        (a, b, dx), (c, d, dy) = self.matrix[:2]
+        return '{}([[{}, {}, {}], [{}, {}, {}]])'.format(self.__class__.__name__, a, b, dx, c, d, dy)
+
+    def translate(self, dx: float, dy: float):
+        """Return the transformation followed by a translation.
+        """
+        return self.translation(dx, dy) @ self
+
+    def rotate(self, angle: float, center=(0., 0.)):
+        """Return the transformation followed by a rotation.
+        """
+        return self.rotation(angle, center) @ self
+
+    def mirror(self, slope: float = 0., point=(0., 0.)):
+        """Return the transformation followed by a reflection.
+        """
+        return self.reflection(slope, point) @ self
+
+    def scale(self, sx: float, sy: float = None, center=(0., 0.)):
+        """Return the transformation followed by a scaling.
+        """
+        return self.scaling(sx, sy, center) @ self
+
+    def inverse(self):
+        """Return the inverse transformation.
+        """
+        return self.__class__(np.linalg.inv(self.matrix))
+
+    def apply(self, vertices):
+        """Apply the transformation to a (N, 2) array of vertices in a single
+        vectorized pass.
+
+        Mind rows of NaNs (i.e., the separators between disconnected pieces)
+        are preserved.
+        """
+        vertices = np.asarray(vertices, dtype=float)
+        return vertices @ self.matrix[:2, :2].T + self.matrix[:2, 2]
+
+    def apply_point(self, point):
+        """Apply the transformation to a single point (passed either as a Point
+        object or as an (x, y) tuple), and return the (x, y) coordinates of the
+        transformed point.
+        """
+        x, y = _xy(point)
+        (a, b, dx), (c, d, dy) = self.matrix[:2]
+        return (a * x + b * y + dx, c * x + d * y + dy)
+
+    def apply_primitives(self, primitives):
+        """Apply the transformation to a sequence of drawing primitives (see the
+        primitives module), and return the list of transformed primitives.
+
+        Mind circular arcs and full circles are only mapped onto circular arcs
+        and circles by similarity transformations (i.e., combinations of
+        translations, rotations, reflections and uniform scalings), and a
+        RuntimeError is raised otherwise.
+        """
+        (a, b), (c, d) = self.matrix[:2, :2]
+        scale = np.sqrt(abs(a * d - b * c))
+        similar = np.isclose(a * a + c * c, scale**2.) and np.isclose(a * b + c * d, 0.)
+        # Rotation angle and orientation of the linear part of the transformation.
+        angle = np.degrees(np.arctan2(c, a))
+        sign = 1. if a * d - b * c >= 0. else -1.
+        transformed = []
+        for primitive in primitives:
+            if isinstance(primitive, LinePrimitive):
+                primitive = LinePrimitive(self.apply_point(primitive.start),
+                                          self.apply_point(primitive.end))
+            elif isinstance(primitive, PolylinePrimitive):
+                primitive = PolylinePrimitive(self.apply(primitive.vertices))
+            else:
+                if not similar:
+                    raise RuntimeError('Cannot apply {} to {}'.format(self, primitive))
+                center = self.apply_point(primitive.center)
+                radius = primitive.radius * scale
+                if isinstance(primitive, CirclePrimitive):
+                    primitive = CirclePrimitive(center, radius)
+                else:
+                    start_phi = angle + sign * primitive.start_phi
+                    primitive = ArcPrimitive(center, radius, start_phi, sign * primitive.span)
+            transformed.append(primitive)
+        return transformed
+
+    def to_affine2d(self):
+        """Return the equivalent matplotlib.transforms.Affine2D object.
+        """
+        from metalute.matplotlib_ import matplotlib
+        return matplotlib.transforms.Affine2D(self.matrix.copy())
+
+    def mpl_transform(self, ax=None):
+        """Return the matplotlib transformation (from object coordinates to
+        display coordinates) to be handed over to the artists for a given axes
+        object (by default the axes of the current rendering context).
+
+        This is cached, so that all the artists placed with the same
+        transformation on the same axes share the very same object. (Mind the
+        cache is read and replaced as a whole, so that it is safe to share a
+        transformation across contexts rendered in different threads.)
+        """
+        if ax is None:
+            ax = current_context().axes
+        cache = self._mpl_transform
+        if cache is None or cache[0] is not ax:
+            cache = (ax, self.to_affine2d() + ax.transData)
+            self._mpl_transform = cache
+        return cache[1]
+
+
+
+IDENTITY = Transform()
+
+
+def as_transform(offset):
+    """Turn a drawing offset into a Transform object.
+
+    The offset can be a Transform object (that is returned as is), None (that
+    is interpreted as the identity), or anything with x and y attributes (e.g.,
+    a Point object) or an (x, y) tuple, that are interpreted as translations.
+    """
+    if isinstance(offset, Transform):
+        return offset
+    if offset is None:
+        return IDENTITY
+    if hasattr(offset, 'x') and hasattr(offset, 'y'):
+        return Transform.translation(offset.x, offset.y)
+    if isinstance(offset, tuple) and len(offset) == 2:
+        return Transform.translation(*offset)
+    raise RuntimeError('Cannot cast {} to Transform.'.format(offset))
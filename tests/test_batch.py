@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Test suite for the batch module.
+"""
+
+from dataclasses import replace
+import os
+import tempfile
+import time
+import unittest
+import sys
+
+from metalute.batch import RenderJob, CATALOG, run_batch, load_jobs, dump_jobs, main
+from metalute.cache import RenderCache
+
+
+
+class TestBatch(unittest.TestCase):
+
+    """Unit tests for the batch module.
+    """
+
+    @staticmethod
+    def _jobs(folder):
+        """Return a small list of jobs, including a failing one.
+        """
+        return [RenderJob('metalute.routing:SingleCoilRoutingTemplate', 'A4',
+                          os.path.join(folder, 'single_coil.pdf'), 'Portrait'),
+                RenderJob('metalute.routing:NoSuchTemplate', 'A4', os.path.join(folder, 'fail.pdf')),
+                RenderJob('metalute.head:MusicMan', 'A4', os.path.join(folder, 'head.png'),
+                          method='draw_top', params=dict(angle=10.))]
+
+    def _check(self, folder, results):
+        """Check the outcome of a batch.
+        """
+        self.assertEqual([result.success for result in results], [True, False, True])
+        self.assertIn('AttributeError', results[1].error)
+        for file_name in ('single_coil.pdf', 'head.png'):
+            self.assertTrue(os.path.isfile(os.path.join(folder, file_name)))
+        self.assertFalse(os.path.exists(os.path.join(folder, 'fail.pdf')))
+
+    def test_pool(self):
+        """Render a few jobs in parallel.
+        """
+        progress = []
+        with tempfile.TemporaryDirectory() as folder:
+            jobs = self._jobs(folder)
+            results = run_batch(jobs, 2, lambda *args: progress.append(args[1:]))
+            self._check(folder, results)
+        self.assertEqual(sorted(progress), [(i, len(jobs)) for i in range(1, len(jobs) + 1)])
+
+    def test_serial(self):
+        """Render a few jobs in the current process.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            self._check(folder, run_batch(self._jobs(folder), 1, None))
+
+    def test_cli(self):
+        """Write the catalog to file and run a selection from the command line.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            file_path = os.path.join(folder, 'jobs.json')
+            dump_jobs(CATALOG, file_path)
+            self.assertEqual(load_jobs(file_path), CATALOG)
+            args = ['--jobs', file_path, '--output-folder', folder, '--workers', '1',
+                    '--select', 'neck_pocket', '--cache-folder', os.path.join(folder, 'cache')]
+            self.assertEqual(main(args), 0)
+            self.assertTrue(os.path.isfile(os.path.join(folder, 'neck_pocket_routing_template.pdf')))
+
+    def test_cache(self):
+        """Repeated jobs are fetched from the render cache.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            cache = RenderCache(os.path.join(folder, 'cache'))
+            jobs = self._jobs(folder)
+            results = run_batch(jobs, 1, None, cache)
+            self.assertEqual([result.cached for result in results], [False] * 3)
+            self.assertEqual(len(cache.entries()), 2)
+            # The date in the title box is part of the key.
+            for _, metadata, _, _, _ in cache.entries():
+                self.assertEqual(metadata['paper']['date'], time.strftime('%a %b %d %Y'))
+            os.remove(jobs[0].output)
+            results = run_batch(jobs, 2, None, cache)
+            self._check(folder, results)
+            self.assertEqual([result.cached for result in results], [True, False, True])
+            # A different set of parameters is a different entry.
+            job = replace(jobs[2], params=dict(angle=12.))
+            self.assertFalse(run_batch([job], 1, None, cache)[0].cached)
+            self.assertEqual(len(cache.entries()), 3)
+
+
+
+if __name__ == '__main__':
+    unittest.main(exit=not sys.flags.interactive)
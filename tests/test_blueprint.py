@@ -19,11 +19,17 @@
 """Test suite for the blueprint module.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+import io
 import unittest
 import sys
 
-from metalute.blueprint import blueprint
-from metalute.matplotlib_ import plt
+from matplotlib.path import Path
+
+from metalute.blueprint import blueprint, fit_paper, blueprint_frame, drawing_area, hruler, vruler
+from metalute.body import MusicManAxis
+from metalute.geometry import Point
+from metalute.matplotlib_ import matplotlib, plt, mm_to_points, current_context
 if sys.flags.interactive:
     plt.ion()
 
@@ -38,6 +44,89 @@ class TestBlueprint(unittest.TestCase):
         """
         blue = blueprint('Test blueprint', 'A4')
 
+    def test_frame_cache(self) -> None:
+        """The frame is calculated once for each page layout, and stamped onto
+        the figures with a fixed, small number of artists.
+        """
+        blueprint('Test frame cache 1', 'A3')
+        hits = blueprint_frame.cache_info().hits
+        context = blueprint('Test frame cache 2', 'A3')
+        self.assertEqual(blueprint_frame.cache_info().hits, hits + 1)
+        self.assertEqual(len(context.axes.texts), 0)
+        self.assertEqual(len(context.axes.collections), 2)
+        segments, widths, labels = blueprint_frame(420., 297.)
+        self.assertEqual(len(segments), len(widths))
+        self.assertFalse(segments.flags.writeable)
+        xmin, ymin, xmax, ymax = Path.make_compound_path(*labels).get_extents().extents
+        # The labels of the reference grid are outside the drawing area.
+        w, h = drawing_area(420., 297.)
+        self.assertTrue(xmin < -w and xmax > w and ymin < -h and ymax > h)
+
+    def test_rulers(self) -> None:
+        """Rulers are drawn as a LineCollection and a PathCollection.
+        """
+        ax = blueprint('Test rulers', 'A0').axes
+        num_collections = len(ax.collections)
+        lines, labels = hruler(-300., -500., 500.)
+        self.assertEqual(len(lines.get_segments()), 102)
+        self.assertEqual(len(labels.get_paths()), 101)
+        vruler(-400., -300., 300., step=5.)
+        self.assertEqual(len(ax.collections), num_collections + 4)
+        self.assertEqual(len(ax.texts), 0)
+
+    def test_context(self) -> None:
+        """A standalone blueprint does not touch the global state, and all the
+        draw methods target it when its context is current.
+        """
+        rc = dict(matplotlib.rcParams)
+        fignums = plt.get_fignums()
+        context = blueprint('Test context', 'A3', line_width=0.5, pyplot=False)
+        self.assertEqual(dict(matplotlib.rcParams), rc)
+        self.assertEqual(plt.get_fignums(), fignums)
+        num_lines = len(context.axes.lines)
+        with context:
+            self.assertIs(current_context(), context)
+            Point(0., 0., 'O').draw(Point(0., 0.))
+            MusicManAxis().draw(Point(-200., -50.))
+        self.assertIsNot(current_context(), context)
+        self.assertGreater(len(context.axes.lines), num_lines + 1)
+        for line in context.axes.lines:
+            self.assertAlmostEqual(line.get_linewidth(), mm_to_points(0.5))
+        self.assertAlmostEqual(context.axes.texts[-1].get_fontsize(), mm_to_points(3.))
+        self.assertEqual(dict(matplotlib.rcParams), rc)
+
+    def test_concurrent(self) -> None:
+        """Render different standalone blueprints in different threads.
+        """
+        def _render(line_width):
+            with blueprint('Test concurrent', 'A3', line_width=line_width, pyplot=False) as context:
+                MusicManAxis().draw(Point(-200., -50.))
+                context.savefig(io.BytesIO(), format='png')
+            return context
+
+        line_widths = (0.1, 0.2, 0.3, 0.4)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            contexts = list(executor.map(_render, line_widths))
+        for context, line_width in zip(contexts, line_widths):
+            widths = {line.get_linewidth() for line in context.axes.lines}
+            self.assertEqual(len(widths), 1)
+            self.assertAlmostEqual(widths.pop(), mm_to_points(line_width))
+
+    def test_fit_paper(self) -> None:
+        """Automatic choice of the paper size.
+        """
+        sizes = ('A3', 'A4', 'A5')
+        self.assertEqual(fit_paper((0., 0., 100., 100.), sizes=sizes), ('A5', 'Portrait', (-50., -50.)))
+        self.assertEqual(fit_paper((0., 0., 100., 200.), sizes=sizes)[:2], ('A4', 'Portrait'))
+        self.assertEqual(fit_paper((0., 0., 100., 200.), sizes=sizes, orientation='Landscape')[:2],
+                         ('A3', 'Landscape'))
+        body = MusicManAxis()
+        size, orientation, offset = fit_paper(body)
+        blueprint('Test fit paper', size, orientation=orientation)
+        body.draw(Point(*offset))
+        with self.assertRaises(RuntimeError):
+            fit_paper((0., 0., 2000., 2000.))
+
 
 
 if __name__ == '__main__':
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Test suite for the cache module.
+"""
+
+from functools import partial
+import os
+import tempfile
+import unittest
+
+from metalute.cache import RenderCache, cache_metadata, cache_key, main
+from metalute.head import MusicMan
+from metalute.routing import SingleCoilRoutingTemplate, HumbuckerRoutingTemplate
+
+
+
+class TestCache(unittest.TestCase):
+
+    """Unit tests for the cache module.
+    """
+
+    def test_key(self):
+        """The key depends on the class, the parameters and the paper settings,
+        but not on the order of the parameters.
+        """
+        paper = dict(size='A4', orientation='Portrait')
+        key = cache_key(cache_metadata(MusicMan, dict(angle=10., width=50.), paper))
+        self.assertEqual(key, cache_key(cache_metadata(MusicMan, dict(width=50., angle=10.),
+                                                       paper)))
+        for metadata in (cache_metadata(MusicMan, dict(angle=12., width=50.), paper),
+                         cache_metadata(MusicMan, dict(angle=10., width=50.), dict(size='A3')),
+                         cache_metadata(MusicMan, dict(angle=10., width=50.), paper, 'svg'),
+                         cache_metadata(SingleCoilRoutingTemplate, dict(angle=10., width=50.),
+                                        paper)):
+            self.assertNotEqual(cache_key(metadata), key)
+
+    def test_factories(self):
+        """Different factories map onto different keys.
+        """
+        def _factory1():
+            return MusicMan()
+
+        def _factory2():
+            return MusicMan(angle=12.)
+
+        keys = [cache_key(cache_metadata(factory)) for factory in \
+                (_factory1, _factory2, MusicMan, partial(MusicMan, angle=12.),
+                 partial(MusicMan, angle=14.))]
+        self.assertEqual(len(set(keys)), len(keys))
+        self.assertEqual(cache_key(cache_metadata(partial(MusicMan, angle=12.))), keys[3])
+        self.assertIn('_factory1', cache_metadata(_factory1)['design'])
+
+    def test_roundtrip(self):
+        """Put a file into the cache and fetch it back.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            cache = RenderCache(os.path.join(folder, 'cache'))
+            metadata = cache_metadata(SingleCoilRoutingTemplate, fmt='.PDF')
+            self.assertIsNone(cache.get(metadata))
+            file_path = os.path.join(folder, 'input.pdf')
+            with open(file_path, 'wb') as output_file:
+                output_file.write(b'%PDF' * 100)
+            cached_file_path = cache.put(metadata, file_path)
+            self.assertTrue(cached_file_path.endswith('.pdf'))
+            self.assertEqual(cache.get(metadata), cached_file_path)
+            output_file_path = os.path.join(folder, 'output.pdf')
+            self.assertTrue(cache.fetch(metadata, output_file_path))
+            with open(output_file_path, 'rb') as input_file:
+                self.assertEqual(input_file.read(), b'%PDF' * 100)
+            self.assertEqual(cache.size(), 400)
+
+    def test_eviction(self):
+        """The least recently used entries are evicted first.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            cache = RenderCache(os.path.join(folder, 'cache'), max_size=250)
+            file_path = os.path.join(folder, 'input.pdf')
+            with open(file_path, 'wb') as output_file:
+                output_file.write(b'x' * 100)
+            metadata = [cache_metadata(MusicMan, dict(angle=angle)) for angle in range(3)]
+            for i, _metadata in enumerate(metadata[:2]):
+                cache.put(_metadata, file_path)
+                os.utime(cache.get(_metadata), (i, i))
+            # Touch the first entry, so that the second one is evicted first.
+            cache.get(metadata[0])
+            cache.put(metadata[2], file_path)
+            self.assertIsNotNone(cache.get(metadata[0]))
+            self.assertIsNone(cache.get(metadata[1]))
+            self.assertIsNotNone(cache.get(metadata[2]))
+            self.assertEqual(cache.evict(0), 2)
+            self.assertEqual(cache.size(), 0)
+
+    def test_invalidate(self):
+        """Invalidate entries from the command line.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            cache = RenderCache(folder)
+            file_path = os.path.join(folder, 'input.svg')
+            with open(file_path, 'w') as output_file:
+                output_file.write('<svg/>')
+            for design in (SingleCoilRoutingTemplate, HumbuckerRoutingTemplate, MusicMan):
+                cache.put(cache_metadata(design, fmt='svg'), file_path)
+            self.assertEqual(main(['list', '--folder', folder]), 0)
+            self.assertEqual(main(['invalidate', 'RoutingTemplate', '--folder', folder]), 0)
+            self.assertEqual([entry[1]['design'] for entry in cache.entries()],
+                             ['metalute.head.MusicMan'])
+            self.assertEqual(main(['invalidate', '--folder', folder]), 0)
+            self.assertEqual(cache.entries(), [])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Test suite for the dxf module.
+"""
+
+import collections
+import io
+import os
+import tempfile
+import unittest
+import sys
+
+from metalute.body import MusicManAxis
+from metalute.dxf import write_dxf, entities, DxfWriter
+from metalute.geometry import Point, CircularArc, Hole
+from metalute import geometry2
+from metalute.head import MusicMan
+from metalute.pickup import HumbuckerRouting, SingleCoilRouting
+from metalute.primitives import ArcPrimitive, CirclePrimitive, LinePrimitive, PolylinePrimitive
+from metalute.routing import HumbuckerRoutingTemplate
+from metalute.transform import Transform
+
+
+
+def parse_groups(text):
+    """Parse the content of a DXF file into a list of (code, value) pairs.
+    """
+    lines = text.splitlines()
+    return [(int(code), value) for code, value in zip(lines[::2], lines[1::2])]
+
+
+def parse_entities(text):
+    """Parse the content of a DXF file, and return the list of the entities
+    (as dictionaries of group codes) in the ENTITIES section.
+    """
+    groups = parse_groups(text)
+    start = groups.index((2, 'ENTITIES')) + 1
+    entities = []
+    for code, value in groups[start:]:
+        if code == 0:
+            entities.append({0: value})
+        else:
+            entities[-1][code] = value
+    return entities[:-2]
+
+
+
+class TestDxf(unittest.TestCase):
+
+    """Unit tests for the dxf module.
+    """
+
+    def test_arcs(self):
+        """Arcs are always written counterclockwise.
+        """
+        arc, = parse_entities('0\nSECTION\n2\nENTITIES\n' +
+                              entities([ArcPrimitive((1., 2.), 3., 30., -90.)]) +
+                              '0\nENDSEC\n0\nEOF\n')
+        self.assertEqual(arc[0], 'ARC')
+        self.assertAlmostEqual(float(arc[50]), 300.)
+        self.assertAlmostEqual(float(arc[51]), 30.)
+        text = entities([ArcPrimitive((0., 0.), 1., 0., 360.), CirclePrimitive((0., 0.), 1.)])
+        self.assertEqual(text.count('CIRCLE'), 2)
+
+    def test_snapping(self):
+        """The end points of lines and poly-lines are snapped onto the welded end
+        points.
+        """
+        primitives = [LinePrimitive((0., 0.), (1., 0.)),
+                      PolylinePrimitive([(1.0005, 0.), (1., 1.), (0., 1.)]),
+                      LinePrimitive((0., 1.0005), (0., 0.0005))]
+        lines = parse_entities('0\nSECTION\n2\nENTITIES\n' + entities(primitives) +
+                               '0\nENDSEC\n0\nEOF\n')
+        vertices = [(float(entity[10]), float(entity[20])) for entity in lines \
+                    if entity[0] == 'VERTEX']
+        self.assertEqual(vertices[0], (1., 0.))
+        self.assertEqual((float(lines[-1][10]), float(lines[-1][20])), vertices[-1])
+        self.assertEqual((float(lines[-1][11]), float(lines[-1][21])), (0., 0.))
+
+    def test_entities(self):
+        """Each primitive is mapped onto a single native entity.
+        """
+        output = io.StringIO()
+        parts = {'ARC': CircularArc(Point(0., 0.), 10., 10., 100.),
+                 'HOLES': [Hole(Point(0., 0.), 5.), geometry2.Hole(geometry2.Point(10., 0.), 5.)],
+                 'RECTANGLE': geometry2.Rectangle(geometry2.Point(0., 0.), 40., 20., 5.)}
+        write_dxf(output, parts)
+        text = output.getvalue()
+        self.assertTrue(text.endswith('0\nEOF\n'))
+        counts = collections.Counter((entity[8], entity[0]) for entity in parse_entities(text))
+        self.assertEqual(counts[('ARC', 'ARC')], 1)
+        self.assertEqual(counts[('HOLES', 'CIRCLE')], 2)
+        self.assertEqual(counts[('HOLES', 'LINE')], 4)
+        self.assertEqual(counts[('RECTANGLE', 'ARC')], 4)
+        self.assertEqual(counts[('RECTANGLE', 'LINE')], 4)
+        # Check the layer table.
+        groups = parse_groups(text)
+        layers = [value for (code, value), (_, prev) in zip(groups[1:], groups) if \
+                  code == 2 and prev == 'LAYER']
+        self.assertEqual(layers, list(parts))
+        # The linetype referenced by the layers is defined before the layer table.
+        ltype = groups.index((2, 'LTYPE'))
+        self.assertEqual(groups[ltype - 1], (0, 'TABLE'))
+        self.assertIn((2, 'CONTINUOUS'), groups[ltype:groups.index((2, 'LAYER'))])
+        self.assertEqual({value for code, value in groups if code == 6}, {'CONTINUOUS'})
+
+    def test_spiral(self):
+        """Only the spirals are tessellated.
+        """
+        output = io.StringIO()
+        body = MusicManAxis()
+        write_dxf(output, {'BODY': body})
+        counts = collections.Counter(entity[0] for entity in parse_entities(output.getvalue()))
+        self.assertEqual(counts['POLYLINE'], 1)
+        self.assertEqual(counts['SEQEND'], 1)
+        self.assertEqual(counts['ARC'] + counts['LINE'] + counts['POLYLINE'], len(body.path_dict))
+
+    def test_offset(self):
+        """Transformations are applied to the primitives.
+        """
+        hole = Hole(Point(1., 0.), 2.)
+        transform = Transform().rotate(90.).translate(10., 0.)
+        output = io.StringIO()
+        with DxfWriter(output, ['HOLE']) as writer:
+            writer.write(hole, 'HOLE', transform)
+            with self.assertRaises(RuntimeError):
+                writer.write(hole, 'UNKNOWN')
+        circle = parse_entities(output.getvalue())[0]
+        self.assertAlmostEqual(float(circle[10]), 10.)
+        self.assertAlmostEqual(float(circle[20]), 1.)
+
+    def test_guitar(self):
+        """Write a bunch of parts to file.
+        """
+        parts = {'HEAD': MusicMan(angle=10.), 'NECK_PICKUP': SingleCoilRouting(),
+                 'BRIDGE_PICKUP': HumbuckerRouting(),
+                 'TEMPLATE': HumbuckerRoutingTemplate()}
+        with tempfile.TemporaryDirectory() as folder:
+            file_path = os.path.join(folder, 'guitar.dxf')
+            write_dxf(file_path, parts, offset=Point(100., 0.))
+            with open(file_path) as input_file:
+                text = input_file.read()
+        layers = set(entity[8] for entity in parse_entities(text))
+        self.assertEqual(layers, set(parts))
+
+
+
+if __name__ == '__main__':
+    unittest.main(exit=not sys.flags.interactive)
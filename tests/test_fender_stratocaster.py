@@ -19,6 +19,7 @@
 """
 
 import unittest
+from unittest import mock
 import sys
 import os
 
@@ -74,6 +75,45 @@ class TestFenderStratocaster(unittest.TestCase):
         head = FenderStratocasterContour()
         head.draw(offset)
 
+    def test_set_params(self):
+        """Changing a parameter should only rebuild the downstream sub-paths.
+        """
+        contour = FenderStratocasterContour()
+        arcs = [contour.path(name) for name in ('arc4', 'arc5')]
+        vertices = arcs[0].sample()
+        self.assertEqual(contour.set_params(r5=300.), ['arc5', 'arc6', 'arc7', 'line3'])
+        self.assertIs(contour.path('arc4'), arcs[0])
+        self.assertIs(contour.path('arc4').sample(), vertices)
+        self.assertIsNot(contour.path('arc5'), arcs[1])
+        self.assertEqual(contour.path('arc5').radius, 300.)
+        # Setting a parameter to the same value is a no-op.
+        self.assertEqual(contour.set_params(r5=300.), [])
+        # And the result is identical to a construction from scratch.
+        target = FenderStratocasterContour(r5=300.)
+        self.assertTrue(np.allclose(contour.sample(), target.sample()))
+        with self.assertRaises(AttributeError):
+            contour.r99
+        # The upstream paths are replayed, rather than created anew.
+        created = []
+        init = CircularArc.__init__
+        def counting_init(arc, *args, **kwargs):
+            created.append(arc)
+            init(arc, *args, **kwargs)
+        with mock.patch.object(CircularArc, '__init__', counting_init):
+            contour.set_params(r5=310.)
+        self.assertEqual(len(created), 3)
+        self.assertIs(contour.path('arc5'), created[0])
+
+    def test_closure(self):
+        """The contour should close on the bottom edge of the neck for any
+        value of the parameters.
+        """
+        r5 = np.linspace(250., 310., 7)
+        batch = FenderStratocasterContour.batch(r5=r5)
+        width = FenderStratocasterContour.DEFAULT_PAR_DICT['width_at_nut']
+        target = np.tile([0., -0.5 * width], (len(r5), 1))
+        self.assertTrue(np.allclose(batch.end_point(), target))
+
     def test_draw(self):
         """
         """
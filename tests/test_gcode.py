@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Test suite for the gcode module.
+"""
+
+import io
+import re
+import types
+import unittest
+import sys
+
+import numpy as np
+
+from metalute.gcode import MillingParameters, contour_toolpath, drilling_toolpath,\
+    routing_toolpath, template_toolpath, program, write_gcode
+from metalute.geometry import Point, Hole
+from metalute.pickup import SingleCoilRouting, HumbuckerRouting
+from metalute.routing import SingleCoilRoutingTemplate
+
+
+
+def parse_moves(lines):
+    """Parse a sequence of G-code lines into a list of (command, dict) tuples.
+    """
+    moves = []
+    for line in lines:
+        if line.startswith('('):
+            continue
+        words = line.split()
+        args = {word[0]: float(word[1:]) for word in words[1:] if not word[0].isdigit()}
+        moves.append((words[0], args))
+    return moves
+
+
+
+class TestGcode(unittest.TestCase):
+
+    """Unit tests for the gcode module.
+    """
+
+    def test_depths(self):
+        """Depth of the passes.
+        """
+        self.assertEqual(MillingParameters(depth=9., depth_per_pass=3.).depths(), [-3., -6., -9.])
+        self.assertEqual(MillingParameters(depth=10., depth_per_pass=4.).depths(), [-4., -8., -10.])
+
+    def test_lazy(self):
+        """The toolpaths are generated lazily.
+        """
+        params = MillingParameters()
+        toolpath = contour_toolpath(SingleCoilRouting().contour(), params)
+        self.assertIsInstance(toolpath, types.GeneratorType)
+        self.assertTrue(next(toolpath).startswith('('))
+
+    def test_single_coil(self):
+        """The routing is done inside the contour, with native arcs.
+        """
+        routing = SingleCoilRouting()
+        params = MillingParameters(depth=12., depth_per_pass=4., lead_in_radius=1.)
+        moves = parse_moves(routing_toolpath(routing, params))
+        plunges = [args['Z'] for cmd, args in moves if cmd == 'G1' and 'Z' in args]
+        self.assertEqual(plunges, [-4., -8., -12.])
+        arcs = [args for cmd, args in moves if cmd in ('G2', 'G3')]
+        # Two arcs per pass, plus the lead-in and the lead-out.
+        self.assertEqual(len(arcs), 3 * 4)
+        # The contour is offset inside by the tool radius.
+        x = [args['X'] for cmd, args in moves if cmd == 'G1' and 'X' in args]
+        self.assertAlmostEqual(max(x), 0.5 * routing.inner_length - params.tool_radius, places=3)
+        # Check the arcs: the distance from the start point to the center should
+        # match that from the end point.
+        x0, y0 = None, None
+        for cmd, args in moves:
+            if cmd in ('G2', 'G3') and x0 is not None:
+                cx, cy = x0 + args['I'], y0 + args['J']
+                r1 = np.hypot(x0 - cx, y0 - cy)
+                r2 = np.hypot(args['X'] - cx, args['Y'] - cy)
+                self.assertAlmostEqual(r1, r2, places=2)
+            if 'X' in args:
+                x0, y0 = args['X'], args['Y']
+
+    def test_outside(self):
+        """Outside compensation.
+        """
+        routing = HumbuckerRouting()
+        params = MillingParameters(depth_per_pass=20.)
+        moves = parse_moves(contour_toolpath(routing.contour(), params, 'outside'))
+        x = [args['X'] for cmd, args in moves if cmd in ('G1', 'G2', 'G3') and 'X' in args]
+        self.assertAlmostEqual(max(x), 0.5 * routing.length + params.tool_radius, places=3)
+
+    def test_holes(self):
+        """Small holes are pecked and large ones are interpolated.
+        """
+        params = MillingParameters(tool_diameter=3., depth=6., depth_per_pass=3.)
+        holes = [Hole(Point(0., 0.), 3.), Hole(Point(10., 0.), 10.)]
+        moves = parse_moves(drilling_toolpath(holes, params))
+        self.assertEqual(moves[1], ('G0', {'X': 0., 'Y': 0.}))
+        self.assertEqual(len([cmd for cmd, _ in moves if cmd == 'G3']), 2 * (2 + 2))
+        x = [args['X'] for cmd, args in moves if cmd == 'G3']
+        self.assertAlmostEqual(max(x), 10. + 5. - 1.5)
+
+    def test_program(self):
+        """Write an entire program to file.
+        """
+        params = MillingParameters()
+        template = SingleCoilRoutingTemplate()
+        output = io.StringIO()
+        write_gcode(output, program([template_toolpath(template, params)], params))
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[-1], 'M30')
+        self.assertTrue(all(re.match(r'^(\(.*\)|[GM]\d+.*)$', line) for line in lines))
+
+
+
+if __name__ == '__main__':
+    unittest.main(exit=not sys.flags.interactive)
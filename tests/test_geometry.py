@@ -21,8 +21,13 @@
 import unittest
 import sys
 
+import numpy as np
+
 from metalute.blueprint import blueprint
-from metalute.geometry import Point, Line, CircularArc, ParametricPolyPathBase
+from metalute.bridge import HardtailBridgeBase
+from metalute.body import MusicManAxis
+from metalute.geometry import Point, Line, Circle, CircularArc, SpiralArc, SpiralRadius,\
+    ParametricPolyPathBase, CompositePath, PolyLine
 from metalute.matplotlib_ import plt
 if sys.flags.interactive:
     plt.ion()
@@ -78,6 +83,144 @@ class TestGeometry(unittest.TestCase):
         c4 = Point(-40., 40., 'c4')
         arc4 = self._test_circular_arc_base(c4, 15, 180., -90., offset)
 
+    def test_sample(self):
+        """Test the adaptive sampling of the paths.
+        """
+        line = Line(Point(0., 0.), Point(100., 0.))
+        self.assertEqual(line.sample(0.001).shape, (2, 2))
+        arc = CircularArc(Point(0., 0.), 20., 30., -120.)
+        for tolerance in (0.1, 0.01, 0.001):
+            vertices = arc.sample(tolerance)
+            self.assertTrue(np.allclose(vertices[0], arc.start_point().xy()))
+            self.assertTrue(np.allclose(vertices[-1], arc.end_point().xy()))
+            # The sagitta is largest at the midpoint of each chord.
+            midpoints = 0.5 * (vertices[1:] + vertices[:-1])
+            sagitta = arc.radius - np.hypot(*midpoints.T)
+            self.assertTrue(sagitta.max() <= tolerance)
+        # Tighter tolerances mean more points.
+        self.assertLess(len(arc.sample(0.1)), len(arc.sample(0.001)))
+        # And the output is cached.
+        self.assertIs(arc.sample(0.01), arc.sample(0.01))
+        self.assertEqual(len(Circle(Point(), 10.).sample(0.1)), len(CircularArc(Point(), 10.).sample(0.1)))
+
+    def test_offset(self):
+        """Test the offset of line/arc contours.
+        """
+        arc = CircularArc(Point(0., 0.), 10., 0., 90.)
+        self.assertEqual(arc.offset(3.).radius, 7.)
+        self.assertEqual(arc.offset(-3.).radius, 13.)
+        self.assertIsNone(arc.offset(10.))
+        # The bridge is a clockwise rectangle with two rounded corners.
+        bridge = HardtailBridgeBase()
+        names = ('line1', 'arc1', 'line2', 'arc2', 'line3', 'line4')
+        contour = CompositePath([bridge.path(name) for name in names])
+        for distance in (-6., -3., 3., 6.):
+            offset = contour.offset(distance)
+            self.assertIsInstance(offset, CompositePath)
+            self.assertEqual(offset.open_ends(), [])
+            _, _, dist = contour.nearest(offset.sample())
+            self.assertTrue(np.allclose(dist, abs(distance)))
+        # The holes are offset toward their center.
+        self.assertEqual(bridge.offset(-3.).path('h1').radius, 5.)
+        self.assertNotIn('h1', bridge.offset(3.).path_dict)
+        # The rounded corners collapse for offsets larger than their radius...
+        self.assertNotIn('arc1', bridge.offset(-6.).path_dict)
+        # ...and the square corners get round joints on the convex side.
+        self.assertEqual(sum(name.startswith('join') for name in bridge.offset(3.).path_dict), 2)
+        # A dumbbell with a neck narrower than twice the offset distance: the
+        # inverted loop at the neck is trimmed away and we are left with two
+        # separate closed loops.
+        points = [(0., 0.), (30., 0.), (30., 13.), (40., 13.), (40., 0.), (70., 0.), (70., 30.),
+                  (40., 30.), (40., 17.), (30., 17.), (30., 30.), (0., 30.), (0., 0.)]
+        dumbbell = PolyLine(*[Point(x, y) for x, y in points])
+        for distance in (3., 5.):
+            offset = dumbbell.offset(distance)
+            self.assertEqual(offset.open_ends(), [])
+            vertices = offset.sample()
+            self.assertEqual(np.isnan(vertices[:, 0]).sum(), 1)
+            _, _, dist = CompositePath([dumbbell]).nearest(vertices)
+            self.assertTrue(np.allclose(dist[np.isfinite(dist)], distance))
+        body = MusicManAxis()
+        body.solve_closure('r13', 'span13')
+        for distance in (-6., 6.):
+            offset = body.offset(distance)
+            self.assertEqual(offset.open_ends(), [])
+            _, _, dist = body.nearest(offset.sample(0.001))
+            self.assertTrue(np.allclose(dist, abs(distance), atol=0.01))
+
+    def test_spiral_arc(self):
+        """Test the exact slopes and the cached sampling of spiral arcs.
+        """
+        radius = SpiralRadius(lambda phi, a, b: a + b * phi, (10., 0.1))
+        for span in (90., -90.):
+            arc = SpiralArc(Point(1., 2.), radius, 30., span)
+            derivative = SpiralArc(Point(1., 2.), radius, 30., span, derivative=lambda phi: 0.1)
+            self.assertAlmostEqual(arc.end_slope(), derivative.end_slope())
+            # Compare with a (very) fine finite difference in the direction of travel.
+            h = 1.e-6 * np.sign(span)
+            phi = arc.end_phi
+            slope = Line(arc.point(phi), arc.point(phi + h)).slope()
+            self.assertAlmostEqual(arc.end_slope(), slope, places=5)
+            phi = arc.start_phi
+            slope = Line(arc.point(phi), arc.point(phi + h)).slope()
+            self.assertAlmostEqual(arc.start_slope(), slope, places=5)
+        # The connecting line is tangent to the spiral, and no joint is needed
+        # in the offset.
+        body = MusicManAxis()
+        body.solve_closure('r13', 'span13')
+        offset = body.offset(6.)
+        self.assertTrue(offset.path('arc1').end_point().distance_to(offset.path('line1').start_point()) < 1.e-6)
+        # Identical spiral arcs share the sampled radius.
+        arc1 = SpiralArc(Point(0., 0.), SpiralRadius(lambda phi, a: a, (10.,)), 0., 90.)
+        arc2 = SpiralArc(Point(5., 0.), arc1.radius, 0., 90.)
+        self.assertTrue(np.allclose(arc1.sample() + (5., 0.), arc2.sample()))
+
+    def test_arc_length(self):
+        """Test the arc-length parametrization.
+        """
+        line = Line(Point(0., 0.), Point(10., 0.))
+        arc = line.connecting_circular_arc(5., 90.)
+        path = CompositePath([line, arc, arc.connecting_line(10.)])
+        self.assertAlmostEqual(path.length(), 20. + 2.5 * np.pi)
+        s = np.array([0., 5., 10. + 1.25 * np.pi, 100.])
+        points = path.point_at(s)
+        self.assertEqual(points.shape, (4, 2))
+        self.assertTrue(np.allclose(points[:2], [(0., 0.), (5., 0.)]))
+        self.assertTrue(np.allclose(points[2], (10. + 5. * np.sqrt(0.5), 5. - 5. * np.sqrt(0.5))))
+        self.assertTrue(np.allclose(points[3], path.path('line3').end_point().xy()))
+        self.assertTrue(np.allclose(path.tangent_at(15. + 2.5 * np.pi), (0., 1.)))
+        self.assertTrue(np.allclose(path.normal_at(5.), (0., 1.)))
+        # Evenly spaced points along the body, including the spiral.
+        body = MusicManAxis()
+        body.solve_closure('r13', 'span13')
+        s = np.linspace(0., body.length(), 10001)
+        points = body.point_at(s)
+        self.assertTrue(np.allclose(np.hypot(*np.diff(points, axis=0).T), s[1], rtol=1.e-3))
+        _, _, dist = body.nearest(points, 0.001)
+        self.assertLess(dist.max(), 0.001)
+        tangents = body.tangent_at(s[:-1] + 0.5 * s[1])
+        chords = np.diff(points, axis=0) / s[1]
+        self.assertTrue(np.allclose(tangents, chords, atol=1.e-3))
+
+    def test_bbox(self):
+        """Test the bounding boxes.
+        """
+        self.assertEqual(Line(Point(1., 2.), Point(-1., 3.)).bbox(), (-1., 2., 1., 3.))
+        # The quadrant extrema of the arcs are taken into account.
+        arc = CircularArc(Point(0., 0.), 10., 45., 90.)
+        self.assertTrue(np.allclose(arc.bbox(), (-np.sqrt(50.), np.sqrt(50.), np.sqrt(50.), 10.)))
+        arc = CircularArc(Point(0., 0.), 10., 45., -90.)
+        self.assertTrue(np.allclose(arc.bbox(), (np.sqrt(50.), -np.sqrt(50.), 10., np.sqrt(50.))))
+        self.assertIs(arc.bbox(), arc.bbox())
+        # For composite paths the bounding box matches the sampled vertices.
+        body = MusicManAxis()
+        bbox = body.bbox()
+        vertices = body.sample(0.001)
+        self.assertTrue(np.allclose(bbox[:2], np.nanmin(vertices, axis=0), atol=0.01))
+        self.assertTrue(np.allclose(bbox[2:], np.nanmax(vertices, axis=0), atol=0.01))
+        body.set_params(r13=body.r13 + 10.)
+        self.assertNotEqual(body.bbox(), bbox)
+
     def test_poly_path(self):
         """
         """
@@ -48,6 +48,27 @@ class TestGeometry(unittest.TestCase):
         self.assertEqual(2 * p1, Point(2., 2.))
         self.assertEqual(p1 / 2, Point(0.5, 0.5))
 
+    def test_point_array(self):
+        """Make sure the PointArray class is consistent with Point.
+        """
+        points = [Point(1., 2.), Point(-3., 4.), Point(0., -5.)]
+        array = PointArray.from_points(points)
+        self.assertEqual(len(array), 3)
+        self.assertEqual(array[1], points[1])
+        dist = np.array([1., 2., 3.])
+        slope = np.array([30., 120., -45.])
+        moved = array.move(dist, slope)
+        for p, d, s, q in zip(points, dist, slope, moved):
+            self.assertEqual(p.move(d, s), q)
+        self.assertEqual(list(array.hmove(2.)), [p.hmove(2.) for p in points])
+        self.assertEqual(list(array.vmove(2.)), [p.vmove(2.) for p in points])
+        self.assertEqual(list(array + Point(1., 1.)), [p + Point(1., 1.) for p in points])
+        self.assertEqual(list(Point(1., 1.) - array), [Point(1., 1.) - p for p in points])
+        self.assertEqual(list(2. * array / 4.), [2. * p / 4. for p in points])
+        self.assertTrue(np.allclose(array.distance_to(Point()), [p.distance_to(Point()) for p in points]))
+        x, y = array.xy()
+        self.assertTrue(x.flags.c_contiguous and x.dtype == np.float64)
+
     def test_arc(self):
         """
         """
@@ -96,6 +117,23 @@ class TestGeometry(unittest.TestCase):
         start_point.draw(offset)
         rucap(start_point, base, height, corner_radius, offset)
 
+    def test_bbox(self):
+        """Test the bounding boxes.
+        """
+        self.assertEqual(Point(1., 2.).bbox(), (1., 2., 1., 2.))
+        self.assertEqual(PointArray([0., 1.], [2., -1.]).bbox(), (0., -1., 1., 2.))
+        self.assertEqual(Rectangle(Point(1., 0.), 4., 2.).bbox(), (-1., -1., 3., 1.))
+        self.assertEqual(Hole(Point(0., 0.), 4., 1.5).bbox(), (-3., -3., 3., 3.))
+        arc = Arc(Point(0., 0.), 1., -45., 90.)
+        self.assertTrue(np.allclose(arc.bbox(), (np.sqrt(0.5), -np.sqrt(0.5), 1., np.sqrt(0.5))))
+        # The cached bounding box is updated when the object is modified.
+        arc.span_angle = 180.
+        self.assertTrue(np.allclose(arc.bbox(), (-np.sqrt(0.5), -np.sqrt(0.5), 1., 1.)))
+        # A c-like cap with sharp corners.
+        cap = Cap(Point(0., 0.), 180., 50., 20.)
+        self.assertTrue(np.allclose(cap.bbox(), (-20., -50., 0., 0.)))
+        self.assertIs(cap.bbox(), cap.bbox())
+
     def test_drawables(self):
         """
         """
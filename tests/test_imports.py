@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Test suite for the lazy imports.
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+from metalute import BASE_FOLDER
+
+
+
+class TestImports(unittest.TestCase):
+
+    """Unit tests for the lazy imports of the heavy dependencies.
+    """
+
+    @staticmethod
+    def _loaded_modules(script: str):
+        """Run a script in a brand new interpreter, and return the heavy
+        modules that have been imported.
+        """
+        script = f'import sys\n{script}\nprint(*[name for name in ("matplotlib", "pandas") '\
+                 'if name in sys.modules])'
+        env = dict(os.environ, PYTHONPATH=BASE_FOLDER)
+        output = subprocess.run([sys.executable, '-c', script], env=env, check=True,
+                                capture_output=True, text=True).stdout
+        return output.split()
+
+    def test_computation(self) -> None:
+        """The computation-only modules do not import matplotlib or pandas.
+        """
+        for module_name in ('fret', 'pitch', 'gauge', 'geometry', 'geometry2', 'transform'):
+            self.assertEqual(self._loaded_modules(f'import metalute.{module_name}'), [])
+        script = 'from metalute.fret import Fretboard\n'\
+                 'from metalute.gauge import StandardStringGauges\n'\
+                 'Fretboard().fret_distance_to_nut(12)\n'\
+                 'StandardStringGauges.LIGHT.tensions(648.)'
+        self.assertEqual(self._loaded_modules(script), [])
+
+    def test_lazy(self) -> None:
+        """The heavy modules are imported on demand.
+        """
+        script = 'from metalute.gauge import StandardStringGauges\n'\
+                 'StandardStringGauges.LIGHT.data_frame(648.)'
+        self.assertEqual(self._loaded_modules(script), ['pandas'])
+        script = 'from metalute.geometry import plt'
+        self.assertEqual(self._loaded_modules(script), ['matplotlib'])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
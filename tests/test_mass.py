@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test suite for the mass module.
+"""
+
+import unittest
+import sys
+
+import numpy as np
+
+from metalute.body import MusicManAxis
+from metalute.bridge import HardtailBridgeBase
+from metalute.geometry import Point, Circle
+from metalute.mass import MassProperties
+from metalute.primitives import LinePrimitive, ArcPrimitive, CirclePrimitive
+
+
+class TestMass(unittest.TestCase):
+
+    """Unit tests for the mass module.
+    """
+
+    def test_rectangle(self):
+        """Test a simple rectangle, traversed in both directions.
+        """
+        vertices = [(0., 0.), (2., 0.), (2., 1.), (0., 1.), (0., 0.)]
+        lines = [LinePrimitive(p1, p2) for p1, p2 in zip(vertices[:-1], vertices[1:])]
+        for primitives in (lines, [LinePrimitive(p2, p1) for p1, p2 in reversed(lines)]):
+            props = MassProperties.from_primitives(primitives)
+            self.assertAlmostEqual(props.area(), 2.)
+            self.assertTrue(np.allclose(props.centroid(), (1., 0.5)))
+            self.assertTrue(np.allclose(props.inertia(), (1. / 6., 2. / 3., 0.)))
+            self.assertTrue(np.allclose(props.inertia(centroidal=False), (2. / 3., 8. / 3., 1.)))
+
+    def test_circle(self):
+        """Test circles and half-disks.
+        """
+        props = MassProperties.from_primitives([CirclePrimitive((1., 2.), 3.)])
+        self.assertAlmostEqual(props.area(), 9. * np.pi)
+        self.assertTrue(np.allclose(props.inertia(), (np.pi * 81. / 4., np.pi * 81. / 4., 0.)))
+        # Mind the half-disk is implicitly closed along the diameter.
+        props = MassProperties.from_primitives([ArcPrimitive((1., 1.), 2., 180., -180.)])
+        self.assertAlmostEqual(props.area(), 2. * np.pi)
+        self.assertTrue(np.allclose(props.centroid(), (1., 1. + 8. / (3. * np.pi))))
+
+    def test_body(self):
+        """Compare the analytic calculation with the shoelace formula on a
+        dense sampling of the body.
+        """
+        body = MusicManAxis()
+        body.solve_closure('r13', 'span13')
+        x, y = body.sample(1.e-4).T
+        area = 0.5 * abs(np.sum(x[:-1] * y[1:] - x[1:] * y[:-1]))
+        self.assertAlmostEqual(body.area() / area, 1., places=6)
+        # Pockets.
+        pocket = Circle(Point(200., 0.), 10.)
+        self.assertAlmostEqual(body.area(pockets=[pocket]), body.area() - 100. * np.pi)
+        # The holes of the bridge are subtracted automatically.
+        area = 41. * 65. - 2. * (25. - 25. * np.pi / 4.) - 4. * np.pi * 4.
+        self.assertAlmostEqual(HardtailBridgeBase().area(), area)
+
+
+
+if __name__ == '__main__':
+    unittest.main(exit=not sys.flags.interactive)
@@ -104,6 +104,65 @@ class TestMusicManAxis(unittest.TestCase):
         body.draw(offset)
         body.draw_reference_points(offset)
 
+    def test_body_sample(self):
+        """The body is a single connected path, so that the sampled vertices
+        should not contain any break.
+        """
+        body = Body()
+        vertices = body.sample(0.01)
+        self.assertFalse(np.isnan(vertices).any())
+        num_vertices = sum(len(path.sample(0.01)) for path in body.path_dict.values())
+        self.assertEqual(len(vertices), num_vertices - len(body.path_dict) + 1)
+
+    def test_body_draw_batched(self):
+        """In batched mode the entire body is drawn as a single artist.
+        """
+        blueprint('Music Man Axis batched', 'A1')
+        offset = Point(-200., -50.)
+        body = Body()
+        num_artists = len(plt.gca().patches) + len(plt.gca().lines)
+        body.draw(offset, batched=True)
+        self.assertEqual(len(plt.gca().patches) + len(plt.gca().lines), num_artists + 1)
+        path = body.mpl_path()
+        self.assertIs(path, body.mpl_path())
+        # The body is connected, and the path should contain a single MOVETO.
+        self.assertEqual((path.codes == path.MOVETO).sum(), 1)
+        self.assertTrue(np.allclose(path.vertices[0], body.sample()[0]))
+        self.assertTrue(np.allclose(path.vertices[-1], body.sample()[-1]))
+
+    def test_body_batch(self):
+        """Vectorized construction of many variants of the body.
+        """
+        r13 = np.linspace(170., 190., 11)
+        span13 = np.linspace(20., 30., 5)[:, None]
+        batch = Body.batch(r13=r13, span13=span13)
+        self.assertEqual(batch.shape, (5, 11))
+        self.assertEqual(batch.end_points['arc13'].shape, (5, 11, 2))
+        for i, j in ((0, 0), (2, 5), (4, 10)):
+            body = Body(r13=r13[j], span13=span13[i, 0])
+            for name, path in body.path_dict.items():
+                self.assertTrue(np.allclose(batch.end_points[name][i, j], path.end_point().xy()))
+            start = body.path('arc1').start_point()
+            end = body.path('arc13').end_point()
+            self.assertAlmostEqual(batch.closure_error()[i, j], start.distance_to(end))
+
+    def test_body_closure(self):
+        """Close the body by adjusting the last arc.
+        """
+        body = Body()
+        self.assertEqual(len(body.open_ends()), 2)
+        solution = body.solve_closure('r13', 'span13')
+        self.assertEqual(sorted(solution), ['r13', 'span13'])
+        self.assertEqual(body.r13, solution['r13'])
+        start = body.path('arc1').start_point()
+        end = body.path('arc13').end_point()
+        self.assertLess(start.distance_to(end), 1.e-9)
+        self.assertEqual(len(body.open_ends()), 0)
+        # Close on a different target with a different set of parameters.
+        target = Point(0., 0.)
+        body.solve_closure('d1', 'r12', 'span13', target=target)
+        self.assertLess(body.path('arc13').end_point().distance_to(target), 1.e-9)
+
     def test_body_draw_split(self):
         """
         """
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test suite for the spatial module.
+"""
+
+import unittest
+import sys
+
+import numpy as np
+
+from metalute.body import MusicManAxis
+from metalute.primitives import ArcPrimitive, CirclePrimitive, LinePrimitive
+from metalute.spatial import nearest_point, PointWelder, weld, connectivity, joints
+
+
+class TestSpatial(unittest.TestCase):
+
+    """Unit tests for the spatial module.
+    """
+
+    def test_arc(self):
+        """Test the nearest point on a circular arc.
+        """
+        arc = ArcPrimitive((0., 0.), 10., 30., -120.)
+        point, dist = nearest_point(arc, 20., 0.)
+        self.assertTrue(np.allclose(point, (10., 0.)))
+        self.assertAlmostEqual(dist, 10.)
+        # Outside of the span, the closest point is one of the ends.
+        point, dist = nearest_point(arc, -20., 0.)
+        self.assertTrue(np.allclose(point, arc.end_point()))
+        self.assertTrue(np.allclose(arc.bbox(), (0., -10., 10., 5.)))
+
+    def test_nearest(self):
+        """Compare the index with a brute-force search.
+        """
+        body = MusicManAxis()
+        index = body.spatial_index()
+        self.assertIs(index, body.spatial_index())
+        rng = np.random.default_rng(1)
+        points = np.column_stack((rng.uniform(-100., 500., 500), rng.uniform(-250., 250., 500)))
+        keys, xy, dist = body.nearest(points)
+        for (x, y), key, d in zip(points, keys, dist):
+            _dist = [nearest_point(p, x, y)[1] for p in index.primitives]
+            self.assertAlmostEqual(d, min(_dist))
+            self.assertEqual(key, index.keys[int(np.argmin(_dist))])
+        # Points on the contour.
+        vertices = body.sample()
+        keys, xy, dist = body.nearest(vertices)
+        self.assertTrue(np.allclose(dist, 0.))
+
+    def test_hits(self):
+        """Test the hit test.
+        """
+        body = MusicManAxis()
+        for bbox in ((-10., -10., 10., 10.), (-1000., -1000., 1000., 1000.), (1000., 1000., 1001., 1001.)):
+            xmin, ymin, xmax, ymax = bbox
+            target = []
+            for key, (_xmin, _ymin, _xmax, _ymax) in zip(body.spatial_index().keys, body.spatial_index().bboxes):
+                if _xmin <= xmax and _xmax >= xmin and _ymin <= ymax and _ymax >= ymin and key not in target:
+                    target.append(key)
+            self.assertEqual(body.hits(bbox), target)
+        self.assertEqual(len(body.hits((-1000., -1000., 1000., 1000.))), len(body.path_dict))
+
+    def test_welding(self):
+        """Test the point welding.
+        """
+        # Points straddling a cell border must be merged...
+        points, inverse = weld([(0.9999, 0.), (1.0001, 0.), (1.5, 0.), (0.9995, 0.)], 0.001)
+        self.assertEqual(len(points), 2)
+        self.assertEqual(inverse.tolist(), [0, 0, 1, 0])
+        # ...while points farther apart than the tolerance must not.
+        welder = PointWelder(0.001)
+        self.assertEqual(welder.add(0., 0.), 0)
+        self.assertEqual(welder.add(0.0011, 0.), 1)
+        self.assertEqual(welder.add(0., -0.0009), 0)
+        self.assertEqual(len(welder), 2)
+
+    def test_connectivity(self):
+        """Test the connectivity of a set of primitives.
+        """
+        square = [LinePrimitive((0., 0.), (1., 0.)), LinePrimitive((1., 0.), (1., 1.)),
+                  LinePrimitive((1., 1.), (0., 1.)), LinePrimitive((0., 1.), (0., 0.0001))]
+        points, edges, degree = connectivity(square)
+        self.assertEqual(len(points), 4)
+        self.assertEqual(degree.tolist(), [2, 2, 2, 2])
+        points, edges, degree = connectivity(square[:-1])
+        self.assertEqual(degree.tolist(), [1, 2, 2, 1])
+        # The Music Man body does not close exactly.
+        self.assertEqual(len(MusicManAxis().open_ends()), 2)
+
+    def test_joints(self):
+        """The joints between consecutive primitives follow the welding rule.
+        """
+        lines = [LinePrimitive((0., 0.), (1., 0.)), LinePrimitive((1.0005, 0.), (1., 1.)),
+                 LinePrimitive((1.01, 1.), (0., 1.)), CirclePrimitive((0., 1.), 1.),
+                 LinePrimitive((1., 1.), (2., 1.))]
+        self.assertEqual(joints(lines).tolist(), [False, True, False, False, False])
+        self.assertEqual(joints(lines, 0.1).tolist(), [False, True, True, False, False])
+
+    def test_invalidation(self):
+        """Changing the parameters must invalidate the index.
+        """
+        body = MusicManAxis()
+        index = body.spatial_index()
+        body.set_params(r3=body.r3 + 10.)
+        self.assertIsNot(index, body.spatial_index())
+
+
+
+if __name__ == '__main__':
+    unittest.main(exit=not sys.flags.interactive)
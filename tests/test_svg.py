@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Test suite for the svg module.
+"""
+
+import io
+import os
+import tempfile
+import unittest
+import sys
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from metalute.geometry import Point, CircularArc, Circle
+from metalute import geometry2
+from metalute.head import MusicMan, FenderStratocaster
+from metalute.primitives import ArcPrimitive, CirclePrimitive, LinePrimitive, PolylinePrimitive
+from metalute.svg import path_data, write_svg, SvgWriter
+from metalute.transform import Transform
+
+
+SVG_NAMESPACE = '{http://www.w3.org/2000/svg}'
+
+
+
+class TestSvg(unittest.TestCase):
+
+    """Unit tests for the svg module.
+    """
+
+    @staticmethod
+    def _parse(text):
+        """Parse an SVG document and return the list of <path> elements.
+        """
+        root = ET.fromstring(text)
+        return list(root.iter('{}path'.format(SVG_NAMESPACE)))
+
+    def test_path_data(self):
+        """Conversion of the elementary primitives.
+        """
+        line = LinePrimitive((0., 0.), (10., 0.))
+        arc = ArcPrimitive((10., 5.), 5., -90., 180.)
+        self.assertEqual(path_data([line, arc]), 'M0 0 L10 0 A5 5 0 0 1 10 10')
+        # Arcs beyond 180 degrees are split in two, and clockwise arcs have the
+        # sweep flag set to zero.
+        arc = ArcPrimitive((0., 0.), 1., 0., -270.)
+        data = path_data([arc])
+        self.assertEqual(data.count('A'), 2)
+        self.assertTrue(data.endswith('0 0 0 0 1'))
+        self.assertEqual(path_data([CirclePrimitive((0., 0.), 2.)]).count('A'), 2)
+        # Disconnected primitives and NaN-separated poly-lines.
+        vertices = [(0., 0.), (1., 0.), (np.nan, np.nan), (2., 0.), (3., 0.)]
+        data = path_data([PolylinePrimitive(vertices), line])
+        self.assertEqual(data, 'M0 0 L1 0 M2 0 L3 0 M0 0 L10 0')
+        # End points within the welding tolerance are joined.
+        data = path_data([line, LinePrimitive((10.0005, 0.), (10., 5.))])
+        self.assertEqual(data.count('M'), 1)
+
+    def test_arc_commands(self):
+        """Arcs are written as native A commands rather than being sampled.
+        """
+        arc = CircularArc(Point(0., 0.), 50., 10., 100.)
+        output = io.StringIO()
+        write_svg(output, arc)
+        path, = self._parse(output.getvalue())
+        data = path.get('d')
+        self.assertEqual(data.count('A'), 1)
+        self.assertEqual(data.count('L'), 0)
+
+    def test_geometry2(self):
+        """Write all the geometry2 drawables.
+        """
+        p = geometry2.Point(0., 0.)
+        objects = [geometry2.Line(p, geometry2.Point(10., 10.)),
+                   geometry2.Rectangle(p, 40., 20., 5.),
+                   geometry2.Rectangle(p, 40., 20.),
+                   geometry2.Cap(p, 90., 30., 10., 3.),
+                   geometry2.Arc(p, 12., 20., 90.),
+                   geometry2.Circle(p, 8.),
+                   geometry2.Hole(p, 4.)]
+        output = io.StringIO()
+        write_svg(output, *objects)
+        paths = self._parse(output.getvalue())
+        self.assertEqual(len(paths), len(objects))
+        # A rounded rectangle is a closed path with four arcs and no gaps.
+        data = paths[1].get('d')
+        self.assertEqual(data.count('M'), 1)
+        self.assertEqual(data.count('A'), 4)
+        self.assertEqual(paths[2].get('d').count('A'), 0)
+
+    def test_headstock(self):
+        """Write entire headstocks to file, including the rotation.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            file_path = os.path.join(folder, 'music_man.svg')
+            write_svg(file_path, MusicMan(), FenderStratocaster(), offset=Point(10., 20.))
+            with open(file_path) as input_file:
+                paths = self._parse(input_file.read())
+        self.assertEqual(len(paths), 2)
+        for path in paths:
+            self.assertTrue(path.get('transform').startswith('matrix(1 0 0 1 10 20)'))
+        head = MusicMan(angle=30.)
+        vertices = np.vstack([primitive.start_point() for primitive in head.primitives()])
+        xmin, ymin, xmax, ymax = head.bbox()
+        self.assertTrue((vertices[:, 0] >= xmin - 1.e-6).all())
+        self.assertTrue((vertices[:, 1] <= ymax + 1.e-6).all())
+
+    def test_apply_primitives(self):
+        """Transformation of the primitives under rigid motions and reflections.
+        """
+        arc = ArcPrimitive((1., 2.), 3., 20., 50.)
+        for transform in (Transform().rotate(30., (1., 1.)).translate(5., -2.),
+                          Transform().mirror(0.5, (2., 0.)), Transform().scale(2.)):
+            transformed, = transform.apply_primitives([arc])
+            for p1, p2 in ((arc.start_point(), transformed.start_point()),
+                           (arc.end_point(), transformed.end_point())):
+                self.assertTrue(np.allclose(transform.apply_point(p1), p2))
+        with self.assertRaises(RuntimeError):
+            Transform().scale(1., 2.).apply_primitives([arc])
+
+    def test_streaming(self):
+        """Write objects one at a time with the streaming writer.
+        """
+        output = io.StringIO()
+        with SvgWriter(output, (0., 0., 100., 100.)) as writer:
+            for i in range(10):
+                writer.write(Circle(Point(10. * i, 0.), 2.), stroke='red')
+        paths = self._parse(output.getvalue())
+        self.assertEqual(len(paths), 10)
+        self.assertEqual(paths[0].get('stroke'), 'red')
+
+
+
+if __name__ == '__main__':
+    unittest.main(exit=not sys.flags.interactive)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Test suite for the tiling module.
+"""
+
+import os
+import re
+import tempfile
+import unittest
+import sys
+
+import numpy as np
+
+from metalute.blueprint import blueprint
+from metalute.body import MusicManAxis
+from metalute.geometry import Point
+from metalute.matplotlib_ import plt
+from metalute.tiling import figure_extent, tile_grid, save_tiled
+if sys.flags.interactive:
+    plt.ion()
+
+
+
+class TestTiling(unittest.TestCase):
+
+    """Unit tests for the tiling module.
+    """
+
+    def test_grid(self):
+        """The tiles cover the extent, with the prescribed overlap.
+        """
+        extent = (-100., -50., 150., 70.)
+        tiles, (nx, ny) = tile_grid(extent, 100., 50., 10.)
+        self.assertEqual((nx, ny), (3, 3))
+        x, y = np.array(tiles).T
+        self.assertLessEqual(x.min(), extent[0])
+        self.assertLessEqual(y.min(), extent[1])
+        self.assertGreaterEqual(x.max() + 100., extent[2])
+        self.assertGreaterEqual(y.max() + 50., extent[3])
+        self.assertAlmostEqual(tiles[1][0] - tiles[0][0], 90.)
+        # The first tile is the top-left one.
+        self.assertAlmostEqual(tiles[0][1] - tiles[nx][1], 40.)
+
+    def test_save(self):
+        """Tile an A1 blueprint onto A4 pages.
+        """
+        blueprint('Music Man Axis tiled', 'A1')
+        MusicManAxis().draw(Point(-200., -50.))
+        figure = plt.gcf()
+        figsize = figure.get_size_inches().copy()
+        extent = figure_extent(figure)
+        num_artists = len(figure.axes[0].get_children())
+        num_paths = [len(collection.get_paths()) for collection in figure.axes[0].collections]
+        with tempfile.TemporaryDirectory() as folder:
+            file_path = os.path.join(folder, 'tiled.pdf')
+            num_pages = save_tiled(file_path, overlap=10.)
+            with open(file_path, 'rb') as input_file:
+                data = input_file.read()
+        self.assertEqual(len(re.findall(rb'/Type\s*/Page\b(?!s)', data)), num_pages)
+        self.assertGreater(num_pages, 1)
+        # The figure should be back to its original state.
+        self.assertTrue(np.allclose(figure.get_size_inches(), figsize))
+        self.assertTrue(np.allclose(figure_extent(figure), extent))
+        self.assertEqual(len(figure.axes[0].get_children()), num_artists)
+        self.assertEqual([len(collection.get_paths()) for collection in figure.axes[0].collections],
+                         num_paths)
+
+    def test_size(self):
+        """The collections are culled on each page, i.e., the size of the file
+        does not scale with the number of pages times the size of the sheet.
+        """
+        context = blueprint('Music Man Axis tiled size', 'A0')
+        MusicManAxis().draw(Point(-200., -50.))
+        with tempfile.TemporaryDirectory() as folder:
+            file_path = os.path.join(folder, 'sheet.pdf')
+            context.savefig(file_path)
+            sheet_size = os.path.getsize(file_path)
+            sizes = {}
+            for size in ('A3', 'A4', 'A5'):
+                file_path = os.path.join(folder, f'tiled_{size}.pdf')
+                num_pages = save_tiled(file_path, context.figure, size)
+                sizes[num_pages] = os.path.getsize(file_path)
+        self.assertEqual(len(sizes), 3)
+        self.assertGreater(max(sizes), 40)
+        for file_size in sizes.values():
+            self.assertLess(file_size, 2.5 * sheet_size)
+
+
+
+if __name__ == '__main__':
+    unittest.main(exit=not sys.flags.interactive)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020 Luca Baldini (luca.baldini@pi.infn.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Test suite for the transform module.
+"""
+
+import unittest
+import sys
+
+import numpy as np
+
+from metalute.blueprint import blueprint
+from metalute.geometry import Point, CircularArc
+from metalute.head import MusicMan
+from metalute.matplotlib_ import plt
+from metalute.transform import Transform, as_transform
+if sys.flags.interactive:
+    plt.ion()
+
+
+
+class TestTransform(unittest.TestCase):
+
+    """Unit tests for the transform module.
+    """
+
+    def test_elementary(self):
+        """Test the elementary transformations.
+        """
+        self.assertTrue(np.allclose(Transform.translation(1., 2.).apply_point((1., 1.)), (2., 3.)))
+        t = Transform.rotation(90., center=Point(1., 0.))
+        self.assertTrue(np.allclose(t.apply_point(Point(2., 0.)), (1., 1.)))
+        t = Transform.reflection(45.)
+        self.assertTrue(np.allclose(t.apply_point((1., 0.)), (0., 1.)))
+        t = Transform.scaling(2., 3., center=(1., 1.))
+        self.assertTrue(np.allclose(t.apply_point((2., 2.)), (3., 4.)))
+
+    def test_composition(self):
+        """Test the composition of transformations.
+        """
+        t = Transform().rotate(90.).translate(10., 0.)
+        self.assertTrue(np.allclose(t.apply_point((1., 0.)), (10., 1.)))
+        self.assertTrue(np.allclose((t.inverse() @ t).matrix, np.identity(3)))
+        vertices = np.array([[1., 0.], [np.nan, np.nan], [0., 1.]])
+        transformed = t.apply(vertices)
+        self.assertTrue(np.allclose(transformed[0], t.apply_point(vertices[0])))
+        self.assertTrue(np.isnan(transformed[1]).all())
+        self.assertTrue(np.allclose(transformed[2], (9., 0.)))
+        self.assertTrue(np.allclose(t.to_affine2d().get_matrix(), t.matrix))
+
+    def test_as_transform(self):
+        """Test the conversion of drawing offsets.
+        """
+        t = Transform.rotation(10.)
+        self.assertIs(as_transform(t), t)
+        self.assertTrue(np.allclose(as_transform(None).matrix, np.identity(3)))
+        self.assertTrue(np.allclose(as_transform(Point(1., 2.)).matrix[:2, 2], (1., 2.)))
+        self.assertTrue(np.allclose(as_transform((1., 2.)).matrix[:2, 2], (1., 2.)))
+        with self.assertRaises(RuntimeError):
+            as_transform('foo')
+
+    def test_draw(self):
+        """Draw a rotated arc and a rotated headstock.
+        """
+        blueprint('Test transform', 'A4')
+        arc = CircularArc(Point(0., 0.), 20., 0., 90.)
+        t = Transform().rotate(90.).translate(-50., 0.)
+        arc.draw(t)
+        patch = plt.gca().patches[-1]
+        self.assertIs(t.mpl_transform(), t.mpl_transform())
+        # The end point of the rotated arc.
+        end = patch.get_transform().transform(patch.get_path().vertices[-1:])
+        expected = plt.gca().transData.transform([t.apply_point(arc.end_point())])
+        self.assertTrue(np.allclose(end, expected))
+        head = MusicMan(angle=30.)
+        head.draw_top(Point(20., 0.))
+        xmin, ymin, xmax, ymax = head.bbox()
+        self.assertGreater(ymax - ymin, MusicMan().bbox()[3] - MusicMan().bbox()[1])
+
+
+
+if __name__ == '__main__':
+    unittest.main(exit=not sys.flags.interactive)